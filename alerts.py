@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Alarm-Regeln
+Deklarative Bedingungen aus alerts.json über die Werte jedes Laufs
+(Tagesänderung, Abstand zum 52W-Hoch, Sentiment, Indikatoren), mit
+Hysterese und Cooldown; ausgelöste Alarme gehen gebündelt an einen Webhook
+"""
+
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+ALERTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alerts.json')
+ALERT_STATE_PATH = os.path.join('data', 'alert_state.json')
+ALERT_OUTBOX_PATH = os.path.join('data', 'alert_outbox.json')
+ALERT_COOLDOWN = 60 * 60
+WEBHOOK_BATCH_SIZE = 100
+WEBHOOK_TIMEOUT = 10
+OUTBOX_LIMIT = 1000
+
+LEVEL_OPS = {
+    '>': lambda v, t: v > t,
+    '>=': lambda v, t: v >= t,
+    '<': lambda v, t: v < t,
+    '<=': lambda v, t: v <= t
+}
+CROSS_OPS = {'crosses_above': '>', 'crosses_below': '<'}
+OPS = set(LEVEL_OPS) | set(CROSS_OPS) | {'changes'}
+# Fields from snapshot_fields() that hold text; only 'changes' applies to them
+TEXT_FIELDS = {'sentiment'}
+
+def snapshot_fields(data, score):
+    """The values rules can refer to for one card: data from fetch_all_assets(), score from score_assets()"""
+    sentiment, confidence, _ = score
+    values = {
+        'price': float(data['current']),
+        'change_pct': float(data['change_pct']),
+        'distance': float(data['distance']),
+        'sentiment': sentiment,
+        'score': float(confidence)
+    }
+    for name, value in (data.get('indicators') or {}).items():
+        if value is not None:
+            values[name] = float(value)
+    return values
+
+class AlertEngine:
+    """Rules indexed by (key, field), evaluated incrementally per snapshot
+
+    evaluate() only looks at fields whose value changed since the key's last
+    snapshot and only at the rules on those fields ('*' rules apply to
+    every key). A rule fires when its condition turns true while it is
+    armed and out of cooldown; it re-arms once the value has moved back past
+    the threshold by its hysteresis. 'crosses_*' rules also need the
+    previous value on the other side, 'changes' fires when a value differs
+    from the previous one (optionally only when it becomes the rule's value).
+    Armed flag and cooldown are kept per (rule, key), so a '*' rule tracks
+    every asset separately.
+    """
+
+    def __init__(self, rules, state=None):
+        self.rules = {rule['id']: rule for rule in rules}
+        self.index = {}
+        for rule in rules:
+            self.index.setdefault((rule['key'], rule['field']), []).append(rule)
+        state = state or {}
+        self.rule_state = {}
+        for name, entry in state.get('rules', {}).items():
+            rule_id, _, key = name.partition('|')
+            if rule_id in self.rules and key:
+                self.rule_state[(rule_id, key)] = entry
+        self.last = {tuple(name.split('|', 1)): value for name, value in state.get('last', {}).items()}
+
+    def _check(self, rule, value, previous):
+        op, threshold = rule['op'], rule.get('value')
+        if op == 'changes':
+            return previous is not None and value != previous and (threshold is None or value == threshold)
+        if op in CROSS_OPS:
+            test = LEVEL_OPS[CROSS_OPS[op]]
+            return previous is not None and not test(previous, threshold) and test(value, threshold)
+        return LEVEL_OPS[op](value, threshold)
+
+    def _rearmed(self, rule, value):
+        """True once the value is back on the other side of the threshold by the hysteresis"""
+        op, threshold, hysteresis = rule['op'], rule.get('value'), rule.get('hysteresis', 0.0)
+        if op == 'changes':
+            return True
+        if op in ('>', '>=', 'crosses_above'):
+            return value <= threshold - hysteresis
+        return value >= threshold + hysteresis
+
+    def evaluate(self, key, values, now=None):
+        """Feed one snapshot {field: value} for key; returns the alerts it fires"""
+        now = now or time.time()
+        fired = []
+        for field, value in values.items():
+            previous = self.last.get((key, field))
+            if value == previous:
+                continue
+            self.last[(key, field)] = value
+            for rules in (self.index.get((key, field)), self.index.get(('*', field))):
+                for rule in rules or ():
+                    state = self.rule_state.setdefault((rule['id'], key), {'armed': True, 'last_fired': None})
+                    if not state['armed']:
+                        if self._rearmed(rule, value):
+                            state['armed'] = True
+                        else:
+                            continue
+                    if not self._check(rule, value, previous):
+                        continue
+                    last_fired = state['last_fired']
+                    if last_fired is not None and now - last_fired < rule.get('cooldown', ALERT_COOLDOWN):
+                        continue
+                    state['last_fired'] = now
+                    state['armed'] = rule['op'] == 'changes'
+                    fired.append(self._alert(rule, key, value, previous, now))
+        return fired
+
+    def _alert(self, rule, key, value, previous, now):
+        threshold = rule.get('value')
+        if rule['op'] == 'changes':
+            text = f"{key}: {rule['field']} {previous} → {value}"
+        else:
+            text = f"{key}: {rule['field']} {value:.2f} ({rule['op']} {threshold:g})"
+        return {
+            'rule': rule['id'], 'key': key, 'field': rule['field'], 'op': rule['op'], 'threshold': threshold,
+            'value': value, 'previous': previous, 'ts': int(now), 'message': rule.get('message') or text
+        }
+
+    def state(self):
+        return {
+            'rules': {f"{rule_id}|{key}": entry for (rule_id, key), entry in self.rule_state.items()},
+            'last': {f"{key}|{field}": value for (key, field), value in self.last.items()}
+        }
+
+    def save_state(self, path=ALERT_STATE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state(), f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+def load_alert_state(path=ALERT_STATE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _validate(raw):
+    seen = set()
+    for rule in raw.get('rules', []):
+        missing = [field for field in ('id', 'key', 'field', 'op') if not rule.get(field)]
+        if missing:
+            raise ValueError(f"Alarme: Regel ohne {', '.join(missing)}: {rule}")
+        if rule['id'] in seen:
+            raise ValueError(f"Alarme: Regel '{rule['id']}' doppelt")
+        seen.add(rule['id'])
+        if rule['op'] not in OPS:
+            raise ValueError(f"Alarme: unbekannter Operator '{rule['op']}' bei {rule['id']}")
+        if rule['op'] != 'changes' and rule['field'] in TEXT_FIELDS:
+            raise ValueError(f"Alarme: Operator '{rule['op']}' passt nicht zum Textfeld '{rule['field']}' bei {rule['id']}")
+        if rule['op'] != 'changes' and not isinstance(rule.get('value'), (int, float)):
+            raise ValueError(f"Alarme: Regel {rule['id']} braucht einen Zahlenwert")
+        if rule.get('hysteresis', 0) < 0 or rule.get('cooldown', 0) < 0:
+            raise ValueError(f"Alarme: negative Hysterese oder Cooldown bei {rule['id']}")
+    return raw
+
+def load_alerts(path=ALERTS_PATH, state_path=ALERT_STATE_PATH):
+    """(AlertEngine, webhook URL or None) from the rules file and the persisted state"""
+    with open(path, encoding='utf-8') as f:
+        raw = _validate(json.load(f))
+    return AlertEngine(raw.get('rules', []), load_alert_state(state_path)), raw.get('webhook')
+
+class WebhookSink:
+    """Delivers alerts in batches as POST {"alerts": [...]} to a webhook
+
+    Batches that cannot be delivered stay in an outbox file and go out
+    first on the next send(); the outbox keeps at most OUTBOX_LIMIT alerts.
+    """
+
+    def __init__(self, url, batch_size=WEBHOOK_BATCH_SIZE, outbox_path=ALERT_OUTBOX_PATH, timeout=WEBHOOK_TIMEOUT):
+        self.url = url
+        self.batch_size = batch_size
+        self.outbox_path = outbox_path
+        self.timeout = timeout
+
+    def _load_outbox(self):
+        try:
+            with open(self.outbox_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save_outbox(self, alerts):
+        if not alerts and not os.path.exists(self.outbox_path):
+            return
+        os.makedirs(os.path.dirname(self.outbox_path) or '.', exist_ok=True)
+        with open(self.outbox_path, 'w') as f:
+            json.dump(alerts[-OUTBOX_LIMIT:], f)
+
+    def _post(self, batch):
+        body = json.dumps({'alerts': batch}, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'}, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def send(self, alerts):
+        """Deliver queued and new alerts; returns (delivered, queued) counts"""
+        pending = self._load_outbox() + list(alerts)
+        delivered = 0
+        for begin in range(0, len(pending), self.batch_size):
+            batch = pending[begin:begin + self.batch_size]
+            try:
+                self._post(batch)
+            except (urllib.error.URLError, OSError) as e:
+                print(f"  ❌ Webhook nicht erreichbar: {e}")
+                self._save_outbox(pending[begin:])
+                return delivered, len(pending) - begin
+            delivered += len(batch)
+        self._save_outbox([])
+        return delivered, 0
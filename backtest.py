@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Backtest des Fundamental-Scores
+Spielt die Regeltabelle aus scoring.py über historische Makro-Reihen und
+Tageskurse aus lokalen Dateien ab, misst Trefferquote und Terminrenditen
+der Bullish/Bearish-Signale pro Asset und Horizont und durchsucht ein
+Raster von Regelgewichten – verteilt auf einen Prozess-Pool
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from providers import read_replay_file, replay_path
+from scoring import BASE_SCORE, BEARISH_AT, BULLISH_AT, COMPILED_RULES, MACRO_VARIABLES, SCORE_MAX, SCORE_MIN
+from watchlist import load_watchlist
+
+BACKTEST_JSON_PATH = 'backtest.json'
+BACKTEST_REPORT_PATH = 'backtest.html'
+HORIZONS = (5, 20, 60)
+MULTIPLIERS = (0.0, 0.5, 1.0, 1.5, 2.0)
+OBJECTIVES = ('edge', 'hit_rate', 'ic')
+MIN_CALLS = 30
+CHUNK_SIZE = 4096
+TOP_CONFIGS = 10
+BASE_GROUP = 'base'
+
+def load_macro_history(path):
+    """Macro values as known on each date: one row per release date, gaps forward-filled
+
+    The CSV has a date column and one column per macro variable; a row only
+    needs the series released that day. Rows before every series has a value
+    are dropped. Dates must be publication dates, not reference periods,
+    or the backtest looks ahead.
+    """
+    frame = pd.read_csv(path, parse_dates=['date']).set_index('date').sort_index()
+    missing = [name for name in MACRO_VARIABLES if name not in frame]
+    if missing:
+        raise ValueError(f"Makro-Historie ohne Spalte(n): {', '.join(missing)}")
+    frame = frame[list(MACRO_VARIABLES)].ffill().dropna()
+    if frame.empty:
+        raise ValueError("Makro-Historie enthält keine vollständige Zeile")
+    return frame[~frame.index.duplicated(keep='last')]
+
+def load_closes(directory, symbols):
+    """{key: close series} from the replay CSVs; keys without a recording are left out"""
+    closes = {}
+    for key, symbol in symbols.items():
+        path = replay_path(directory, symbol)
+        if os.path.exists(path):
+            close = read_replay_file(path)['Close'].dropna()
+            if len(close):
+                closes[key] = close
+    return closes
+
+def forward_returns(close, horizon):
+    """Return from each close to the close horizon trading days later (NaN at the end)"""
+    close = np.asarray(close, dtype=float)
+    result = np.full(len(close), np.nan)
+    if len(close) > horizon:
+        result[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    return result
+
+def rule_groups(compiled=COMPILED_RULES):
+    """Sweep groups: rules conditioned on the same variable share a multiplier, unconditional ones form 'base'"""
+    names = [rule[1][0] if rule[1] else BASE_GROUP for rule in compiled.rules]
+    groups = list(dict.fromkeys(names))
+    return groups, np.array([groups.index(name) for name in names], dtype=np.int64)
+
+def prepare(macro, closes, horizons=HORIZONS, multipliers=MULTIPLIERS, compiled=COMPILED_RULES,
+            objective='edge', objective_horizon=20, start=None):
+    """Everything the sweep needs, reduced to per-pattern sums
+
+    The rule conditions only change on macro release dates, so the dates
+    collapse into a few dozen distinct condition patterns. Per asset,
+    horizon and pattern the context keeps the number of observations, the
+    sum and squared sum of forward returns and the count of up and down
+    moves; any weight set is then scored in O(patterns) instead of
+    O(dates).
+    """
+    fired = compiled.conditions(compiled.scenario_matrix(macro.to_dict('records')))
+    patterns, row_pattern = np.unique(fired, axis=0, return_inverse=True)
+    row_pattern = row_pattern.ravel()
+    release_dates = macro.index.values
+
+    assets = [key for key in compiled.assets if key in closes]
+    shape = (len(assets), len(horizons), len(patterns))
+    sums = {name: np.zeros(shape) for name in ('n', 'r', 'r2', 'up', 'down')}
+    periods = {}
+    for a, key in enumerate(assets):
+        close = closes[key]
+        if start:
+            close = close[close.index >= pd.Timestamp(start)]
+        row = np.searchsorted(release_dates, close.index.values, side='right') - 1
+        known = row >= 0
+        if known.any():
+            periods[key] = (close.index[known][0].date().isoformat(), close.index[known][-1].date().isoformat())
+        for h, horizon in enumerate(horizons):
+            r = forward_returns(close.values, horizon)
+            ok = known & np.isfinite(r)
+            p, r = row_pattern[row[ok]], r[ok]
+            for name, weights in (('n', None), ('r', r), ('r2', r * r), ('up', r > 0), ('down', r < 0)):
+                sums[name][a, h] = np.bincount(p, weights=weights, minlength=len(patterns))
+
+    groups, rule_group = rule_groups(compiled)
+    return {
+        'assets': assets,
+        'horizons': list(horizons),
+        'patterns': patterns.astype(float),
+        'asset_rules': [np.flatnonzero(compiled.rule_asset == compiled.asset_index[key]) for key in assets],
+        'rule_weight': compiled.rule_weight,
+        'rule_group': rule_group,
+        'groups': groups,
+        'multipliers': np.asarray(multipliers, dtype=float),
+        'grid_shape': (len(multipliers),) * len(groups),
+        'sums': sums,
+        'objective': objective,
+        'objective_horizon': list(horizons).index(objective_horizon),
+        'periods': periods,
+        'macro_rows': len(macro)
+    }
+
+def grid_multipliers(context, begin, end):
+    """(configs × groups) multipliers of the grid entries begin..end-1"""
+    idx = np.unravel_index(np.arange(begin, end), context['grid_shape'])
+    return context['multipliers'][np.stack(idx, axis=1)]
+
+def evaluate(context, multipliers):
+    """Signal statistics of each weight set: arrays shaped (configs × assets × horizons)
+
+    bullish/bearish count the calls, hits the calls the forward return
+    agreed with, expected the hits a random call in the same direction
+    would get, ret_* sum the forward returns per direction and ic is the
+    correlation of score and forward return.
+    """
+    weights = context['rule_weight'] * multipliers[:, context['rule_group']]
+    sums = context['sums']
+    shape = (len(multipliers), len(context['assets']), len(context['horizons']))
+    out = {name: np.zeros(shape) for name in ('bullish', 'bearish', 'hits', 'expected', 'ret_bullish', 'ret_bearish', 'ic')}
+    for a, rules in enumerate(context['asset_rules']):
+        # (patterns × configs) scores, clamped like score_assets()
+        score = np.clip(BASE_SCORE + context['patterns'][:, rules] @ weights[:, rules].T, SCORE_MIN, SCORE_MAX)
+        bull, bear = (score >= BULLISH_AT).astype(float), (score <= BEARISH_AT).astype(float)
+        for h in range(len(context['horizons'])):
+            n, r, up, down = sums['n'][a, h], sums['r'][a, h], sums['up'][a, h], sums['down'][a, h]
+            total = n.sum()
+            out['bullish'][:, a, h], out['bearish'][:, a, h] = n @ bull, n @ bear
+            out['hits'][:, a, h] = up @ bull + down @ bear
+            if total:
+                out['expected'][:, a, h] = (n @ bull) * up.sum() / total + (n @ bear) * down.sum() / total
+            out['ret_bullish'][:, a, h], out['ret_bearish'][:, a, h] = r @ bull, r @ bear
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_s, mean_r = n @ score / total, r.sum() / total
+                cov = r @ score / total - mean_s * mean_r
+                var_s = n @ (score * score) / total - mean_s ** 2
+                var_r = sums['r2'][a, h].sum() / total - mean_r ** 2
+                out['ic'][:, a, h] = np.where(var_s > 1e-9, cov / np.sqrt(var_s * var_r), np.nan)
+    return out
+
+def objective_values(context, stats):
+    """One number per weight set at the objective horizon, pooled over assets (NaN below MIN_CALLS calls)"""
+    h = context['objective_horizon']
+    calls = (stats['bullish'][:, :, h] + stats['bearish'][:, :, h]).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if context['objective'] == 'ic':
+            ic = stats['ic'][:, :, h]
+            finite = np.isfinite(ic)
+            value = np.where(finite, ic, 0).sum(axis=1) / finite.sum(axis=1)
+        elif context['objective'] == 'hit_rate':
+            value = stats['hits'][:, :, h].sum(axis=1) / calls
+        else:
+            value = (stats['hits'][:, :, h] - stats['expected'][:, :, h]).sum(axis=1) / calls
+    return np.where(calls >= MIN_CALLS, value, np.nan)
+
+_CONTEXT = None
+
+def _init_worker(context):
+    global _CONTEXT
+    _CONTEXT = context
+
+def _evaluate_range(bounds):
+    begin, end = bounds
+    return objective_values(_CONTEXT, evaluate(_CONTEXT, grid_multipliers(_CONTEXT, begin, end)))
+
+def sweep(context, workers=None, chunk_size=CHUNK_SIZE):
+    """Objective for every grid entry, in grid order; chunks of the grid go to a process pool"""
+    total = int(np.prod(context['grid_shape']))
+    bounds = [(begin, min(begin + chunk_size, total)) for begin in range(0, total, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(bounds) == 1:
+        _init_worker(context)
+        return np.concatenate([_evaluate_range(b) for b in bounds])
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as pool:
+        return np.concatenate(list(pool.map(_evaluate_range, bounds)))
+
+def _rounded(value, digits=4):
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+def asset_table(context, stats, config=0):
+    """Per asset and horizon statistics of one weight set, JSON-ready"""
+    table = {}
+    sums = context['sums']
+    for a, key in enumerate(context['assets']):
+        entry = {'observations': int(sums['n'][a, 0].sum()), 'period': context['periods'].get(key), 'horizons': {}}
+        for h, horizon in enumerate(context['horizons']):
+            bull, bear = stats['bullish'][config, a, h], stats['bearish'][config, a, h]
+            calls, total = bull + bear, sums['n'][a, h].sum()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                entry['horizons'][f"{horizon}d"] = {
+                    'bullish': int(bull), 'bearish': int(bear),
+                    'hit_rate': _rounded(stats['hits'][config, a, h] / calls),
+                    'base_rate': _rounded(sums['up'][a, h].sum() / total),
+                    'edge': _rounded((stats['hits'][config, a, h] - stats['expected'][config, a, h]) / calls),
+                    'ret_bullish': _rounded(stats['ret_bullish'][config, a, h] / bull * 100, 3),
+                    'ret_bearish': _rounded(stats['ret_bearish'][config, a, h] / bear * 100, 3),
+                    'ic': _rounded(stats['ic'][config, a, h])
+                }
+        table[key] = entry
+    return table
+
+def build_report(context, values, seconds, top=TOP_CONFIGS):
+    """JSON report: the current weights per asset and horizon, the best grid entries and each group's sensitivity"""
+    groups = context['groups']
+    baseline = np.ones((1, len(groups)))
+    baseline_stats = evaluate(context, baseline)
+
+    ranked = [int(i) for i in np.argsort(-np.where(np.isfinite(values), values, -np.inf), kind='stable')[:top]
+              if np.isfinite(values[i])]
+    best = np.concatenate([grid_multipliers(context, i, i + 1) for i in ranked] or [np.empty((0, len(groups)))])
+    best_stats = evaluate(context, best)
+    calls = best_stats['bullish'] + best_stats['bearish']
+    h = context['objective_horizon']
+
+    grid = values.reshape(context['grid_shape'])
+    sensitivity = {}
+    for g, group in enumerate(groups):
+        other = tuple(axis for axis in range(len(groups)) if axis != g)
+        with np.errstate(invalid='ignore'):
+            finite = np.isfinite(grid)
+            means = np.where(finite, grid, 0).sum(axis=other) / np.maximum(finite.sum(axis=other), 1)
+            means = np.where(finite.any(axis=other), means, np.nan)
+        sensitivity[group] = [_rounded(v) for v in means]
+
+    return {
+        'generated': datetime.now().isoformat(),
+        'macro_rows': context['macro_rows'],
+        'patterns': len(context['patterns']),
+        'horizons': context['horizons'],
+        'objective': {'name': context['objective'], 'horizon': context['horizons'][h], 'min_calls': MIN_CALLS},
+        'groups': groups,
+        'multipliers': context['multipliers'].tolist(),
+        'configs': int(values.size),
+        'seconds': round(seconds, 2),
+        'baseline': {
+            'objective': _rounded(objective_values(context, baseline_stats)[0]),
+            'assets': asset_table(context, baseline_stats)
+        },
+        'top': [{
+            'multipliers': dict(zip(groups, best[rank].tolist())),
+            'objective': _rounded(values[i]),
+            'hit_rate': {key: _rounded(best_stats['hits'][rank, a, h] / calls[rank, a, h]) if calls[rank, a, h] else None
+                         for a, key in enumerate(context['assets'])}
+        } for rank, i in enumerate(ranked)],
+        'sensitivity': sensitivity
+    }
+
+def _percent(value, signed=False):
+    if value is None:
+        return "–"
+    return f"{value * 100:+.1f}%" if signed else f"{value * 100:.1f}%"
+
+def _plain(value, fmt, suffix=""):
+    return "–" if value is None else format(value, fmt) + suffix
+
+def render_report(report):
+    """Standalone HTML page for the report, linked from the dashboard footer"""
+    objective = report['objective']
+    rows = []
+    for key, entry in report['baseline']['assets'].items():
+        for horizon, s in entry['horizons'].items():
+            rows.append(
+                f"<tr><th>{key}</th><td>{horizon[:-1]} T</td><td>{s['bullish']} / {s['bearish']}</td>"
+                f"<td>{_percent(s['hit_rate'])}</td><td>{_percent(s['base_rate'])}</td><td>{_percent(s['edge'], True)}</td>"
+                f"<td>{_plain(s['ret_bullish'], '+.2f', '%')} / {_plain(s['ret_bearish'], '+.2f', '%')}</td><td>{_plain(s['ic'], '+.3f')}</td></tr>"
+            )
+    groups = report['groups']
+    top_rows = [
+        "<tr>" + "".join(f"<td>{entry['multipliers'][g]:g}×</td>" for g in groups) + f"<td>{_plain(entry['objective'], '+.4f')}</td></tr>"
+        for entry in report['top']
+    ]
+    sensitivity_rows = [
+        f"<tr><th>{group}</th>" + "".join(f"<td>{_plain(v, '+.4f')}</td>" for v in values) + "</tr>"
+        for group, values in report['sensitivity'].items()
+    ]
+    periods = [entry['period'] for entry in report['baseline']['assets'].values() if entry['period']]
+    period = f"{min(p[0] for p in periods)} bis {max(p[1] for p in periods)}" if periods else "–"
+    return f"""<!DOCTYPE html>
+<html lang="de">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Backtest Fundamental-Score</title>
+<style>
+body {{ font-family: -apple-system, sans-serif; background: #000; color: #fff; margin: 0; padding: 16px; }}
+.container {{ max-width: 900px; margin: 0 auto; }}
+h1 {{ font-size: 22px; }} h2 {{ font-size: 16px; margin-top: 28px; color: #00d4aa; }}
+p {{ color: #8e8e93; font-size: 13px; line-height: 1.5; }}
+table {{ border-collapse: collapse; width: 100%; font-size: 12px; background: #1c1c1e; border-radius: 12px; overflow: hidden; }}
+th, td {{ padding: 6px 8px; text-align: right; border-bottom: 1px solid #38383a; font-variant-numeric: tabular-nums; }}
+th {{ text-align: left; color: #8e8e93; }}
+a {{ color: #007aff; }}
+</style>
+</head>
+<body>
+<div class="container">
+<h1>📈 Backtest Fundamental-Score</h1>
+<p>Zeitraum {period} · {report['macro_rows']} Makro-Stände ({report['patterns']} verschiedene Regel-Zustände) · {report['configs']} Gewichtungen in {report['seconds']:.1f}s · erstellt {report['generated'][:16].replace('T', ' ')}</p>
+<h2>Aktuelle Gewichte</h2>
+<p>Signale Bullish / Bearish pro Handelstag, Trefferquote (Kursrichtung nach dem Horizont stimmt), Basisquote (Anteil steigender Kurse), Edge (Treffer über zufälligen Signalen derselben Richtung), Ø Terminrendite je Signal und IC (Korrelation Score ↔ Rendite). Ziel {objective['name']} über {objective['horizon']} Tage: {_plain(report['baseline']['objective'], '+.4f')}</p>
+<table><tr><th>Asset</th><th>Horizont</th><th>Bull / Bear</th><th>Treffer</th><th>Basis</th><th>Edge</th><th>Ø Rendite Bull / Bear</th><th>IC</th></tr>
+{"".join(rows)}</table>
+<h2>Beste Gewichtungen ({objective['name']}, {objective['horizon']} Tage)</h2>
+<p>Faktor je Regelgruppe auf die Gewichte in scoring.py; base = Regeln ohne Bedingung.</p>
+<table><tr>{"".join(f"<th>{g}</th>" for g in groups)}<th>Ziel</th></tr>
+{"".join(top_rows)}</table>
+<h2>Sensitivität</h2>
+<p>Mittlerer Zielwert pro Faktor einer Gruppe, gemittelt über alle anderen Gruppen.</p>
+<table><tr><th>Gruppe</th>{"".join(f"<th>{m:g}×</th>" for m in report['multipliers'])}</tr>
+{"".join(sensitivity_rows)}</table>
+<p><a href="index.html">← Zum Dashboard</a> · Vergangene Treffer sind keine Garantie · Keine Anlageberatung</p>
+</div>
+</body>
+</html>
+"""
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest der Fundamental-Scores gegen realisierte Renditen")
+    parser.add_argument('--macro-history', required=True, help="CSV mit date und einer Spalte je Makro-Reihe (Veröffentlichungsdaten)")
+    parser.add_argument('--replay-dir', required=True, help="Verzeichnis mit Tageskursen (Format wie --record)")
+    parser.add_argument('--watchlist', help="Watchlist-Datei für die Zuordnung Key → Symbol")
+    parser.add_argument('--start', help="Erster Signaltag (YYYY-MM-DD)")
+    parser.add_argument('--horizons', default=','.join(map(str, HORIZONS)), help="Horizonte in Handelstagen, kommagetrennt")
+    parser.add_argument('--multipliers', default=','.join(f"{m:g}" for m in MULTIPLIERS), help="Faktoren je Regelgruppe, kommagetrennt")
+    parser.add_argument('--objective', choices=OBJECTIVES, default='edge', help="Zielgröße für die Rangfolge")
+    parser.add_argument('--objective-horizon', type=int, help="Horizont der Zielgröße (Standard: mittlerer Horizont)")
+    parser.add_argument('--workers', type=int, help="Prozesse (Standard: alle Kerne)")
+    parser.add_argument('--output', default=BACKTEST_JSON_PATH, help="Ergebnisdatei (JSON)")
+    parser.add_argument('--report', default=BACKTEST_REPORT_PATH, help="HTML-Bericht, vom Dashboard verlinkt")
+    args = parser.parse_args(argv)
+
+    horizons = sorted(int(h) for h in args.horizons.split(','))
+    objective_horizon = args.objective_horizon or horizons[len(horizons) // 2]
+    if objective_horizon not in horizons:
+        parser.error(f"--objective-horizon {objective_horizon} ist keiner der Horizonte {horizons}")
+    multipliers = [float(m) for m in args.multipliers.split(',')]
+
+    watchlist = load_watchlist(args.watchlist) if args.watchlist else load_watchlist()
+    symbols = {key: symbol for symbol, key, _ in watchlist.config}
+    closes = load_closes(args.replay_dir, {key: symbols[key] for key in COMPILED_RULES.assets if key in symbols})
+    skipped = [key for key in COMPILED_RULES.assets if key not in closes]
+    if skipped:
+        print(f"⚠️  Keine Kurse für {', '.join(skipped)}")
+    if not closes:
+        print("❌ Keine Kursdaten für Assets mit Regeln")
+        return 1
+
+    macro = load_macro_history(args.macro_history)
+    started = time.perf_counter()
+    context = prepare(macro, closes, horizons, multipliers, objective=args.objective,
+                      objective_horizon=objective_horizon, start=args.start)
+    total = int(np.prod(context['grid_shape']))
+    print(f"🔬 {len(context['assets'])} Assets × {len(horizons)} Horizonte, {len(context['patterns'])} Regel-Zustände, "
+          f"{total} Gewichtungen ({len(context['groups'])} Gruppen × {len(multipliers)} Faktoren)")
+    values = sweep(context, args.workers)
+    report = build_report(context, values, time.perf_counter() - started)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, ensure_ascii=False, separators=(',', ':'))
+    with open(args.report, 'w', encoding='utf-8') as f:
+        f.write(render_report(report))
+
+    print(f"   Aktuelle Gewichte: {args.objective} {_plain(report['baseline']['objective'], '+.4f')}")
+    if report['top']:
+        best = report['top'][0]
+        factors = ", ".join(f"{g} {m:g}×" for g, m in best['multipliers'].items())
+        print(f"   Beste Gewichtung: {args.objective} {_plain(best['objective'], '+.4f')} ({factors})")
+    print(f"✅ {total} Gewichtungen in {report['seconds']:.1f}s → {args.output}, {args.report}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
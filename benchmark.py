@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Benchmark für die Update-Pipeline
+Spielt aufgezeichnete Kursdaten für 6 bis 10.000 Symbole ab und misst
+Laufzeit pro Stufe, Spitzen-Speicher und Ausgabegröße (JSON)
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import update_dashboard
+from providers import ReplayProvider, write_replay_file
+
+DEFAULT_SIZES = [6, 100, 1000, 10000]
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEATS = 5
+# A stage only counts as regressed when it is slower by the threshold and by this much
+MIN_REGRESSION_SECONDS = 0.2
+MIN_REGRESSION_MB = 50
+SYNTHETIC_SUFFIX = '~'
+
+class ScaledReplayProvider(ReplayProvider):
+    """Serves synthetic symbols like "^NDX~42" from the recording of "^NDX" """
+
+    def _frame(self, symbol):
+        return super()._frame(symbol.split(SYNTHETIC_SUFFIX)[0])
+
+def scaled_config(size):
+    """The default watchlist, cycled with synthetic copies up to size entries"""
+    config = []
+    base = update_dashboard.ASSETS_CONFIG
+    for i in range(size):
+        symbol, key, asset_type = base[i % len(base)]
+        if i >= len(base):
+            update_dashboard.WATCHLIST.alias(f"{key}_{i}", key)
+            symbol, key = f"{symbol}{SYNTHETIC_SUFFIX}{i}", f"{key}_{i}"
+        config.append((symbol, key, asset_type))
+    return config
+
+def write_synthetic_recordings(directory, days=300, seed=42):
+    """Deterministic random-walk recordings for the default watchlist"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end='2026-01-30', periods=days)
+    start_prices = {'^NDX': 21000, '^DJI': 44000, '^GSPC': 6000, 'GC=F': 2800, 'BTC-USD': 100000, 'EURUSD=X': 1.04}
+    for symbol, _, _ in update_dashboard.ASSETS_CONFIG:
+        close = start_prices.get(symbol, 100) * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+        spread = np.abs(rng.normal(0, 0.005, days))
+        hist = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.002, days)),
+            'High': close * (1 + spread),
+            'Low': close * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(1_000, 1_000_000, days).astype(float)
+        }, index=index)
+        write_replay_file(directory, symbol, hist)
+
+def page_bytes(output_mode):
+    """Bytes a browser loads for the first screen of the dashboard"""
+    if output_mode == 'html':
+        return os.path.getsize('index.html')
+    with open('data_version.json') as f:
+        first = json.load(f)['groups'][0]
+    files = ['index.html', 'data_version.json', os.path.join('shards', f"{first['id']}-0.json")]
+    files += [os.path.join('assets', name) for name in os.listdir('assets')]
+    return sum(os.path.getsize(f) for f in files)
+
+def run_size(size, recordings, output_mode='html'):
+    """Cold run (empty store) followed by a warm run, in a scratch directory
+
+    The warm run forces the write, so render and write are measured even
+    though its content matches the cold run.
+    """
+    provider = ScaledReplayProvider(recordings)
+    config = scaled_config(size)
+    result = {'size': size}
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for label in ('cold', 'warm'):
+                # Forget the last downloads so closed markets do not skip the warm fetch
+                if os.path.exists(update_dashboard.FETCH_LOG_PATH):
+                    os.remove(update_dashboard.FETCH_LOG_PATH)
+                timer = update_dashboard.StageTimer()
+                started = time.perf_counter()
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    update_dashboard.run_update(config, provider, timer, output_mode=output_mode, force_write=label == 'warm')
+                result[label] = {
+                    'total_s': time.perf_counter() - started,
+                    'stages_s': timer.durations
+                }
+            result['output_bytes'] = sum(os.path.getsize(os.path.join(d, f)) for d, _, names in os.walk('.')
+                                         for f in names if not d.startswith(os.path.join('.', 'data')))
+            result['page_bytes'] = page_bytes(output_mode)
+        finally:
+            os.chdir(cwd)
+    # ru_maxrss is in KiB on Linux
+    result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+def run_child(size, recordings, output_mode='html'):
+    """Run one size in a fresh interpreter so memory and caches do not leak between sizes"""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', str(size), '--recordings', recordings, '--output-mode', output_mode],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark für {size} Symbole fehlgeschlagen:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def median_run(samples):
+    """One result from repeated runs of a size: the median of every total, stage and memory figure"""
+    result = {key: samples[0][key] for key in ('size', 'output_bytes', 'page_bytes')}
+    result['repeats'] = len(samples)
+    result['peak_rss_mb'] = float(np.median([s['peak_rss_mb'] for s in samples]))
+    for label in ('cold', 'warm'):
+        stages = dict.fromkeys(stage for s in samples for stage in s[label]['stages_s'])
+        result[label] = {
+            'total_s': float(np.median([s[label]['total_s'] for s in samples])),
+            'stages_s': {stage: float(np.median([s[label]['stages_s'][stage] for s in samples if stage in s[label]['stages_s']]))
+                         for stage in stages}
+        }
+    return result
+
+def baseline_mismatch(output_mode, sizes, baseline):
+    """Reason the baseline cannot be compared with a run of output_mode and sizes, or None"""
+    if baseline.get('output_mode', 'html') != output_mode:
+        return f"Baseline mit --output-mode {baseline.get('output_mode', 'html')}, dieser Lauf mit {output_mode}"
+    sizes = sorted(sizes)
+    base_sizes = sorted(entry['size'] for entry in baseline.get('results', []))
+    if sizes != base_sizes:
+        return f"Baseline mit Größen {base_sizes}, dieser Lauf mit {sizes}"
+    return None
+
+def find_regressions(results, baseline, threshold):
+    """Compare medians against a stored baseline; returns human-readable regression lines
+
+    A figure regresses when it is worse by more than threshold (relative)
+    and by more than MIN_REGRESSION_SECONDS / MIN_REGRESSION_MB (absolute),
+    so scheduler noise on stages of a few milliseconds never fails the gate.
+    """
+    regressions = []
+    previous = {entry['size']: entry for entry in baseline.get('results', [])}
+    for entry in results['results']:
+        base = previous.get(entry['size'])
+        if not base:
+            continue
+        checks = [('peak_rss_mb', entry['peak_rss_mb'], base['peak_rss_mb'], MIN_REGRESSION_MB)]
+        for label in ('cold', 'warm'):
+            checks.append((f"{label}.total", entry[label]['total_s'], base[label]['total_s'], MIN_REGRESSION_SECONDS))
+            for stage, seconds in entry[label]['stages_s'].items():
+                if stage in base[label]['stages_s']:
+                    checks.append((f"{label}.{stage}", seconds, base[label]['stages_s'][stage], MIN_REGRESSION_SECONDS))
+        for name, current, before, slack in checks:
+            if current > before * (1 + threshold) and current - before > slack:
+                growth = f" (+{(current / before - 1) * 100:.0f}%)" if before > 0 else ""
+                regressions.append(f"{entry['size']} Symbole {name}: {before:.3f} → {current:.3f}{growth}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark der Dashboard-Pipeline")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="Watchlist-Größen, kommagetrennt")
+    parser.add_argument('--recordings', help="Replay-Verzeichnis (Standard: synthetische Aufzeichnung)")
+    parser.add_argument('--output', default='bench_results.json', help="Ergebnisdatei (JSON)")
+    parser.add_argument('--baseline', help="Gespeicherte Baseline zum Vergleich")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Erlaubte Verschlechterung (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="Ergebnis zusätzlich als --baseline speichern")
+    parser.add_argument('--output-mode', choices=['html', 'split'], default='html', help="Ausgabeformat wie in update_dashboard.py")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Läufe pro Größe, verglichen wird der Median")
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_size(args.child, args.recordings, args.output_mode)))
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    baseline = None
+    if args.baseline and not args.save_baseline:
+        # Checked before measuring, so a mismatch fails in seconds instead of after the whole run
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatch = baseline_mismatch(args.output_mode, sizes, baseline)
+        if mismatch:
+            print(f"❌ Baseline nicht vergleichbar: {mismatch}")
+            return 2
+
+    with tempfile.TemporaryDirectory() as scratch:
+        recordings = args.recordings
+        if not recordings:
+            recordings = os.path.join(scratch, 'recordings')
+            write_synthetic_recordings(recordings)
+
+        results = {
+            'generated': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'output_mode': args.output_mode,
+            'repeats': args.repeats,
+            'results': []
+        }
+        for size in sizes:
+            print(f"⏱️  {size} Symbole ({args.repeats}×)...")
+            entry = median_run([run_child(size, recordings, args.output_mode) for _ in range(args.repeats)])
+            results['results'].append(entry)
+            stages = " | ".join(f"{k} {v:.2f}s" for k, v in entry['warm']['stages_s'].items())
+            print(f"   kalt {entry['cold']['total_s']:.2f}s, warm {entry['warm']['total_s']:.2f}s ({stages}), "
+                  f"{entry['peak_rss_mb']:.0f} MB, {entry['output_bytes'] / 1024:.0f} KB, erste Seite {entry['page_bytes'] / 1024:.0f} KB")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Ergebnisse gespeichert: {args.output}")
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline gespeichert: {args.baseline}")
+    elif baseline is not None:
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} Regression(en) über {args.threshold * 100:.0f}%:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("✅ Keine Regression gegenüber der Baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
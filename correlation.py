@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Rollierende Korrelation und Volatilität
+Realisierte Volatilität aller Assets sowie Kovarianz, Korrelation und Beta
+der ersten 50 Watchlist-Einträge (einstellbar) über 20, 60 und 250 Handelstage –
+fortgeschrieben mit laufenden Summen: pro neuem Tag ein Rang-2-Update (neuer
+Tag hinein, ältester hinaus) statt Neuberechnung jedes Fensters
+"""
+
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ohlcv_store import history_rewritten
+
+CORR_WINDOWS = (20, 60, 250)
+RING = max(CORR_WINDOWS)
+TRADING_DAYS = 252
+LOOKBACK_BARS = 2 * RING  # enough calendar bars to cover RING + 1 weekdays, also for 7-day crypto
+CORRELATION_STATE_PATH = os.path.join('data', 'correlation.npz')
+MATRIX_MAX_KEYS = 50
+MOVERS = 5
+
+def _weekday(ts):
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).weekday() < 5
+
+class CorrelationState:
+    """Daily returns of all assets on a shared weekday axis, with running window sums
+
+    The ring holds the last RING return rows for every symbol (missing
+    returns as 0 with mask 0). Per window it keeps O(N) sums for each
+    asset's volatility (sum, sum of squares, count) and, only for the
+    first MATRIX_MAX_KEYS symbols, pairwise sums over the days on which
+    both assets i and j have a return:
+        cross[i, j] = sum r_i r_j    pair_sum[i, j] = sum r_i
+        pair_sq[i, j] = sum r_i²     pairs[i, j] = number of such days
+    so covariance and variances are pairwise-complete. Each new day adds
+    its row and removes the one leaving the window. Correlations of the
+    other symbols are computed on demand (peers()).
+    """
+
+    def __init__(self, symbols, matrix_keys=MATRIX_MAX_KEYS):
+        n = len(symbols)
+        self.symbols = list(symbols)
+        self.matrix = min(n, matrix_keys)
+        self.returns = np.zeros((RING, n))
+        self.mask = np.zeros((RING, n))
+        self.head = 0
+        self.filled = 0
+        self.last_ts = 0
+        self.prev_close = np.full(n, np.nan)
+        self._rebuild_sums()
+
+    def _window_rows(self, window):
+        """Ring slots of the last window days, oldest first"""
+        count = min(window, self.filled)
+        return (self.head - count + np.arange(count)) % RING
+
+    def _rebuild_sums(self):
+        """Derive the window sums from the ring: column sums plus one matrix product per pair sum"""
+        self.sums = {}
+        k = self.matrix
+        for window in CORR_WINDOWS:
+            rows = self._window_rows(window)
+            r, m = self.returns[rows], self.mask[rows]
+            rk, mk = r[:, :k], m[:, :k]
+            self.sums[window] = {
+                'sum': r.sum(axis=0), 'sq': (r * r).sum(axis=0), 'count': m.sum(axis=0),
+                'cross': rk.T @ rk, 'pair_sum': rk.T @ mk, 'pair_sq': (rk * rk).T @ mk, 'pairs': mk.T @ mk
+            }
+
+    def copy(self):
+        clone = CorrelationState.__new__(CorrelationState)
+        clone.symbols, clone.matrix = list(self.symbols), self.matrix
+        clone.returns, clone.mask, clone.prev_close = self.returns.copy(), self.mask.copy(), self.prev_close.copy()
+        clone.head, clone.filled, clone.last_ts = self.head, self.filled, self.last_ts
+        clone.sums = {w: {name: v.copy() for name, v in sums.items()} for w, sums in self.sums.items()}
+        return clone
+
+    def advance(self, close, ts, traded=None):
+        """Add one weekday: close holds each asset's latest close (NaN before its first bar)
+
+        traded marks the assets with a bar on this day; the others (holidays)
+        get no return for the day instead of a zero return, and their next
+        return spans the gap.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ret = close / self.prev_close - 1
+        m = np.isfinite(ret) if traded is None else np.isfinite(ret) & traded
+        m = m.astype(float)
+        r = np.where(m > 0, ret, 0.0)
+        for window, sums in self.sums.items():
+            if self.filled >= window:
+                old = (self.head - window) % RING
+                rows, masks, sign = np.stack([r, self.returns[old]]), np.stack([m, self.mask[old]]), np.array([1.0, -1.0])
+            else:
+                rows, masks, sign = r[None, :], m[None, :], np.ones(1)
+            sums['sum'] += sign @ rows
+            sums['sq'] += sign @ (rows * rows)
+            sums['count'] += sign @ masks
+            self._update(sums, rows[:, :self.matrix], masks[:, :self.matrix], sign)
+        self.returns[self.head], self.mask[self.head] = r, m
+        self.head = (self.head + 1) % RING
+        self.filled += 1
+        self.prev_close = np.where(np.isfinite(close), close, self.prev_close)
+        self.last_ts = int(ts)
+
+    @staticmethod
+    def _update(sums, r, m, sign):
+        """Add sign-weighted rows (new day +1, leaving day -1) as one rank-2 product per pair sum"""
+        weighted = r.T * sign
+        sums['cross'] += weighted @ r
+        sums['pair_sum'] += weighted @ m
+        sums['pair_sq'] += (weighted * r.T) @ m
+        if not (len(sign) == 2 and np.array_equal(m[0], m[1])):
+            # Same mask on both days (the usual case) leaves the pair counts unchanged
+            sums['pairs'] += (m.T * sign) @ m
+
+    @staticmethod
+    def _min_days(window):
+        return max(3, window // 2)
+
+    def volatility(self, window):
+        """Annualized volatility in percent for every symbol (NaN below window / 2 days)"""
+        s = self.sums[window]
+        n = s['count']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.maximum((s['sq'] - s['sum'] ** 2 / n) / (n - 1), 0.0)
+        return np.where(n >= self._min_days(window), np.sqrt(var * TRADING_DAYS) * 100, np.nan)
+
+    def stats(self, window):
+        """(correlation, beta) among the first self.matrix symbols for one window
+
+        beta[i, j] is asset i's beta against asset j. Pairs with fewer than
+        window / 2 common days are NaN.
+        """
+        s = self.sums[window]
+        n = s['pairs']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valid = n >= self._min_days(window)
+            cov = (s['cross'] - s['pair_sum'] * s['pair_sum'].T / n) / (n - 1)
+            var_i = np.maximum((s['pair_sq'] - s['pair_sum'] ** 2 / n) / (n - 1), 0.0)
+            corr = cov / np.sqrt(var_i * var_i.T)
+            beta = cov / var_i.T
+        return np.where(valid, np.clip(corr, -1.0, 1.0), np.nan), np.where(valid, beta, np.nan)
+
+    def peers(self, window):
+        """Correlation of every symbol (rows) with each of the first self.matrix symbols (columns)
+
+        Computed from the ring on demand: O(N × matrix × window), never N × N.
+        """
+        rows = self._window_rows(window)
+        r, m = self.returns[rows], self.mask[rows]
+        rk, mk = r[:, :self.matrix], m[:, :self.matrix]
+        n = m.T @ mk
+        sum_i, sum_j = r.T @ mk, m.T @ rk
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = r.T @ rk - sum_i * sum_j / n
+            var_i = np.maximum((r * r).T @ mk - sum_i ** 2 / n, 0.0)
+            var_j = np.maximum(m.T @ (rk * rk) - sum_j ** 2 / n, 0.0)
+            corr = cov / np.sqrt(var_i * var_j)
+        return np.where(n >= self._min_days(window), np.clip(corr, -1.0, 1.0), np.nan)
+
+    def save(self, path=CORRELATION_STATE_PATH):
+        """Persist the ring only; the window sums are rebuilt from it on load"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, symbols=np.array(self.symbols), returns=self.returns, mask=self.mask,
+                 prev_close=self.prev_close, counters=np.array([self.head, self.filled, self.last_ts, self.matrix], dtype=np.int64))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CORRELATION_STATE_PATH):
+        try:
+            raw = np.load(path)
+            counters = [int(v) for v in raw['counters']]
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(counters) != 4:
+            return None
+        state = cls.__new__(cls)
+        state.symbols = [str(s) for s in raw['symbols']]
+        state.returns, state.mask, state.prev_close = raw['returns'], raw['mask'], raw['prev_close']
+        state.head, state.filled, state.last_ts, state.matrix = counters
+        state._rebuild_sums()
+        return state
+
+def _close_matrix(store, symbols, since):
+    """Weekday dates after since, each asset's latest close on them (forward-filled) and whether it traded that day"""
+    bars = [store.tail(symbol, LOOKBACK_BARS) for symbol in symbols]
+    dates = np.unique(np.concatenate([b['ts'][b['ts'] > since] for b in bars] or [np.empty(0, dtype=np.int64)]))
+    dates = np.array([ts for ts in dates if _weekday(ts)], dtype=np.int64)[-(RING + 1):]
+    close = np.full((len(dates), len(symbols)), np.nan)
+    traded = np.zeros((len(dates), len(symbols)), dtype=bool)
+    for i, b in enumerate(bars):
+        if len(b):
+            idx = np.searchsorted(b['ts'], dates, side='right') - 1
+            close[:, i] = np.where(idx >= 0, np.asarray(b['close'])[np.maximum(idx, 0)], np.nan)
+            traded[:, i] = (idx >= 0) & (np.asarray(b['ts'])[np.maximum(idx, 0)] == dates)
+    return dates, close, traded
+
+def update_correlation(store, symbols, path=CORRELATION_STATE_PATH, matrix_keys=MATRIX_MAX_KEYS):
+    """Advance the persisted state with new weekdays; returns the live state
+
+    Like the indicators, only weekdays before the newest one are committed;
+    the newest day may still be forming and is applied to a copy. The state
+    restarts from the stored history when the symbol list or matrix_keys
+    changes, or when the store replaced a symbol's history. Memory and update time of the pairwise sums grow with
+    matrix_keys²: 50 keys take about 0.25 MB, 500 about 25 MB.
+    """
+    state = CorrelationState.load(path)
+    if (state is None or state.symbols != list(symbols) or state.matrix != min(len(symbols), matrix_keys)
+            or history_rewritten(store, symbols, state.last_ts, state.prev_close)):
+        state = CorrelationState(symbols, matrix_keys)
+
+    dates, close, traded = _close_matrix(store, symbols, state.last_ts)
+    for t in range(len(dates) - 1):
+        state.advance(close[t], dates[t], traded[t])
+    state.save(path)
+
+    live = state.copy()
+    if len(dates):
+        live.advance(close[-1], dates[-1], traded[-1])
+    return live
+
+def _rounded(matrix, digits=3):
+    return [[None if np.isnan(v) else round(float(v), digits) for v in row] for row in matrix]
+
+def summarize(state, keys, movers=MOVERS):
+    """JSON-ready correlation summary; keys are the display keys in state.symbols order
+
+    Volatility covers every asset. The correlation and beta matrices and
+    the movers (largest gap between the shortest and longest window) cover
+    the first state.matrix assets; peers maps each key to its most
+    correlated asset among those in the middle window.
+    """
+    short, long_ = CORR_WINDOWS[0], CORR_WINDOWS[-1]
+    middle = CORR_WINDOWS[len(CORR_WINDOWS) // 2]
+    matrix_keys = list(keys[:state.matrix])
+    stats = {window: state.stats(window) for window in CORR_WINDOWS}
+    volatility = {window: state.volatility(window) for window in CORR_WINDOWS}
+
+    i, j = np.triu_indices(len(matrix_keys), k=1)
+    change = stats[short][0][i, j] - stats[long_][0][i, j]
+    magnitude = np.where(np.isfinite(change), np.abs(change), -1.0)
+    ranked = [p for p in np.argsort(-magnitude, kind='stable')[:movers] if magnitude[p] >= 0]
+    summary = {
+        'windows': list(CORR_WINDOWS),
+        'volatility': {key: {f"{w}d": None if np.isnan(volatility[w][k]) else round(float(volatility[w][k]), 2)
+                             for w in CORR_WINDOWS} for k, key in enumerate(keys)},
+        'movers': [{
+            'pair': [matrix_keys[i[p]], matrix_keys[j[p]]],
+            f'corr_{short}d': round(float(stats[short][0][i[p], j[p]]), 3),
+            f'corr_{long_}d': round(float(stats[long_][0][i[p], j[p]]), 3),
+            'change': round(float(change[p]), 3),
+            f'beta_{short}d': None if np.isnan(stats[short][1][i[p], j[p]]) else round(float(stats[short][1][i[p], j[p]]), 3)
+        } for p in ranked],
+        'peers': {},
+        'keys': matrix_keys,
+        'corr': {f"{w}d": _rounded(stats[w][0]) for w in CORR_WINDOWS},
+        'beta': {f"{w}d": _rounded(stats[w][1]) for w in CORR_WINDOWS}
+    }
+    corr = state.peers(middle)
+    corr[np.arange(len(matrix_keys)), np.arange(len(matrix_keys))] = np.nan
+    has_peer = np.isfinite(corr).any(axis=1)
+    best = np.argmax(np.where(np.isfinite(corr), np.abs(corr), -1.0), axis=1)
+    for k in np.flatnonzero(has_peer):
+        summary['peers'][keys[k]] = {'key': matrix_keys[best[k]], 'corr': round(float(corr[k, best[k]]), 3), 'window': middle}
+    return summary
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Rolling 52-Wochen Hoch/Tief aus lokal gespeicherter Tageshistorie
+Monotone Deques: jeder neue Tagesbalken aktualisiert Max/Min in O(1) amortisiert
+"""
+
+import json
+import os
+from collections import deque
+from datetime import date, timedelta
+
+WINDOW_DAYS = 365
+EXTREMA_CACHE_PATH = os.path.join('data', 'extrema_52w.json')
+
+class RollingExtrema:
+    """Rolling max/min over a fixed calendar window of daily bars
+
+    The deques only hold finished days. The newest day is kept apart in
+    self.current until a later day arrives, because it may still be forming
+    and get revised: a revision replaces it instead of being pushed again.
+    """
+
+    def __init__(self, window_days=WINDOW_DAYS):
+        self.window = timedelta(days=window_days)
+        self.highs = deque()  # (date, high), highs strictly decreasing
+        self.lows = deque()   # (date, low), lows strictly increasing
+        self.current = None   # (date, high, low) of the newest day
+
+    @property
+    def last_date(self):
+        return self.current[0] if self.current else None
+
+    def push(self, day, high, low):
+        """Add a daily bar; re-pushing the current day replaces its high/low"""
+        if self.current is not None:
+            if day < self.current[0]:
+                return
+            if day > self.current[0]:
+                self._commit(*self.current)
+        self.current = (day, high, low)
+        self._expire(day)
+
+    def _commit(self, day, high, low):
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((day, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((day, low))
+
+    def _expire(self, today):
+        cutoff = today - self.window
+        while self.highs and self.highs[0][0] <= cutoff:
+            self.highs.popleft()
+        while self.lows and self.lows[0][0] <= cutoff:
+            self.lows.popleft()
+
+    @property
+    def high(self):
+        if self.current is None:
+            return None
+        return max(self.highs[0][1], self.current[1]) if self.highs else self.current[1]
+
+    @property
+    def low(self):
+        if self.current is None:
+            return None
+        return min(self.lows[0][1], self.current[2]) if self.lows else self.current[2]
+
+    def to_dict(self):
+        return {
+            'current': [self.current[0].isoformat(), self.current[1], self.current[2]] if self.current else None,
+            'highs': [[d.isoformat(), v] for d, v in self.highs],
+            'lows': [[d.isoformat(), v] for d, v in self.lows]
+        }
+
+    @classmethod
+    def from_dict(cls, raw, window_days=WINDOW_DAYS):
+        extrema = cls(window_days)
+        extrema.highs = deque((date.fromisoformat(d), v) for d, v in raw.get('highs', []))
+        extrema.lows = deque((date.fromisoformat(d), v) for d, v in raw.get('lows', []))
+        if raw.get('current'):
+            d, high, low = raw['current']
+            extrema.current = (date.fromisoformat(d), high, low)
+        return extrema
+
+def update_from_history(extrema, hist):
+    """Push every bar of a daily history frame into the rolling extrema"""
+    highs = hist['High'] if 'High' in hist else hist['Close']
+    lows = hist['Low'] if 'Low' in hist else hist['Close']
+    for ts, high, low in zip(hist.index, highs, lows):
+        if high != high or low != low:
+            continue
+        extrema.push(ts.date(), float(high), float(low))
+    return extrema
+
+def load_extrema_cache(path=EXTREMA_CACHE_PATH):
+    """Load the persisted deques for all symbols ({} if there is no cache yet)
+
+    Entries written before the newest day was kept apart ('last' instead of
+    'current') are dropped; their deques may hold a revised day twice and
+    get rebuilt from the store.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {symbol: RollingExtrema.from_dict(entry) for symbol, entry in raw.items() if 'current' in entry}
+
+def save_extrema_cache(cache, path=EXTREMA_CACHE_PATH):
+    """Persist the deques atomically"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({symbol: e.to_dict() for symbol, e in cache.items()}, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
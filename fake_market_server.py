@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Lokaler Fake-Marktdaten-Server
+Liefert aufgezeichnete Kurse (Replay-Verzeichnis) per HTTP aus und spielt
+dabei Fehler, Rate-Limits und Latenz ein – zum Testen von --provider http.
+Nimmt außerdem Alarm-Webhooks entgegen (POST /webhook)
+"""
+
+import argparse
+import collections
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from providers import ReplayProvider
+
+class FakeMarketServer:
+    """Threaded HTTP server serving GET /history?symbol=...&period=...&start=...
+
+    error_rate is the probability of a 500, fail_symbols always answer 503,
+    and more than rate_limit requests within one second get a 429 with a
+    Retry-After header. latency delays every response. requests counts the
+    requests per symbol. POST /webhook stores each JSON body in webhooks.
+    """
+
+    def __init__(self, replay_dir, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0,
+                 fail_symbols=(), rate_limit=None, seed=None):
+        self.replay = ReplayProvider(replay_dir)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_symbols = set(fail_symbols)
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.requests = collections.Counter()
+        self.webhooks = []
+        self._window = collections.deque()
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _status(self, symbol):
+        """Injected error status for this request, or None"""
+        with self._lock:
+            now = time.monotonic()
+            self.requests[symbol] += 1
+            self._window.append(now)
+            while now - self._window[0] >= 1.0:
+                self._window.popleft()
+            if self.rate_limit and len(self._window) > self.rate_limit:
+                return 429
+            if symbol in self.fail_symbols:
+                return 503
+            if self.random.random() < self.error_rate:
+                return 500
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=b'', content_type='text/plain', headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path != '/history' or 'symbol' not in query:
+                    self._send(404, b'not found')
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+                status = server._status(query['symbol'])
+                if status == 429:
+                    self._send(429, b'rate limited', headers={'Retry-After': '1'})
+                    return
+                if status:
+                    self._send(status, b'injected error')
+                    return
+                hist = server.replay.history([query['symbol']], period=query.get('period', '1y'),
+                                             start=query.get('start')).get(query['symbol'])
+                if hist is None:
+                    self._send(404, b'unknown symbol')
+                    return
+                self._send(200, hist.to_csv(index_label='Date').encode('utf-8'), 'text/csv')
+
+            def do_POST(self):
+                if urlparse(self.path).path != '/webhook':
+                    self._send(404, b'not found')
+                    return
+                try:
+                    payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                except ValueError:
+                    self._send(400, b'invalid json')
+                    return
+                with server._lock:
+                    server.webhooks.append(payload)
+                for alert in payload.get('alerts', []):
+                    print(f"🔔 {alert.get('message')}")
+                self._send(204)
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake-Marktdaten-Server mit Fehler- und Latenz-Injektion")
+    parser.add_argument('--replay-dir', required=True, help="Verzeichnis mit aufgezeichneten Kursdaten")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Latenz pro Anfrage in Sekunden")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Anteil der Anfragen mit HTTP 500 (0-1)")
+    parser.add_argument('--fail-symbols', default='', help="Symbole, die immer mit 503 antworten (kommagetrennt)")
+    parser.add_argument('--rate-limit', type=int, help="Max. Anfragen pro Sekunde, darüber HTTP 429")
+    parser.add_argument('--seed', type=int, help="Seed für reproduzierbare Fehler")
+    args = parser.parse_args(argv)
+
+    server = FakeMarketServer(
+        args.replay_dir, port=args.port, latency=args.latency, error_rate=args.error_rate,
+        fail_symbols=[s for s in args.fail_symbols.split(',') if s], rate_limit=args.rate_limit, seed=args.seed
+    )
+    print(f"🧪 Fake-Server läuft auf {server.url} (Strg+C beendet)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
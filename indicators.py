@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Technische Indikatoren für alle Assets gleichzeitig
+RSI, MACD, Bollinger Bands, ATR und gleitende Durchschnitte auf einer
+(Assets × Zeit) Matrix – jeder Schritt ist ein NumPy-Vektor über alle Assets
+"""
+
+import os
+
+import numpy as np
+
+from ohlcv_store import history_rewritten
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BB_PERIOD = 20
+BB_STD = 2.0
+ATR_PERIOD = 14
+SMA_PERIODS = (20, 50, 200)
+WINDOW = max(SMA_PERIODS + (BB_PERIOD,))
+LOOKBACK_BARS = 2 * WINDOW
+INDICATOR_STATE_PATH = os.path.join('data', 'indicators.npz')
+
+def _smooth(prev, value, count, alpha):
+    """Exponential smoothing seeded with the running mean of the first 1/alpha values"""
+    a = np.maximum(alpha, 1.0 / np.maximum(count, 1))
+    return np.where(np.isnan(prev), value, prev + a * (value - prev))
+
+class IndicatorState:
+    """Per-asset indicator state that advances one bar at a time
+
+    Rows follow self.symbols. buffer is a ring of the last WINDOW closes per
+    asset (head = next write slot), so moving averages and Bollinger Bands
+    update with running sums instead of re-reading the window.
+    """
+
+    VECTORS = ('prev_close', 'ema_fast', 'ema_slow', 'macd_signal', 'avg_gain', 'avg_loss', 'atr')
+
+    def __init__(self, symbols):
+        n = len(symbols)
+        self.symbols = list(symbols)
+        self.buffer = np.full((n, WINDOW), np.nan)
+        self.head = np.zeros(n, dtype=np.int64)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.last_ts = np.zeros(n, dtype=np.int64)
+        for name in self.VECTORS:
+            setattr(self, name, np.full(n, np.nan))
+        self._rebuild_sums()
+
+    def _rebuild_sums(self):
+        """Derive the running window sums from the ring buffer"""
+        rows = np.arange(len(self.symbols))[:, None]
+        self.sums, self.counts = {}, {}
+        for period in set(SMA_PERIODS + (BB_PERIOD,)):
+            window = self.buffer[rows, (self.head[:, None] - np.arange(1, period + 1)) % WINDOW]
+            self.sums[period] = np.nansum(window, axis=1)
+            self.counts[period] = np.sum(~np.isnan(window), axis=1)
+            if period == BB_PERIOD:
+                self.sumsq = np.nansum(window ** 2, axis=1)
+
+    def copy(self):
+        clone = IndicatorState.__new__(IndicatorState)
+        clone.symbols = list(self.symbols)
+        for name in ('buffer', 'head', 'count', 'last_ts', 'sumsq') + self.VECTORS:
+            setattr(clone, name, getattr(self, name).copy())
+        clone.sums = {k: v.copy() for k, v in self.sums.items()}
+        clone.counts = {k: v.copy() for k, v in self.counts.items()}
+        return clone
+
+    def save(self, path=INDICATOR_STATE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        arrays = {name: getattr(self, name) for name in ('buffer', 'head', 'count', 'last_ts') + self.VECTORS}
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, symbols=np.array(self.symbols), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDICATOR_STATE_PATH):
+        try:
+            raw = np.load(path)
+        except (OSError, ValueError):
+            return None
+        state = cls.__new__(cls)
+        state.symbols = [str(s) for s in raw['symbols']]
+        for name in ('buffer', 'head', 'count', 'last_ts') + cls.VECTORS:
+            setattr(state, name, raw[name])
+        state._rebuild_sums()
+        return state
+
+def advance(state, close, high=None, low=None, ts=None):
+    """Advance every asset by one bar; NaN in close means no new bar for that asset"""
+    rows = np.flatnonzero(~np.isnan(close))
+    if rows.size == 0:
+        return state
+    c = close[rows]
+    h = c if high is None else np.where(np.isnan(high[rows]), c, high[rows])
+    l = c if low is None else np.where(np.isnan(low[rows]), c, low[rows])
+    pc = state.prev_close[rows]
+    first = np.isnan(pc)
+    count = state.count[rows] + 1
+
+    # ATR and RSI use Wilder smoothing (alpha = 1/period)
+    tr = np.where(first, h - l, np.maximum(h - l, np.maximum(np.abs(h - pc), np.abs(l - pc))))
+    state.atr[rows] = _smooth(state.atr[rows], tr, count, 1.0 / ATR_PERIOD)
+
+    delta = c - pc
+    gain = np.where(first, np.nan, np.maximum(delta, 0.0))
+    loss = np.where(first, np.nan, np.maximum(-delta, 0.0))
+    state.avg_gain[rows] = np.where(first, np.nan, _smooth(state.avg_gain[rows], gain, count - 1, 1.0 / RSI_PERIOD))
+    state.avg_loss[rows] = np.where(first, np.nan, _smooth(state.avg_loss[rows], loss, count - 1, 1.0 / RSI_PERIOD))
+
+    ema_fast = _smooth(state.ema_fast[rows], c, count, 2.0 / (MACD_FAST + 1))
+    ema_slow = _smooth(state.ema_slow[rows], c, count, 2.0 / (MACD_SLOW + 1))
+    state.ema_fast[rows], state.ema_slow[rows] = ema_fast, ema_slow
+    state.macd_signal[rows] = _smooth(state.macd_signal[rows], ema_fast - ema_slow, count, 2.0 / (MACD_SIGNAL + 1))
+
+    head = state.head[rows]
+    for period in state.sums:
+        evicted = state.buffer[rows, (head - period) % WINDOW]
+        present = ~np.isnan(evicted)
+        state.sums[period][rows] += c - np.where(present, evicted, 0.0)
+        state.counts[period][rows] += 1 - present
+        if period == BB_PERIOD:
+            state.sumsq[rows] += c ** 2 - np.where(present, evicted, 0.0) ** 2
+    state.buffer[rows, head % WINDOW] = c
+    state.head[rows] = (head + 1) % WINDOW
+
+    state.prev_close[rows] = c
+    state.count[rows] = count
+    if ts is not None:
+        state.last_ts[rows] = ts[rows]
+    return state
+
+def compute_indicators(close, high=None, low=None, ts=None, symbols=None):
+    """Build indicator state from (assets × time) matrices, oldest bar first
+
+    Rows may be padded with NaN where an asset has fewer bars. The loop runs
+    over time only; each step updates all assets at once.
+    """
+    state = IndicatorState(symbols if symbols is not None else range(close.shape[0]))
+    for t in range(close.shape[1]):
+        advance(
+            state,
+            close[:, t],
+            None if high is None else high[:, t],
+            None if low is None else low[:, t],
+            None if ts is None else ts[:, t]
+        )
+    return state
+
+def latest(state):
+    """Current indicator values for every asset as {name: vector}, NaN while warming up"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = {}
+        for period in SMA_PERIODS:
+            values[f'sma{period}'] = np.where(state.counts[period] == period, state.sums[period] / period, np.nan)
+
+        full = state.counts[BB_PERIOD] == BB_PERIOD
+        mid = state.sums[BB_PERIOD] / BB_PERIOD
+        std = np.sqrt(np.maximum(state.sumsq / BB_PERIOD - mid ** 2, 0.0))
+        values['bb_mid'] = np.where(full, mid, np.nan)
+        values['bb_upper'] = np.where(full, mid + BB_STD * std, np.nan)
+        values['bb_lower'] = np.where(full, mid - BB_STD * std, np.nan)
+        width = values['bb_upper'] - values['bb_lower']
+        values['bb_pct_b'] = np.where(width > 0, (state.prev_close - values['bb_lower']) / width, np.nan)
+
+        rs = state.avg_gain / state.avg_loss
+        rsi = np.where(state.avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+        values['rsi'] = np.where(state.count > RSI_PERIOD, rsi, np.nan)
+
+        macd_ready = state.count >= MACD_SLOW
+        macd = state.ema_fast - state.ema_slow
+        values['macd'] = np.where(macd_ready, macd, np.nan)
+        values['macd_signal'] = np.where(macd_ready, state.macd_signal, np.nan)
+        values['macd_hist'] = np.where(macd_ready, macd - state.macd_signal, np.nan)
+
+        values['atr'] = np.where(state.count >= ATR_PERIOD, state.atr, np.nan)
+        values['atr_pct'] = values['atr'] / state.prev_close * 100
+    return values
+
+def to_records(state, values):
+    """{symbol: {name: float or None}} for JSON and HTML consumers"""
+    records = {}
+    for i, symbol in enumerate(state.symbols):
+        records[symbol] = {name: (None if np.isnan(v[i]) else round(float(v[i]), 6)) for name, v in values.items()}
+    return records
+
+def _pending_matrix(bar_rows):
+    """Left-align per-asset bar arrays into NaN-padded (assets × time) matrices"""
+    width = max((len(bars) for bars in bar_rows), default=0)
+    shape = (len(bar_rows), width)
+    close, high, low = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    ts = np.zeros(shape, dtype=np.int64)
+    for i, bars in enumerate(bar_rows):
+        n = len(bars)
+        close[i, :n], high[i, :n], low[i, :n], ts[i, :n] = bars['close'], bars['high'], bars['low'], bars['ts']
+    return close, high, low, ts
+
+def update_indicators(store, symbols, path=INDICATOR_STATE_PATH):
+    """Advance the persisted indicator state with newly stored bars
+
+    Only finalized bars (all but each symbol's newest) are committed to the
+    state on disk; the newest, still-forming bar is applied to a copy so
+    intraday revisions never get counted twice. The state is rebuilt from the
+    last LOOKBACK_BARS when the symbol list changes or the store replaced a
+    symbol's history (new split or dividend adjustment). Returns
+    {symbol: {indicator: value}}.
+    """
+    state = IndicatorState.load(path)
+    if (state is None or state.symbols != list(symbols)
+            or history_rewritten(store, symbols, state.last_ts, state.prev_close)):
+        state = IndicatorState(symbols)
+
+    finalized, newest = [], []
+    for i, symbol in enumerate(symbols):
+        bars = store.tail(symbol, LOOKBACK_BARS)
+        bars = bars[bars['ts'] > state.last_ts[i]]
+        finalized.append(bars[:-1])
+        newest.append(bars[-1:])
+
+    close, high, low, ts = _pending_matrix(finalized)
+    for t in range(close.shape[1]):
+        advance(state, close[:, t], high[:, t], low[:, t], ts[:, t])
+    state.save(path)
+
+    live = state.copy()
+    close, high, low, ts = _pending_matrix(newest)
+    if close.shape[1]:
+        advance(live, close[:, 0], high[:, 0], low[:, 0], ts[:, 0])
+    return to_records(live, latest(live))
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Makro-Snapshot mit Cache
+Inflation, Leitzinsen, Arbeitslosigkeit und GDP kommen aus einer austauschbaren
+Quelle (lokale Datei oder HTTP) und werden bis zur nächsten Veröffentlichung
+der jeweiligen Reihe lokal zwischengespeichert
+"""
+
+import json
+import os
+import urllib.request
+from datetime import date, datetime, timedelta, timezone
+
+MACRO_SOURCE_DEFAULT = 'macro_snapshot.json'
+MACRO_CACHE_PATH = os.path.join('data', 'macro_cache.json')
+RETRY_INTERVAL = timedelta(hours=1)
+UNSCHEDULED_INTERVAL = timedelta(days=42)
+# Actual releases land up to a week off the nominal calendar day
+RELEASE_SLACK = timedelta(days=7)
+# A release this far overdue is given up until the next scheduled date
+OVERDUE_WINDOW = timedelta(days=3)
+
+# Display rules per series; better = direction that is good for risk assets
+SERIES = {
+    'us_inflation': {'label': 'US Inflation', 'decimals': 1, 'better': 'lower'},
+    'fed_rate': {'label': 'Fed Rate', 'decimals': 2, 'better': 'lower'},
+    'unemployment': {'label': 'Unemployment', 'decimals': 1, 'better': 'lower'},
+    'gdp_growth': {'label': 'GDP Growth', 'decimals': 1, 'better': 'higher'},
+    'ecb_rate': {'label': 'ECB Rate', 'decimals': 2, 'better': 'lower'}
+}
+MACRO_GRID = ('us_inflation', 'fed_rate', 'unemployment', 'gdp_growth')
+
+# Used only when neither the source nor the cache can be read
+FALLBACK_SNAPSHOT = {
+    'series': {
+        'us_inflation': {'value': 2.9, 'previous': 2.8, 'released': '2026-08-12'},
+        'fed_rate': {'value': 4.50, 'previous': 4.50, 'released': '2026-07-29'},
+        'unemployment': {'value': 4.1, 'previous': 4.2, 'released': '2026-08-07'},
+        'gdp_growth': {'value': 2.4, 'previous': 2.2, 'released': '2026-07-30'},
+        'ecb_rate': {'value': 3.0, 'previous': 3.0, 'released': '2026-07-23'}
+    }
+}
+
+# Policy decisions (announcement days); later dates fall back to UNSCHEDULED_INTERVAL
+FOMC_DECISIONS = ['2026-01-28', '2026-03-18', '2026-04-29', '2026-06-17', '2026-07-29', '2026-09-16', '2026-10-28', '2026-12-09']
+ECB_DECISIONS = ['2026-02-05', '2026-03-19', '2026-04-30', '2026-06-11', '2026-07-23', '2026-09-10', '2026-10-29', '2026-12-17']
+
+def _first_weekday(year, month, weekday):
+    day = date(year, month, 1)
+    return day + timedelta(days=(weekday - day.weekday()) % 7)
+
+def _last_weekday(year, month, weekday):
+    last = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1))
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _next_monthly(after, day_of_month):
+    """First date > after produced by day_of_month(year, month)"""
+    year, month = after.year, after.month
+    for _ in range(3):
+        candidate = day_of_month(year, month)
+        if candidate > after:
+            return candidate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return after + UNSCHEDULED_INTERVAL
+
+def _next_listed(after, dates):
+    for raw in dates:
+        candidate = date.fromisoformat(raw)
+        if candidate > after:
+            return candidate
+    return after + UNSCHEDULED_INTERVAL
+
+RELEASE_SCHEDULES = {
+    'us_inflation': lambda after: _next_monthly(after, lambda y, m: date(y, m, 13)),          # CPI, mid-month
+    'unemployment': lambda after: _next_monthly(after, lambda y, m: _first_weekday(y, m, 4)),  # jobs report, 1st Friday
+    'gdp_growth': lambda after: _next_monthly(after, lambda y, m: _last_weekday(y, m, 3)),     # GDP estimates, last Thursday
+    'fed_rate': lambda after: _next_listed(after, FOMC_DECISIONS),
+    'ecb_rate': lambda after: _next_listed(after, ECB_DECISIONS)
+}
+
+def _schedule(name):
+    return RELEASE_SCHEDULES.get(name, lambda after: after + UNSCHEDULED_INTERVAL)
+
+def next_release(name, entry):
+    """Date the series is expected to change next; a next_release in the snapshot wins
+
+    The scheduled date nearest to released is the release the entry already
+    holds (it may land a few days off the nominal day), so the next one is
+    the first scheduled date more than RELEASE_SLACK after it.
+    """
+    if entry.get('next_release'):
+        return date.fromisoformat(entry['next_release'])
+    released = date.fromisoformat(entry['released']) if entry.get('released') else date.today()
+    return _schedule(name)(released + RELEASE_SLACK)
+
+class FileMacroSource:
+    """Snapshot from a local JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.key = os.path.abspath(path)
+
+    def fetch(self):
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+class HttpMacroSource:
+    """Snapshot from a JSON endpoint (e.g. python -m http.server serving macro_snapshot.json)"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.key = url
+        self.timeout = timeout
+
+    def fetch(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+def make_macro_source(spec):
+    if spec.startswith(('http://', 'https://')):
+        return HttpMacroSource(spec)
+    return FileMacroSource(spec)
+
+def _validate(snapshot):
+    series = snapshot.get('series', {})
+    missing = [name for name in SERIES if name not in series or 'value' not in series[name]]
+    if missing:
+        raise ValueError(f"Makro-Snapshot unvollständig: {', '.join(missing)}")
+    return snapshot
+
+def expires_at(snapshot, now):
+    """Cache expiry: the earliest upcoming release, or a short retry if one is already due
+
+    A release that is more than OVERDUE_WINDOW late (a source that is not
+    kept up to date) stops the hourly retries; the series then waits for its
+    next scheduled date after now.
+    """
+    today = now.date()
+    upcoming = []
+    for name in SERIES:
+        due = next_release(name, snapshot['series'][name])
+        if due + OVERDUE_WINDOW < today:
+            due = _schedule(name)(today)
+        upcoming.append(due)
+    first = min(upcoming)
+    expiry = datetime(first.year, first.month, first.day, tzinfo=timezone.utc)
+    return expiry if expiry > now else now + RETRY_INTERVAL
+
+def load_macro_snapshot(source, cache_path=MACRO_CACHE_PATH, now=None):
+    """Return (snapshot, origin) where origin is 'cache', 'source', 'stale-cache' or 'fallback'
+
+    The source is only contacted once the cached snapshot reaches the next
+    scheduled release of any of its series. The cache only serves the source
+    it was filled from.
+    """
+    now = now or datetime.now(timezone.utc)
+    cache = None
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('source') != source.key:
+            cache = None
+        elif now < datetime.fromisoformat(cache['expires_at']):
+            return cache['snapshot'], 'cache'
+    except (OSError, ValueError, KeyError):
+        pass
+
+    try:
+        snapshot = _validate(source.fetch())
+    except Exception as e:
+        print(f"  ⚠️  Makro-Quelle nicht erreichbar: {str(e)}")
+        if cache and 'snapshot' in cache:
+            return cache['snapshot'], 'stale-cache'
+        return FALLBACK_SNAPSHOT, 'fallback'
+
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'source': source.key, 'snapshot': snapshot, 'fetched_at': now.isoformat(), 'expires_at': expires_at(snapshot, now).isoformat()}, f, indent=2)
+    os.replace(tmp_path, cache_path)
+    return snapshot, 'source'
+
+def snapshot_values(snapshot):
+    """{series: value} as used by the scoring rules"""
+    return {name: float(entry['value']) for name, entry in snapshot['series'].items()}
+
+def format_value(snapshot, name):
+    return f"{snapshot['series'][name]['value']:.{SERIES[name]['decimals']}f}%"
+
+def format_change(snapshot, name):
+    """Change badge text and CSS color versus the previous release"""
+    entry = snapshot['series'][name]
+    decimals = SERIES[name]['decimals']
+    previous = entry.get('previous')
+    change = round(entry['value'] - previous, decimals) if previous is not None else 0.0
+    if change == 0:
+        return f"{0:.{decimals}f}%", "var(--text-secondary)"
+    improving = (change < 0) == (SERIES[name]['better'] == 'lower')
+    color = "var(--accent-bullish)" if improving else "var(--accent-bearish)"
+    return f"{change:+.{decimals}f}%", color
+
+FALLBACK_VALUES = snapshot_values(FALLBACK_SNAPSHOT)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Handelskalender pro Asset-Klasse
+Handelszeiten und Feiertage entscheiden, ob ein Symbol seit dem letzten
+Abruf überhaupt neue Kurse haben kann – sonst entfällt der Netzwerkabruf
+"""
+
+from datetime import datetime, time, timedelta, timezone
+
+import pytz
+
+EXCHANGE_TZ = pytz.timezone('America/New_York')
+
+# Yahoo delivers with a delay, so a closed session is fetched once more afterwards
+POST_CLOSE_GRACE = timedelta(minutes=30)
+MAX_SKIP = timedelta(days=7)
+
+# NYSE full-day closures; later dates count as regular trading days
+NYSE_HOLIDAYS = [
+    '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25', '2026-06-19',
+    '2026-07-03', '2026-09-07', '2026-11-26', '2026-12-25',
+    '2027-01-01', '2027-01-18', '2027-02-15', '2027-03-26', '2027-05-31', '2027-06-18',
+    '2027-07-05', '2027-09-06', '2027-11-25', '2027-12-24'
+]
+NYSE_EARLY_CLOSES = ['2026-11-27', '2026-12-24', '2027-11-26']
+# COMEX Globex closes fully only on these; other US holidays trade a shortened session
+COMEX_HOLIDAYS = ['2026-01-01', '2026-04-03', '2026-12-25', '2027-01-01', '2027-03-26', '2027-12-24']
+
+MIDNIGHT = time(0, 0)
+END_OF_DAY = time(23, 59, 59, 999999)
+
+def _equity_sessions(day):
+    if day.weekday() >= 5 or day.isoformat() in NYSE_HOLIDAYS:
+        return []
+    close = time(13, 0) if day.isoformat() in NYSE_EARLY_CLOSES else time(16, 0)
+    return [(time(9, 30), close)]
+
+def _forex_sessions(day):
+    # Sunday 17:00 to Friday 17:00 New York time
+    weekday = day.weekday()
+    if weekday == 6:
+        return [(time(17, 0), END_OF_DAY)]
+    if weekday == 4:
+        return [(MIDNIGHT, time(17, 0))]
+    if weekday == 5:
+        return []
+    return [(MIDNIGHT, END_OF_DAY)]
+
+def _comex_sessions(day):
+    # Sunday-Friday 18:00-17:00 New York time with a daily one-hour break
+    weekday = day.weekday()
+    if day.isoformat() in COMEX_HOLIDAYS or weekday == 5:
+        return []
+    if weekday == 6:
+        return [(time(18, 0), END_OF_DAY)]
+    if weekday == 4:
+        return [(MIDNIGHT, time(17, 0))]
+    return [(MIDNIGHT, time(17, 0)), (time(18, 0), END_OF_DAY)]
+
+def _always(day):
+    return [(MIDNIGHT, END_OF_DAY)]
+
+# asset type -> function(exchange-local date) -> [(open, close)] local times
+SESSIONS = {
+    'index': _equity_sessions,
+    'commodity': _comex_sessions,
+    'forex': _forex_sessions,
+    'crypto': _always
+}
+
+def sessions_between(asset_type, start, end):
+    """(open, close) UTC datetimes of all sessions overlapping [start, end]"""
+    day_sessions = SESSIONS.get(asset_type, _always)
+    day = start.astimezone(EXCHANGE_TZ).date() - timedelta(days=1)
+    last_day = end.astimezone(EXCHANGE_TZ).date()
+    found = []
+    while day <= last_day:
+        for opens, closes in day_sessions(day):
+            session = (
+                EXCHANGE_TZ.localize(datetime.combine(day, opens)).astimezone(timezone.utc),
+                EXCHANGE_TZ.localize(datetime.combine(day, closes)).astimezone(timezone.utc)
+            )
+            if session[0] <= end and session[1] >= start:
+                found.append(session)
+        day += timedelta(days=1)
+    return found
+
+def needs_fetch(asset_type, last_fetch, now=None):
+    """Whether the market can have produced new bars since last_fetch
+
+    True while a session is running, and once more after it closes (within
+    POST_CLOSE_GRACE, for delayed final prints). Symbols never fetched, or
+    not fetched for MAX_SKIP, are always due.
+    """
+    now = now or datetime.now(timezone.utc)
+    if last_fetch is None or now - last_fetch > MAX_SKIP:
+        return True
+    sessions = sessions_between(asset_type, last_fetch - POST_CLOSE_GRACE, now)
+    return any(closes + POST_CLOSE_GRACE > last_fetch for _, closes in sessions)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Lokaler OHLCV-Speicher pro Symbol
+Feste Binär-Records (ts, open, high, low, close, volume), per np.memmap lesbar
+"""
+
+import os
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+OHLCV_DIR = os.path.join('data', 'ohlcv')
+BAR_DTYPE = np.dtype([
+    ('ts', '<i8'),       # bar date as UTC epoch seconds (midnight)
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8')
+])
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+# Adjusted closes of the same finished bar differ by more than this after a split or dividend
+ADJUSTMENT_TOLERANCE = 1e-6
+
+def _day_to_ts(day):
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+
+def _ts_to_day(ts):
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).date()
+
+class OHLCVStore:
+    """Append-only daily bar store, one fixed-width record file per symbol
+
+    The only in-place write is a revision of the newest bar, because today's
+    bar keeps changing until the session closes. Prices are split- and
+    dividend-adjusted as the provider delivers them; when a new adjustment
+    rewrites older bars (see adjustment_changed), the symbol's history is
+    replaced as a whole instead of appended to.
+    """
+
+    def __init__(self, root=OHLCV_DIR):
+        self.root = root
+
+    def path(self, symbol):
+        return os.path.join(self.root, quote(symbol, safe='') + '.bin')
+
+    def _open(self, symbol):
+        path = self.path(symbol)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        count = size // BAR_DTYPE.itemsize
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+
+    def count(self, symbol):
+        try:
+            return os.path.getsize(self.path(symbol)) // BAR_DTYPE.itemsize
+        except OSError:
+            return 0
+
+    def last_date(self, symbol):
+        """Date of the newest stored bar, or None if the symbol is unknown"""
+        path = self.path(symbol)
+        count = self.count(symbol)
+        if count == 0:
+            return None
+        with open(path, 'rb') as f:
+            f.seek((count - 1) * BAR_DTYPE.itemsize)
+            record = np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)
+        return _ts_to_day(record['ts'][0])
+
+    def overlap_date(self, symbol):
+        """Date a delta download starts from: the last finished bar, so the response can be checked against it"""
+        count = self.count(symbol)
+        if count == 0:
+            return None
+        return _ts_to_day(self._open(symbol)['ts'][max(0, count - 2)])
+
+    def first_date(self, symbol):
+        bars = self._open(symbol)
+        return None if bars is None else _ts_to_day(bars['ts'][0])
+
+    def adjustment_changed(self, symbol, hist):
+        """Whether hist prices a stored finished bar differently (a split or dividend since it was stored)
+
+        The newest stored bar is left out, it may still have been forming.
+        """
+        bars = self._open(symbol)
+        if bars is None or len(bars) < 2 or hist is None or len(hist) == 0:
+            return False
+        finished = bars[:-1]
+        records = frame_to_records(hist)
+        idx = np.searchsorted(finished['ts'], records['ts'])
+        inside = idx < len(finished)
+        idx, records = idx[inside], records[inside]
+        same = finished['ts'][idx] == records['ts']
+        stored, fetched = finished['close'][idx[same]], records['close'][same]
+        return bool(np.any(np.abs(fetched - stored) > ADJUSTMENT_TOLERANCE * np.abs(stored)))
+
+    def close_as_of(self, symbol, ts):
+        """Close of the newest bar at or before ts (epoch seconds), NaN if there is none"""
+        bars = self._open(symbol)
+        if bars is None:
+            return np.nan
+        i = int(np.searchsorted(bars['ts'], ts, side='right')) - 1
+        return float(bars['close'][i]) if i >= 0 else np.nan
+
+    def replace(self, symbol, hist):
+        """Swap the symbol's whole history for hist (atomic); returns the number of bars written"""
+        records = frame_to_records(hist)
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(symbol)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+        return len(records)
+
+    def append(self, symbol, hist):
+        """Store the bars of a daily history frame that are not older than the newest bar
+
+        Returns the number of bars written (a revised last bar counts as one).
+        """
+        if hist is None or len(hist) == 0:
+            return 0
+        records = frame_to_records(hist)
+        count = self.count(symbol)
+        last_ts = None
+        if count:
+            last_ts = int(self._open(symbol)['ts'][-1])
+            records = records[records['ts'] >= last_ts]
+        if len(records) == 0:
+            return 0
+
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(symbol)
+        with open(path, 'r+b' if count else 'wb') as f:
+            if last_ts is not None and records['ts'][0] == last_ts:
+                f.seek((count - 1) * BAR_DTYPE.itemsize)
+            else:
+                f.seek(count * BAR_DTYPE.itemsize)
+            f.write(records.tobytes())
+        return len(records)
+
+    def read(self, symbol, start=None, end=None):
+        """Bars with start <= date <= end as a structured array (memory-mapped slice)"""
+        bars = self._open(symbol)
+        if bars is None:
+            return np.empty(0, dtype=BAR_DTYPE)
+        ts = bars['ts']
+        lo = 0 if start is None else int(np.searchsorted(ts, _day_to_ts(start), side='left'))
+        hi = len(bars) if end is None else int(np.searchsorted(ts, _day_to_ts(end), side='right'))
+        return bars[lo:hi]
+
+    def tail(self, symbol, n):
+        """The newest n bars as a structured array"""
+        bars = self._open(symbol)
+        if bars is None:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return bars[-n:]
+
+    def read_frame(self, symbol, start=None, end=None):
+        return records_to_frame(self.read(symbol, start, end))
+
+    def tail_frame(self, symbol, n):
+        return records_to_frame(self.tail(symbol, n))
+
+def frame_to_records(hist):
+    """Convert a yfinance-style daily frame (Open/High/Low/Close/Volume) to records"""
+    hist = hist.dropna(subset=['Close'])
+    records = np.empty(len(hist), dtype=BAR_DTYPE)
+    records['ts'] = [_day_to_ts(ts.date()) for ts in hist.index]
+    for field in FIELDS:
+        column = field.capitalize()
+        if column in hist:
+            records[field] = hist[column].to_numpy(dtype=float)
+        else:
+            records[field] = 0.0 if field == 'volume' else hist['Close'].to_numpy(dtype=float)
+    records = records[np.argsort(records['ts'], kind='stable')]
+    # yfinance can repeat the last row while a bar is still forming; keep the newest
+    keep = np.append(records['ts'][1:] != records['ts'][:-1], True)
+    return records[keep]
+
+def records_to_frame(records):
+    """Convert stored records back to a frame shaped like yfinance history()"""
+    index = pd.to_datetime(np.asarray(records['ts']), unit='s')
+    return pd.DataFrame({field.capitalize(): np.asarray(records[field]) for field in FIELDS}, index=index)
+
+def history_rewritten(store, symbols, last_ts, prev_close):
+    """Whether any symbol's stored close at last_ts no longer matches prev_close
+
+    Incremental states (indicators, correlation) keep the last close they
+    consumed; a mismatch means the store replaced that symbol's history
+    and the state has to be rebuilt.
+    """
+    last_ts = np.broadcast_to(np.asarray(last_ts), (len(symbols),))
+    for symbol, ts, seen in zip(symbols, last_ts, prev_close):
+        if ts <= 0 or not np.isfinite(seen):
+            continue
+        stored = store.close_as_of(symbol, int(ts))
+        if np.isfinite(stored) and abs(stored - seen) > ADJUSTMENT_TOLERANCE * abs(seen):
+            return True
+    return False
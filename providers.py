@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Marktdaten-Provider
+Die gesamte Pipeline holt Kurse über diese Schnittstelle: Yahoo live,
+oder aufgezeichnete Antworten aus lokalen Dateien (Replay) für Benchmarks
+"""
+
+import abc
+import io
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import timedelta
+from urllib.parse import quote, unquote, urlencode
+
+import pandas as pd
+import yfinance as yf
+
+PERIOD_DAYS = {'1d': 1, '5d': 5, '1mo': 31, '3mo': 92, '6mo': 183, '1y': 365, '2y': 730, '5y': 1826}
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class FetchError(Exception):
+    """A request failed as a whole; retryable errors (rate limits, 5xx, timeouts) may succeed later"""
+
+    def __init__(self, message, retryable=True, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+class DataProvider(abc.ABC):
+    """Source of daily OHLCV bars
+
+    history() returns {symbol: frame or None}; a frame has a DatetimeIndex and
+    Open/High/Low/Close/Volume columns like yfinance's history(). Symbols the
+    source cannot serve map to None instead of raising, so one bad symbol
+    never fails a whole batch. batched providers serve many symbols per
+    request; the others make one request per symbol.
+    """
+
+    name = 'base'
+    batched = True
+
+    @abc.abstractmethod
+    def history(self, symbols, period="1y", start=None):
+        """{symbol: frame or None} for the requested symbols"""
+
+    def begin_run(self, metrics=None):
+        """Called once at the start of every update run; metrics is the run's telemetry.RunMetrics or None"""
+
+class YahooProvider(DataProvider):
+    """Live Yahoo Finance data through batched yf.download requests"""
+
+    name = 'yahoo'
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+
+    def history(self, symbols, period="1y", start=None):
+        frame = yf.download(
+            symbols,
+            period=None if start else period,
+            start=start,
+            interval="1d",
+            group_by='ticker',
+            auto_adjust=True,
+            threads=self.max_workers,
+            progress=False
+        )
+
+        histories = {}
+        for symbol in symbols:
+            try:
+                hist = frame[symbol] if isinstance(frame.columns, pd.MultiIndex) else frame
+                # Batched frames share one date index, so drop the rows this symbol did not trade
+                hist = hist.dropna(subset=['Close'])
+                histories[symbol] = hist if len(hist) else None
+            except KeyError:
+                histories[symbol] = None
+        return histories
+
+def replay_path(directory, symbol):
+    return os.path.join(directory, quote(symbol, safe='') + '.csv')
+
+def write_replay_file(directory, symbol, hist):
+    """Merge a history frame into the symbol's replay CSV"""
+    os.makedirs(directory, exist_ok=True)
+    path = replay_path(directory, symbol)
+    hist = hist[[c for c in HISTORY_COLUMNS if c in hist]].copy()
+    if hist.index.tz is not None:
+        hist.index = hist.index.tz_localize(None)
+    hist.index = hist.index.normalize()
+    if os.path.exists(path):
+        hist = pd.concat([read_replay_file(path), hist])
+        hist = hist[~hist.index.duplicated(keep='last')].sort_index()
+    hist.to_csv(path, index_label='Date')
+
+def read_replay_file(path):
+    return pd.read_csv(path, index_col='Date', parse_dates=['Date'])
+
+class ReplayProvider(DataProvider):
+    """Replays recorded daily bars from <directory>/<symbol>.csv
+
+    "Now" is the newest bar in each file, so periods are deterministic no
+    matter when the replay runs. latency (seconds per request) and
+    error_rate (probability a symbol fails) simulate a slow or flaky vendor;
+    pass a seed to make the injected failures reproducible.
+    """
+
+    name = 'replay'
+
+    def __init__(self, directory, latency=0.0, error_rate=0.0, seed=None):
+        self.directory = directory
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def symbols(self):
+        """All symbols that have a recording"""
+        return sorted(unquote(f[:-4]) for f in os.listdir(self.directory) if f.endswith('.csv'))
+
+    def _frame(self, symbol):
+        with self._lock:
+            if symbol not in self._frames:
+                path = replay_path(self.directory, symbol)
+                self._frames[symbol] = read_replay_file(path) if os.path.exists(path) else None
+            return self._frames[symbol]
+
+    def history(self, symbols, period="1y", start=None):
+        if self.latency:
+            time.sleep(self.latency)
+
+        histories = {}
+        for symbol in symbols:
+            hist = self._frame(symbol)
+            if hist is None or len(hist) == 0 or self.random.random() < self.error_rate:
+                histories[symbol] = None
+                continue
+            if start:
+                begin = pd.Timestamp(start)
+            else:
+                begin = hist.index[-1] - timedelta(days=PERIOD_DAYS.get(period, 365))
+            histories[symbol] = hist[hist.index >= begin]
+        return histories
+
+class HttpProvider(DataProvider):
+    """Daily bars from an HTTP endpoint serving one CSV per symbol
+
+    GET <base_url>/history?symbol=...&period=...[&start=...] returns the
+    replay CSV format (see fake_market_server.py). 404 means unknown symbol;
+    429, 5xx and network errors raise a retryable FetchError.
+    """
+
+    name = 'http'
+    batched = False
+
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _get(self, symbol, period, start):
+        query = {'symbol': symbol, 'period': period}
+        if start:
+            query['start'] = start
+        url = f"{self.base_url}/history?{urlencode(query)}"
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                body = response.read()
+            hist = read_replay_file(io.StringIO(body.decode('utf-8')))
+            hist.attrs['bytes'] = len(body)  # wire size for the run telemetry
+            return hist
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            retry_after = e.headers.get('Retry-After')
+            raise FetchError(f"HTTP {e.code} für {symbol}", retryable=e.code == 429 or e.code >= 500,
+                             retry_after=float(retry_after) if retry_after else None)
+        except (urllib.error.URLError, OSError) as e:
+            raise FetchError(f"{symbol}: {e}")
+
+    def history(self, symbols, period="1y", start=None):
+        return {symbol: self._get(symbol, period, start) for symbol in symbols}
+
+class RecordingProvider(DataProvider):
+    """Passes requests through to another provider and records every response for replay"""
+
+    name = 'recording'
+
+    def __init__(self, provider, directory):
+        self.provider = provider
+        self.directory = directory
+        self.batched = provider.batched
+
+    def begin_run(self, metrics=None):
+        self.provider.begin_run(metrics)
+
+    def history(self, symbols, period="1y", start=None):
+        histories = self.provider.history(symbols, period=period, start=start)
+        for symbol, hist in histories.items():
+            if hist is not None and len(hist):
+                write_replay_file(self.directory, symbol, hist)
+        return histories
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Robuster Abruf
+Rate-Limit (Token Bucket), begrenzte Wiederholungen mit Jitter-Backoff,
+Circuit Breaker pro Symbol und eine Deadline für den gesamten Lauf – als
+Hülle um jeden DataProvider
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from providers import DataProvider, FetchError
+from telemetry import frame_bytes
+
+BREAKER_PATH = os.path.join('data', 'circuit_breakers.json')
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 30 * 60
+BREAKER_MAX_COOLDOWN = 6 * 60 * 60
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+class TokenBucket:
+    """Thread-safe rate limiter: rate tokens per second, bursts up to capacity"""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, deadline=None):
+        """Wait for a token; False if none is available before the deadline"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and wait > deadline.remaining():
+                return False
+            self.sleep(wait)
+
+class Deadline:
+    """Wall-clock budget for one run; None seconds means unlimited"""
+
+    def __init__(self, seconds=None, clock=time.monotonic):
+        self.clock = clock
+        self.ends = None if seconds is None else clock() + seconds
+
+    def remaining(self):
+        return float('inf') if self.ends is None else max(0.0, self.ends - self.clock())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+class CircuitBreakers:
+    """Per-symbol breakers persisted across runs
+
+    After BREAKER_THRESHOLD consecutive failures a symbol is skipped until
+    its cooldown ends; then one trial request is let through (half-open). A
+    failed trial re-opens the breaker with twice the cooldown, a success
+    resets it.
+    """
+
+    def __init__(self, path=BREAKER_PATH, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.path = path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = {}
+        try:
+            with open(path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def allow(self, symbol, now=None):
+        entry = self.state.get(symbol)
+        return not entry or entry.get('open_until', 0) <= (now or time.time())
+
+    def success(self, symbol):
+        self.state.pop(symbol, None)
+
+    def failure(self, symbol, now=None):
+        now = now or time.time()
+        entry = self.state.setdefault(symbol, {'failures': 0})
+        entry['failures'] += 1
+        if entry['failures'] >= self.threshold:
+            # A failed half-open trial doubles the previous cooldown
+            cooldown = min(BREAKER_MAX_COOLDOWN, entry.get('cooldown', self.cooldown / 2) * 2)
+            entry['cooldown'] = cooldown
+            entry['open_until'] = now + cooldown
+            return True
+        return False
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+def backoff_delay(attempt, rng=random, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Full-jitter exponential backoff before retry number attempt + 1"""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+class ResilientProvider(DataProvider):
+    """Wraps a provider with rate limiting, retries, circuit breakers and a run deadline
+
+    Batched providers get one request per batch, the others one request per
+    symbol, spread over max_workers threads. Every request takes a token from
+    the shared bucket. FetchError and transport errors (OSError) are logged
+    and retried; any other exception is a bug and propagates. Symbols that
+    still fail after retries, are skipped by an open breaker or run into
+    the deadline map to None, so the caller falls back to stored data.
+    With run metrics, every symbol's latency, retries, bytes and outcome
+    is recorded.
+    """
+
+    name = 'resilient'
+
+    def __init__(self, provider, rate=2.0, burst=None, retries=3, deadline=None,
+                 max_workers=8, breakers=None, seed=None):
+        self.provider = provider
+        self.batched = provider.batched
+        self.limiter = TokenBucket(rate, burst)
+        self.retries = retries
+        self.deadline_seconds = deadline
+        self.deadline = Deadline(deadline)
+        self.max_workers = max_workers
+        self.breakers = breakers if breakers is not None else CircuitBreakers()
+        self.random = random.Random(seed)
+        self.metrics = None
+
+    def begin_run(self, metrics=None):
+        self.deadline = Deadline(self.deadline_seconds)
+        self.metrics = metrics
+        self.provider.begin_run(metrics)
+
+    def _request(self, symbols, period, start):
+        """One request with retries
+
+        Returns ({symbol: frame} for the symbols that succeeded, symbols that
+        failed). Symbols never requested because of the deadline are in
+        neither, so they do not count against their breakers.
+        """
+        pending, fetched, attempts = list(symbols), {}, 0
+        done = {}  # symbol -> (seconds, attempts) until it succeeded
+        label = symbols[0] if len(symbols) == 1 else f"{symbols[0]} ... {symbols[-1]}"
+        for attempt in range(self.retries + 1):
+            if self.deadline.expired() or not self.limiter.acquire(self.deadline):
+                break
+            if not attempts:
+                # Latency counts from the first request, not the wait for the rate limit
+                started = time.perf_counter()
+            attempts += 1
+            retry_after = 0.0
+            try:
+                histories = self.provider.history(pending, period=period, start=start)
+            except FetchError as e:
+                print(f"  ⚠️  {label}: {e}")
+                if not e.retryable:
+                    break
+                histories, retry_after = {}, e.retry_after or 0.0
+            except OSError as e:
+                # Transport errors the provider did not wrap (socket, TLS, timeouts); programming errors propagate
+                print(f"  ⚠️  {label}: {type(e).__name__}: {e}")
+                histories = {}
+            fetched.update({symbol: hist for symbol, hist in histories.items() if hist is not None})
+            for symbol in pending:
+                if symbol in fetched:
+                    done[symbol] = (time.perf_counter() - started, attempts)
+            pending = [symbol for symbol in pending if symbol not in fetched]
+            if not pending or attempt == self.retries:
+                break
+            delay = max(retry_after, backoff_delay(attempt, self.random))
+            if delay >= self.deadline.remaining():
+                break
+            print(f"  🔁 {label}: Versuch {attempt + 2}/{self.retries + 1} in {delay:.1f}s")
+            time.sleep(delay)
+        if self.metrics is not None and attempts:
+            failed_after = (time.perf_counter() - started, attempts)
+            for symbol in symbols:
+                seconds, symbol_attempts = done.get(symbol, failed_after)
+                self.metrics.fetch(symbol, seconds, symbol_attempts, frame_bytes(fetched.get(symbol)),
+                                   'ok' if symbol in fetched else 'failed')
+        return fetched, (pending if attempts else [])
+
+    def _record_deadline(self, symbols):
+        if self.metrics is not None:
+            for symbol in symbols:
+                self.metrics.fetch(symbol, 0.0, 0, 0, 'deadline')
+
+    def history(self, symbols, period="1y", start=None):
+        results = {symbol: None for symbol in symbols}
+        now = time.time()
+        allowed = [symbol for symbol in symbols if self.breakers.allow(symbol, now)]
+        if self.metrics is not None:
+            for symbol in set(symbols).difference(allowed):
+                self.metrics.fetch(symbol, 0.0, 0, 0, 'breaker')
+        if len(allowed) < len(symbols):
+            print(f"  🔌 {len(symbols) - len(allowed)} Symbole übersprungen (Circuit Breaker offen)")
+        if self.deadline.expired():
+            print("  ⏳ Deadline erreicht – keine weiteren Abrufe")
+            self._record_deadline(allowed)
+            return results
+
+        requests = [allowed] if self.batched else [[symbol] for symbol in allowed]
+        requests = [request for request in requests if request]
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(requests)))) as pool:
+            for fetched, request_failed in pool.map(lambda request: self._request(request, period, start), requests):
+                results.update(fetched)
+                failed += request_failed
+
+        not_requested = [symbol for symbol in allowed if results[symbol] is None and symbol not in failed]
+        if not_requested:
+            print(f"  ⏳ Deadline: {len(not_requested)} Symbole nicht abgerufen")
+            self._record_deadline(not_requested)
+        for symbol in allowed:
+            if results[symbol] is not None:
+                self.breakers.success(symbol)
+        for symbol in failed:
+            if self.breakers.failure(symbol):
+                print(f"  🔌 {symbol}: Circuit Breaker offen für {self.breakers.state[symbol]['cooldown'] / 60:.0f} Min.")
+        self.breakers.save()
+        return results
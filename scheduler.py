@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Dauerbetrieb mit asyncio
+Jede Asset-Klasse hat ihren eigenen Aktualisierungstakt; ein Tick holt nur
+die fälligen Symbole, alle anderen Karten bleiben aus dem Speicher bestehen
+"""
+
+import asyncio
+import signal
+import time
+
+# Seconds between refreshes per asset type; unknown types use DEFAULT_CADENCE
+REFRESH_CADENCES = {
+    'crypto': 60,
+    'forex': 300,
+    'index': 900,
+    'commodity': 900
+}
+DEFAULT_CADENCE = 900
+
+class RefreshScheduler:
+    """Tracks when each asset type is due next
+
+    Due times advance in whole cadence steps, so a slow tick never shifts the
+    grid; ticks that were missed entirely are skipped instead of replayed.
+    """
+
+    def __init__(self, assets_config, cadences=None, clock=time.monotonic):
+        self.cadences = dict(REFRESH_CADENCES, **(cadences or {}))
+        self.clock = clock
+        self.groups = {}
+        for symbol, _, asset_type in assets_config:
+            self.groups.setdefault(asset_type, []).append(symbol)
+        now = clock()
+        self.next_due = {asset_type: now for asset_type in self.groups}
+
+    def cadence(self, asset_type):
+        return self.cadences.get(asset_type, DEFAULT_CADENCE)
+
+    def due(self, now=None):
+        """Asset types whose refresh is due at now"""
+        now = self.clock() if now is None else now
+        return [asset_type for asset_type, due in self.next_due.items() if due <= now]
+
+    def mark_done(self, asset_types, now=None):
+        now = self.clock() if now is None else now
+        for asset_type in asset_types:
+            step = self.cadence(asset_type)
+            due = self.next_due[asset_type] + step
+            if due <= now:
+                due += ((now - due) // step + 1) * step
+            self.next_due[asset_type] = due
+
+    def symbols(self, asset_types):
+        return [symbol for asset_type in asset_types for symbol in self.groups[asset_type]]
+
+    def seconds_until_due(self, now=None):
+        now = self.clock() if now is None else now
+        return max(0.0, min(self.next_due.values()) - now)
+
+async def run_scheduler(scheduler, tick, max_ticks=None):
+    """Call tick(symbols) in a worker thread whenever asset types fall due
+
+    tick runs one at a time, so the pipeline never overlaps with itself; a
+    failing tick is reported and the loop carries on. SIGINT/SIGTERM stop the
+    loop after the current tick. Returns the number of ticks run.
+    """
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    ticks = 0
+    while not stop.is_set() and (max_ticks is None or ticks < max_ticks):
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=scheduler.seconds_until_due())
+            break
+        except asyncio.TimeoutError:
+            pass
+
+        due = scheduler.due()
+        if not due:
+            continue
+        try:
+            await loop.run_in_executor(None, tick, scheduler.symbols(due))
+        except Exception as e:
+            print(f"❌ Tick fehlgeschlagen ({', '.join(due)}): {str(e)}")
+        scheduler.mark_done(due)
+        ticks += 1
+    return ticks
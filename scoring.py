@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Fundamental-Scoring als Regeltabelle
+Jede Regel: (Asset, Bedingung, Gewicht, Faktor-Text). Die Tabelle wird in
+Arrays kompiliert, damit alle Assets über tausende Makro-Szenarien auf
+einmal bewertet werden können
+"""
+
+import argparse
+import json
+import operator
+import sys
+
+import numpy as np
+
+from macro import FALLBACK_VALUES
+
+MACRO_VARIABLES = ('us_inflation', 'fed_rate', 'unemployment', 'gdp_growth', 'ecb_rate')
+DERIVED_VARIABLES = {
+    'rate_diff': lambda x: x['fed_rate'] - x['ecb_rate']
+}
+MACRO_DEFAULTS = FALLBACK_VALUES
+
+BASE_SCORE = 50
+SCORE_MIN, SCORE_MAX = 10, 95
+BULLISH_AT, BEARISH_AT = 60, 40
+
+# (asset, condition or None, weight, factor text or None)
+# Complementary conditions replace if/else; only one of a pair can fire.
+# Factor texts are format templates over the macro (and derived) variables.
+FUNDAMENTAL_RULES = [
+    ('US100', ('fed_rate', '>', 4.0), -15, "Fed restrictiv ({fed_rate:g}%) belastet Tech-Bewertungen"),
+    ('US100', ('fed_rate', '<=', 4.0), +10, "Niedrigere Zinsen bullish für Growth"),
+    ('US100', ('gdp_growth', '>', 2.0), +15, "GDP {gdp_growth:+.1f}% bestätigt robustes Wachstum"),
+    ('US100', ('us_inflation', '<', 3.0), +10, "Inflation {us_inflation:.1f}% näher Fed-Ziel"),
+    ('US100', None, +10, "Soft Landing Szenario: KI-Investitionen treiben Margen"),
+
+    ('US30', ('fed_rate', '>', 4.0), -5, "Höhere Zinsen moderat belastend"),
+    ('US30', ('fed_rate', '<=', 4.0), +15, "Zinssenkung bullish für Industrie/Value"),
+    ('US30', ('gdp_growth', '>', 2.0), +15, "GDP-Wachstum stützt industrielle Nachfrage"),
+    ('US30', ('unemployment', '<', 4.5), +10, "Arbeitsmarkt stabil ({unemployment:.1f}%)"),
+    ('US30', None, +5, "Dividendenrendite attraktiv vs Bonds"),
+
+    ('SP500', ('fed_rate', '>', 4.0), -10, None),
+    ('SP500', ('fed_rate', '<=', 4.0), +15, None),
+    ('SP500', ('gdp_growth', '>', 2.0), +15, "Breites GDP-Wachstum {gdp_growth:+.1f}%"),
+    ('SP500', ('us_inflation', '<', 3.0), +10, "Inflationskontrolle ermöglicht Fed-Pivot"),
+    ('SP500', None, +10, "Gewinnwachstum +8% erwartet 2025"),
+
+    ('GOLD', ('fed_rate', '>', 4.0), -10, "Hohe Nominalzinsen belasten Gold"),
+    ('GOLD', ('fed_rate', '<=', 4.0), +20, "Zinssenkungen treiben Goldpreis"),
+    ('GOLD', None, +15, "Realzinsen sinken erwartet (Fed-Pivot)"),
+    ('GOLD', ('us_inflation', '>', 2.5), +15, "Inflation {us_inflation:.1f}% > Ziel = Inflationsschutz-Nachfrage"),
+    ('GOLD', None, +10, "Geopolitische Unsicherheit (Ukraine, Taiwan)"),
+    ('GOLD', None, +10, "Zentralbankkäufe bleiben robust"),
+
+    ('BTC', ('fed_rate', '>', 4.0), -15, "Restrictive Fed belastet Risk-Assets"),
+    ('BTC', ('fed_rate', '<=', 4.0), +20, "Liquditätsflut bei Zinssenkungen"),
+    ('BTC', None, +10, "ETF-Zuflüsse stabil"),
+    ('BTC', None, +5, "Halving-Zyklus historisch bullisch"),
+
+    ('EURUSD', ('rate_diff', '>', 1.0), -25, "Zinsdifferenzial {rate_diff:+.1f}% zugunsten USD"),
+    ('EURUSD', ('rate_diff', '<', 0), +20, "EZB-Zins > Fed = EUR-Stärke"),
+    ('EURUSD', ('gdp_growth', '>', 2.0), -10, None),
+    ('EURUSD', None, +5, "EZB Inflation 2.4% näher Ziel als US"),
+]
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le
+}
+
+class CompiledRules:
+    """A rule table flattened into arrays
+
+    weights is (assets × rules); a scenario matrix (scenarios × variables)
+    turns into a condition matrix (scenarios × rules), and scores are one
+    matrix product away.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.variables = list(MACRO_VARIABLES) + list(DERIVED_VARIABLES)
+        self.assets = list(dict.fromkeys(asset for asset, _, _, _ in self.rules))
+        self.asset_index = {asset: i for i, asset in enumerate(self.assets)}
+
+        n_rules = len(self.rules)
+        self.rule_asset = np.array([self.asset_index[r[0]] for r in self.rules], dtype=np.int64)
+        self.rule_weight = np.array([r[2] for r in self.rules], dtype=float)
+        self.weights = np.zeros((len(self.assets), n_rules))
+        self.weights[self.rule_asset, np.arange(n_rules)] = self.rule_weight
+
+        self.condition_groups = []
+        for op, fn in OPERATORS.items():
+            idx = np.array([i for i, r in enumerate(self.rules) if r[1] is not None and r[1][1] == op], dtype=np.int64)
+            if idx.size:
+                var = np.array([self.variables.index(self.rules[i][1][0]) for i in idx], dtype=np.int64)
+                threshold = np.array([self.rules[i][1][2] for i in idx], dtype=float)
+                self.condition_groups.append((idx, var, threshold, fn))
+
+    def scenario_matrix(self, scenarios):
+        """(scenarios × variables) from a list of macro dicts, with derived variables appended"""
+        base = {name: np.array([s[name] for s in scenarios], dtype=float) for name in MACRO_VARIABLES}
+        columns = [base[name] for name in MACRO_VARIABLES]
+        columns += [fn(base) for fn in DERIVED_VARIABLES.values()]
+        return np.column_stack(columns)
+
+    def conditions(self, x):
+        """(scenarios × rules) boolean matrix of which rules fire"""
+        fired = np.ones((x.shape[0], len(self.rules)), dtype=bool)
+        for idx, var, threshold, fn in self.condition_groups:
+            fired[:, idx] = fn(x[:, var], threshold)
+        return fired
+
+    def scores(self, x):
+        """Clamped (scenarios × assets) scores"""
+        raw = BASE_SCORE + self.conditions(x).astype(float) @ self.weights.T
+        return np.clip(raw, SCORE_MIN, SCORE_MAX)
+
+COMPILED_RULES = CompiledRules(FUNDAMENTAL_RULES)
+
+def sentiment_for(score):
+    if score >= BULLISH_AT:
+        return 'Bullish'
+    elif score <= BEARISH_AT:
+        return 'Bearish'
+    return 'Neutral'
+
+def score_assets(asset_keys, macro=None, compiled=COMPILED_RULES):
+    """(sentiment, score, factors) per asset for one macro scenario, evaluated in one pass
+
+    Assets without rules stay at the neutral base score.
+    """
+    macro = macro or MACRO_DEFAULTS
+    x = compiled.scenario_matrix([macro])
+    fired = compiled.conditions(x)[0]
+    variables = dict(zip(compiled.variables, x[0]))
+    results = {}
+    for key in asset_keys:
+        if key not in compiled.asset_index:
+            results[key] = (sentiment_for(BASE_SCORE), BASE_SCORE, [])
+            continue
+        rule_ids = np.flatnonzero(fired & (compiled.rule_asset == compiled.asset_index[key]))
+        score = BASE_SCORE + sum(compiled.rules[i][2] for i in rule_ids)
+        score = max(SCORE_MIN, min(SCORE_MAX, score))
+        factors = [compiled.rules[i][3].format(**variables) for i in rule_ids if compiled.rules[i][3]]
+        results[key] = (sentiment_for(score), score, factors)
+    return results
+
+def scenario_grid(axes, base=None):
+    """(scenarios × variables) matrix for the cartesian product of macro axes
+
+    axes maps variable -> values, e.g. {'fed_rate': [4.0, 4.5]}; unspecified
+    variables stay at base. Returns (matrix, grid shape).
+    """
+    base = dict(base or MACRO_DEFAULTS)
+    shape = tuple(len(axes[name]) for name in axes)
+    mesh = dict(zip(axes, np.meshgrid(*(np.asarray(axes[n], dtype=float) for n in axes), indexing='ij')))
+    columns = {name: (mesh[name].ravel() if name in mesh else np.full(int(np.prod(shape)), float(base[name])))
+               for name in MACRO_VARIABLES}
+    derived = [fn(columns) for fn in DERIVED_VARIABLES.values()]
+    return np.column_stack([columns[name] for name in MACRO_VARIABLES] + derived), shape
+
+def sensitivity_surface(axes, base=None, compiled=COMPILED_RULES):
+    """Score surface per asset over a macro grid: {asset: ndarray shaped like the grid}"""
+    x, shape = scenario_grid(axes, base)
+    scores = compiled.scores(x)
+    return {asset: scores[:, i].reshape(shape) for i, asset in enumerate(compiled.assets)}
+
+def _parse_axis(spec):
+    """"start:stop:step" (stop inclusive) or "a,b,c" """
+    if ':' in spec:
+        start, stop, step = (float(p) for p in spec.split(':'))
+        return list(np.round(np.arange(start, stop + step / 2, step), 6))
+    return [float(v) for v in spec.split(',')]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fundamental-Scores über ein Makro-Szenario-Raster")
+    for name in MACRO_VARIABLES:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, help="Werte als start:stop:step oder a,b,c")
+    parser.add_argument('--output', default='scenarios.json', help="Ergebnisdatei (JSON)")
+    args = parser.parse_args(argv)
+
+    axes = {name: _parse_axis(getattr(args, name)) for name in MACRO_VARIABLES if getattr(args, name)}
+    if not axes:
+        parser.error("mindestens eine Achse angeben, z.B. --fed-rate 3:5:0.25")
+
+    surface = sensitivity_surface(axes)
+    result = {
+        'axes': axes,
+        'base': MACRO_DEFAULTS,
+        'surfaces': {asset: values.tolist() for asset, values in surface.items()}
+    }
+    with open(args.output, 'w') as f:
+        json.dump(result, f)
+    print(f"✅ {int(np.prod([len(v) for v in axes.values()]))} Szenarien × {len(surface)} Assets → {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
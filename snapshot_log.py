@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Snapshot-Log pro Symbol
+Jeder Lauf schreibt (ts, Preis, Änderung, Score) als feste Binär-Records in
+drei Auflösungen: 15 Minuten (7 Tage), stündlich (90 Tage) und täglich
+(unbegrenzt). Die begrenzten Stufen sind Ringpuffer, lesbar per np.memmap
+"""
+
+import os
+from urllib.parse import quote
+
+import numpy as np
+
+SNAPSHOT_DIR = os.path.join('data', 'snapshots')
+SNAPSHOT_DTYPE = np.dtype([
+    ('ts', '<i8'),       # UTC epoch seconds of the snapshot
+    ('price', '<f8'),
+    ('change', '<f4'),   # daily change in percent
+    ('score', '<f4')     # fundamental score
+])
+HEADER_DTYPE = np.dtype('<i8')  # ring files start with the number of records ever written
+
+# (name, bucket seconds, capacity or None for unbounded)
+TIERS = (
+    ('15m', 15 * 60, 7 * 24 * 4),
+    ('1h', 60 * 60, 90 * 24),
+    ('1d', 24 * 60 * 60, None)
+)
+TIER_SPECS = {name: (step, capacity) for name, step, capacity in TIERS}
+
+class SnapshotLog:
+    """Per-symbol snapshot history in fixed-width record files
+
+    Each tier keeps one point per bucket (the latest snapshot in it): a
+    snapshot in the same bucket as the newest record revises that record in
+    place, anything newer takes the next slot. Ring tiers overwrite their
+    oldest slot once full, so disk use per symbol is bounded except for the
+    daily tier.
+    """
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+
+    def path(self, symbol, tier):
+        return os.path.join(self.root, tier, quote(symbol, safe='') + '.bin')
+
+    def _written(self, path, capacity):
+        """Records ever written to a tier file (ring files keep it in the header)"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return 0
+        if capacity is None:
+            return size // SNAPSHOT_DTYPE.itemsize
+        if size < HEADER_DTYPE.itemsize:
+            return 0
+        with open(path, 'rb') as f:
+            return int(np.frombuffer(f.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE)[0])
+
+    def _slot_offset(self, index, capacity):
+        if capacity is None:
+            return index * SNAPSHOT_DTYPE.itemsize
+        return HEADER_DTYPE.itemsize + (index % capacity) * SNAPSHOT_DTYPE.itemsize
+
+    def _append_tier(self, symbol, tier, record):
+        step, capacity = TIER_SPECS[tier]
+        path = self.path(symbol, tier)
+        written = self._written(path, capacity)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path) and capacity is not None:
+            # Preallocate the ring so every slot has a fixed offset
+            with open(path, 'wb') as f:
+                f.write(np.zeros(1, dtype=HEADER_DTYPE).tobytes())
+                f.write(np.zeros(capacity, dtype=SNAPSHOT_DTYPE).tobytes())
+
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            index = written
+            if written:
+                f.seek(self._slot_offset(written - 1, capacity))
+                last = np.frombuffer(f.read(SNAPSHOT_DTYPE.itemsize), dtype=SNAPSHOT_DTYPE)[0]
+                if record['ts'][0] < last['ts']:
+                    return False
+                if record['ts'][0] // step == last['ts'] // step:
+                    index = written - 1
+            f.seek(self._slot_offset(index, capacity))
+            f.write(record.tobytes())
+            if capacity is not None and index == written:
+                f.seek(0)
+                f.write(np.array([written + 1], dtype=HEADER_DTYPE).tobytes())
+        return True
+
+    def append(self, symbol, ts, price, change, score):
+        """Record one snapshot in every tier; snapshots older than a tier's newest are ignored"""
+        record = np.zeros(1, dtype=SNAPSHOT_DTYPE)
+        record['ts'], record['price'], record['change'], record['score'] = int(ts), price, change, score
+        for tier, _, _ in TIERS:
+            self._append_tier(symbol, tier, record)
+
+    def _segments(self, symbol, tier):
+        """Memory-mapped record views in time order (a wrapped ring is two views)"""
+        _, capacity = TIER_SPECS[tier]
+        path = self.path(symbol, tier)
+        written = self._written(path, capacity)
+        if written == 0:
+            return []
+        if capacity is None:
+            return [np.memmap(path, dtype=SNAPSHOT_DTYPE, mode='r', shape=(written,))]
+        ring = np.memmap(path, dtype=SNAPSHOT_DTYPE, mode='r', offset=HEADER_DTYPE.itemsize, shape=(capacity,))
+        if written <= capacity:
+            return [ring[:written]]
+        head = written % capacity
+        return [ring[head:], ring[:head]]
+
+    def read(self, symbol, tier, start=None, end=None):
+        """Snapshots with start <= ts <= end (epoch seconds) as a structured array
+
+        A window inside one contiguous part of the file is a memory-mapped
+        slice; a window across the ring's wrap point is copied.
+        """
+        parts = []
+        for segment in self._segments(symbol, tier):
+            ts = segment['ts']
+            lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+            hi = len(segment) if end is None else int(np.searchsorted(ts, end, side='right'))
+            if hi > lo:
+                parts.append(segment[lo:hi])
+        if not parts:
+            return np.empty(0, dtype=SNAPSHOT_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def tail(self, symbol, tier, n):
+        """The newest n snapshots of a tier"""
+        parts, remaining = [], n
+        for segment in reversed(self._segments(symbol, tier)):
+            if remaining <= 0:
+                break
+            parts.insert(0, segment[-remaining:])
+            remaining -= len(parts[0])
+        if not parts:
+            return np.empty(0, dtype=SNAPSHOT_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Sparklines pro Karte
+Kursverlauf der letzten 24 Stunden (Snapshot-Log) und des letzten Jahres
+(OHLCV-Speicher), serverseitig per LTTB auf eine feste Punktzahl reduziert
+und als SVG-Pfad ausgegeben – gleiche Größe, egal wie viel Historie existiert
+"""
+
+import numpy as np
+
+SPARK_POINTS = 48
+# Path coordinates are integers in this viewBox; CSS scales it to the card width
+SPARK_WIDTH = 240
+SPARK_HEIGHT = 64
+SPARK_PADDING = 4
+
+# (name, label, window seconds)
+SPARK_RANGES = (
+    ('day', '24h', 24 * 60 * 60),
+    ('year', '1J', 365 * 24 * 60 * 60)
+)
+
+def lttb_batch(x, y, threshold=SPARK_POINTS):
+    """Largest-Triangle-Three-Buckets over a stack of equally long series
+
+    x and y have shape (series, points). Returns the selected indices with
+    shape (series, threshold), first and last point always kept. The loop
+    runs over buckets, not series, so thousands of series cost about as much
+    as one.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    count, n = x.shape
+    if threshold >= n or threshold < 3:
+        return np.tile(np.arange(n), (count, 1))
+
+    # Bucket i covers [bounds[i], bounds[i + 1]) of the points between first and last
+    bounds = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(int) + 1
+    bounds[-1] = n - 1
+    rows = np.arange(count)
+    selected = np.empty((count, threshold), dtype=int)
+    selected[:, 0], selected[:, -1] = 0, n - 1
+    a = np.zeros(count, dtype=int)
+    for i in range(threshold - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        if i + 2 < len(bounds):
+            cx = x[:, hi:bounds[i + 2]].mean(axis=1)
+            cy = y[:, hi:bounds[i + 2]].mean(axis=1)
+        else:
+            cx, cy = x[:, -1], y[:, -1]
+        ax, ay = x[rows, a][:, None], y[rows, a][:, None]
+        area = np.abs((ax - cx[:, None]) * (y[:, lo:hi] - ay) - (ax - x[:, lo:hi]) * (cy[:, None] - ay))
+        a = lo + np.argmax(area, axis=1)
+        selected[:, i + 1] = a
+    return selected
+
+def scale_points(x, y, width=SPARK_WIDTH, height=SPARK_HEIGHT, padding=SPARK_PADDING):
+    """Integer viewBox coordinates for rows of points (time on x, y flipped)"""
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    span_x = x[:, -1:] - x[:, :1]
+    low, span_y = y.min(axis=1, keepdims=True), np.ptp(y, axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        px = np.where(span_x > 0, (x - x[:, :1]) / span_x, np.linspace(0, 1, x.shape[1]))
+        py = np.where(span_y > 0, (y - low) / span_y, 0.5)
+    px = np.rint(px * width).astype(int)
+    py = np.rint(height - padding - py * (height - 2 * padding)).astype(int)
+    return px, py
+
+def svg_path(px, py):
+    """SVG path data for one row of integer coordinates"""
+    points = np.empty(2 * len(px), dtype=int)
+    points[0::2], points[1::2] = px, py
+    return ("M%d,%d" + "L%d,%d" * (len(px) - 1)) % tuple(points.tolist())
+
+def downsample_paths(series, threshold=SPARK_POINTS):
+    """{name: (ts, values)} -> {name: sparkline dict}, LTTB-batched by series length
+
+    Series with fewer than two points map to None. A sparkline dict holds
+    the SVG path, the trend ('up'/'down', last vs. first point) and the
+    window's low and high.
+    """
+    by_length = {}
+    for name, (ts, values) in series.items():
+        if len(ts) >= 2:
+            by_length.setdefault(len(ts), []).append(name)
+    result = {name: None for name in series}
+    for names in by_length.values():
+        x = np.stack([np.asarray(series[name][0], dtype=float) for name in names])
+        y = np.stack([np.asarray(series[name][1], dtype=float) for name in names])
+        keep = lttb_batch(x, y, threshold)
+        rows = np.arange(len(names))[:, None]
+        ys = y[rows, keep]
+        px, py = scale_points(x[rows, keep], ys)
+        for row, name in enumerate(names):
+            result[name] = {
+                'path': svg_path(px[row], py[row]),
+                'trend': 'up' if ys[row, -1] >= ys[row, 0] else 'down',
+                'low': float(y[row].min()),
+                'high': float(y[row].max())
+            }
+    return result
+
+def window(ts, values, seconds):
+    """The points within seconds of the newest one"""
+    ts = np.asarray(ts)
+    if len(ts) == 0:
+        return ts, np.asarray(values)
+    begin = int(np.searchsorted(ts, ts[-1] - seconds, side='left'))
+    return ts[begin:], np.asarray(values)[begin:]
+
+def build_sparklines(symbols, store, snapshots, threshold=SPARK_POINTS):
+    """{symbol: {'day': sparkline or None, 'year': sparkline or None}}
+
+    The 24h line comes from the snapshot log's 15-minute tier and ends at the
+    newest snapshot, so closed markets show their last session. The 1-year
+    line uses the daily closes in the OHLCV store.
+    """
+    _, _, day_seconds = SPARK_RANGES[0]
+    _, _, year_seconds = SPARK_RANGES[1]
+    series = {}
+    for symbol in symbols:
+        points = snapshots.tail(symbol, '15m', day_seconds // (15 * 60) + 1)
+        series[(symbol, 'day')] = window(points['ts'], points['price'], day_seconds)
+        bars = store.tail(symbol, 400)
+        series[(symbol, 'year')] = window(bars['ts'], bars['close'], year_seconds)
+    paths = downsample_paths(series, threshold)
+    return {symbol: {name: paths[(symbol, name)] for name, _, _ in SPARK_RANGES} for symbol in symbols}
@@ -0,0 +1,356 @@
+var POLL_INTERVAL = 60000;
+var SLOT_HEIGHT = 520;
+var SPARK_RANGES = [['day', '24h'], ['year', '1J']];
+var OVERSCAN = '1000px';
+var currentVersion = null;
+var correlationVersion = null;
+var latestIndex = null;
+var shownGroup = null;
+var cardData = {};
+
+function cardMarkup(card) {
+    var key = card.key;
+    var box = latestIndex.sparkline;
+    return '<div class="card-header">' +
+        '<div class="asset-name">' + key + '</div>' +
+        '<div class="sentiment-badge" data-f="sentiment-badge"><span>●</span><span data-f="sentiment"></span></div>' +
+        '</div>' +
+        '<div class="price-display">' +
+        '<div class="current-price" data-f="price"></div>' +
+        '<div class="price-change" data-f="change"></div>' +
+        '</div>' +
+        '<div class="sparklines">' + SPARK_RANGES.map(function (range) {
+            return '<div class="sparkline-item"><div class="sparkline-header"><span>' + range[1] + '</span><span data-f="spark_' + range[0] + '_range"></span></div>' +
+                '<svg class="sparkline" data-f="spark_' + range[0] + '_svg" viewBox="0 0 ' + box.width + ' ' + box.height + '" preserveAspectRatio="none"><path data-f="spark_' + range[0] + '"/></svg></div>';
+        }).join('') + '</div>' +
+        '<div class="confidence-section">' +
+        '<div class="confidence-header"><span>Fundamental Confidence</span><span data-f="confidence_text"></span></div>' +
+        '<div class="confidence-bar"><div class="confidence-fill" data-f="confidence-fill"></div></div>' +
+        '</div>' +
+        '<div class="last-update"><span>↻</span><span data-f="last_update"></span></div>' +
+        '<div class="ai-analysis">' +
+        '<div class="ai-header"><span>🤖</span><span>KI-Fundamental-Analyse</span></div>' +
+        '<div class="ai-text" data-f="analysis"></div>' +
+        '</div>' +
+        '<div class="action-buttons">' +
+        '<button class="btn btn-secondary" onclick="toggleOverview(\'' + key + '\')">Details anzeigen <span id="' + key + '-arrow">▼</span></button>' +
+        '</div>' +
+        '<div class="expandable-content" id="' + key + '-overview">' +
+        '<div class="stats-grid">' +
+        '<div class="stat-item"><div class="stat-label">52W Hoch</div><div class="stat-value" data-f="high"></div></div>' +
+        '<div class="stat-item"><div class="stat-label">Abstand 52W</div><div class="stat-value" data-f="distance"></div></div>' +
+        '<div class="stat-item"><div class="stat-label">Makro-Regime</div><div class="stat-value" data-f="regime" style="font-size: 11px;">Soft Landing</div></div>' +
+        '</div>' +
+        '<div class="stats-grid">' +
+        '<div class="stat-item"><div class="stat-label">RSI 14</div><div class="stat-value" data-f="rsi"></div></div>' +
+        '<div class="stat-item"><div class="stat-label">MACD Hist</div><div class="stat-value" data-f="macd"></div></div>' +
+        '<div class="stat-item"><div class="stat-label">Bollinger %B</div><div class="stat-value" data-f="bb"></div></div>' +
+        '</div>' +
+        '</div>';
+}
+
+function field(root, name) {
+    return root.querySelector('[data-f="' + name + '"]');
+}
+
+function setText(node, value) {
+    if (node.textContent !== value) {
+        node.textContent = value;
+    }
+}
+
+function setStyle(node, property, value) {
+    if (node.style[property] !== value) {
+        node.style[property] = value;
+    }
+}
+
+function setAttr(node, name, value) {
+    if (node.getAttribute(name) !== value) {
+        node.setAttribute(name, value);
+    }
+}
+
+function patchCard(el, card) {
+    field(el, 'sentiment-badge').className = 'sentiment-badge ' + card.sentiment_class;
+    setText(field(el, 'sentiment'), card.sentiment);
+    setText(field(el, 'price'), card.price);
+    var change = field(el, 'change');
+    change.className = 'price-change ' + card.change_class;
+    setText(change, card.change);
+    SPARK_RANGES.forEach(function (range) {
+        var name = 'spark_' + range[0];
+        setText(field(el, name + '_range'), card[name + '_range']);
+        setAttr(field(el, name + '_svg'), 'class', card[name + '_class']);
+        setAttr(field(el, name), 'd', card[name]);
+    });
+    var confidence = field(el, 'confidence_text');
+    setText(confidence, card.confidence_text);
+    setStyle(confidence, 'color', card.confidence_color);
+    var fill = field(el, 'confidence-fill');
+    setStyle(fill, 'width', card.confidence + '%');
+    setStyle(fill, 'background', card.confidence_color);
+    setText(field(el, 'last_update'), card.update_text);
+    var analysis = field(el, 'analysis');
+    if (analysis.innerHTML !== card.analysis) {
+        analysis.innerHTML = card.analysis;
+    }
+    setText(field(el, 'high'), card.high);
+    setText(field(el, 'distance'), card.distance);
+    setStyle(field(el, 'regime'), 'color', card.confidence_color);
+    var rsi = field(el, 'rsi');
+    setText(rsi, card.rsi);
+    setStyle(rsi, 'color', card.rsi_color);
+    var macd = field(el, 'macd');
+    setText(macd, card.macd);
+    setStyle(macd, 'color', card.macd_color);
+    setText(field(el, 'bb'), card.bb);
+}
+
+function renderMacro(items) {
+    var grid = document.getElementById('macro-grid');
+    if (grid.children.length !== items.length) {
+        grid.innerHTML = items.map(function () {
+            return '<div class="macro-item"><div class="macro-label"></div><div class="macro-value"></div><div class="macro-change"></div></div>';
+        }).join('');
+    }
+    items.forEach(function (item, i) {
+        var el = grid.children[i];
+        setText(el.querySelector('.macro-label'), item.label);
+        setText(el.querySelector('.macro-value'), item.value);
+        var change = el.querySelector('.macro-change');
+        setText(change, item.change);
+        setStyle(change, 'color', item.color);
+    });
+}
+
+function renderCorrelation(payload) {
+    // Same markup as correlation_markup() in update_dashboard.py; only re-rendered on a new version
+    var parts = [];
+    if (payload && payload.window) {
+        parts.push('<div class="corr-title">🔗 Korrelation ' + payload.window + '</div>');
+        if (payload.keys.length) {
+            parts.push('<table class="corr-table"><tr><th></th>' + payload.keys.map(function (key) {
+                return '<th>' + key + '</th>';
+            }).join('') + '<th>Vol</th></tr>');
+            payload.rows.forEach(function (row) {
+                parts.push('<tr><th>' + row.key + '</th>' + row.cells.map(function (cell) {
+                    return '<td style="background: ' + cell.color + '">' + cell.text + '</td>';
+                }).join('') + '<td class="corr-vol">' + row.vol + '</td></tr>');
+            });
+            parts.push('</table>');
+        }
+        if (payload.movers.length) {
+            parts.push('<div class="corr-movers">' + payload.movers.map(function (m) {
+                return '<div class="corr-mover"><span class="corr-pair">' + m.pair + '</span><span class="corr-text">' + m.text + '</span>' +
+                    '<span class="corr-change" style="color: ' + m.color + '">' + m.change + '</span></div>';
+            }).join('') + '</div>');
+        }
+    }
+    document.getElementById('correlation').innerHTML = parts.join('');
+}
+
+function loadCorrelation(version) {
+    if (!version || version === correlationVersion) {
+        return;
+    }
+    fetch('shards/correlation.json?v=' + version)
+        .then(function (response) { return response.json(); })
+        .then(function (payload) {
+            renderCorrelation(payload);
+            correlationVersion = version;
+        })
+        .catch(function () {});
+}
+
+function currentGroup(groups) {
+    var id = decodeURIComponent(location.hash.slice(1));
+    for (var i = 0; i < groups.length; i++) {
+        if (groups[i].id === id) {
+            return groups[i];
+        }
+    }
+    return groups[0] || null;
+}
+
+function renderTabs(groups, active) {
+    var nav = document.getElementById('group-tabs');
+    if (groups.length < 2) {
+        nav.innerHTML = '';
+        return;
+    }
+    nav.innerHTML = groups.map(function (group) {
+        return '<a class="group-tab' + (group === active ? ' active' : '') + '" href="#' + encodeURIComponent(group.id) + '">' +
+            group.label + '<span class="group-count">' + group.count + '</span></a>';
+    }).join('');
+}
+
+// Cards are placeholders until they come near the viewport, so the DOM only
+// holds full markup for the cards that are (almost) visible
+function hydrate(slot) {
+    var card = cardData[slot.dataset.key];
+    if (!card) {
+        return;
+    }
+    if (!slot.firstChild) {
+        var el = document.createElement('div');
+        el.className = 'card';
+        el.innerHTML = cardMarkup(card);
+        slot.appendChild(el);
+        slot.style.minHeight = '';
+    }
+    patchCard(slot.firstChild, card);
+}
+
+function release(slot) {
+    if (slot.firstChild) {
+        slot.style.minHeight = slot.offsetHeight + 'px';
+        slot.innerHTML = '';
+    }
+}
+
+var cardObserver = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+        if (entry.isIntersecting) {
+            hydrate(entry.target);
+        } else {
+            release(entry.target);
+        }
+    });
+}, { rootMargin: OVERSCAN + ' 0px' });
+
+// Chunks of a group are only downloaded once they come near the viewport
+var chunkObserver = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+        if (entry.isIntersecting) {
+            loadChunk(entry.target);
+        }
+    });
+}, { rootMargin: OVERSCAN + ' 0px' });
+
+function loadChunk(chunk) {
+    var version = chunk.dataset.version;
+    if (chunk.dataset.loaded === version || chunk.dataset.loading === version) {
+        return;
+    }
+    chunk.dataset.loading = version;
+    fetch('shards/' + encodeURIComponent(chunk.dataset.group + '-' + chunk.dataset.index) + '.json?v=' + version)
+        .then(function (response) { return response.json(); })
+        .then(function (shard) {
+            if (chunk.dataset.version !== version || !chunk.parentNode) {
+                return;
+            }
+            renderCards(chunk, shard.cards);
+            chunk.style.minHeight = '';
+            chunk.dataset.loaded = version;
+        })
+        .catch(function () {
+            delete chunk.dataset.loading;
+        });
+}
+
+function removeChunk(chunk) {
+    chunkObserver.unobserve(chunk);
+    Array.prototype.slice.call(chunk.children).forEach(function (slot) {
+        cardObserver.unobserve(slot);
+        delete cardData[slot.dataset.key];
+    });
+    chunk.parentNode.removeChild(chunk);
+}
+
+function renderCards(chunk, cards) {
+    var seen = {};
+    var previous = null;
+    cards.forEach(function (card) {
+        cardData[card.key] = card;
+        var slot = document.getElementById('card-' + card.key);
+        var created = !slot;
+        if (created) {
+            slot = document.createElement('div');
+            slot.className = 'card-slot';
+            slot.id = 'card-' + card.key;
+            slot.dataset.key = card.key;
+            slot.style.minHeight = SLOT_HEIGHT + 'px';
+        }
+        // Only move nodes that are out of payload order
+        var expected = previous ? previous.nextElementSibling : chunk.firstElementChild;
+        if (expected !== slot) {
+            chunk.insertBefore(slot, expected);
+        }
+        previous = slot;
+        if (created) {
+            cardObserver.observe(slot);
+        } else if (slot.firstChild) {
+            patchCard(slot.firstChild, card);
+        }
+        seen[slot.id] = true;
+    });
+    Array.prototype.slice.call(chunk.children).forEach(function (slot) {
+        if (!seen[slot.id]) {
+            cardObserver.unobserve(slot);
+            chunk.removeChild(slot);
+            delete cardData[slot.dataset.key];
+        }
+    });
+}
+
+function renderGroup(group, chunkSize) {
+    var container = document.getElementById('cards');
+    if (group.id !== shownGroup) {
+        Array.prototype.slice.call(container.children).forEach(removeChunk);
+        shownGroup = group.id;
+    }
+    group.chunks.forEach(function (version, i) {
+        var chunk = container.children[i];
+        if (!chunk) {
+            chunk = document.createElement('div');
+            chunk.className = 'card-chunk';
+            chunk.dataset.group = group.id;
+            chunk.dataset.index = i;
+            chunk.dataset.version = version;
+            chunk.style.minHeight = Math.min(chunkSize, group.count - i * chunkSize) * SLOT_HEIGHT + 'px';
+            container.appendChild(chunk);
+            chunkObserver.observe(chunk);
+        } else if (chunk.dataset.version !== version) {
+            chunk.dataset.version = version;
+            // Chunks already on screen are refreshed right away, the rest when scrolled to
+            if (chunk.dataset.loaded) {
+                loadChunk(chunk);
+            }
+        }
+    });
+    while (container.children.length > group.chunks.length) {
+        removeChunk(container.lastElementChild);
+    }
+}
+
+function update(index) {
+    latestIndex = index;
+    if (index.version !== currentVersion) {
+        setText(document.getElementById('last-update'), 'Letztes Update: ' + index.updated_display);
+        renderMacro(index.macro);
+        currentVersion = index.version;
+    }
+    loadCorrelation(index.correlation);
+    var group = currentGroup(index.groups);
+    renderTabs(index.groups, group);
+    if (group) {
+        renderGroup(group, index.chunk_size);
+    }
+}
+
+function poll() {
+    fetch('data_version.json?t=' + Date.now(), { cache: 'no-store' })
+        .then(function (response) { return response.json(); })
+        .then(update)
+        .catch(function () {})
+        .then(function () { setTimeout(poll, POLL_INTERVAL); });
+}
+
+window.addEventListener('hashchange', function () {
+    if (latestIndex) {
+        update(latestIndex);
+    }
+});
+
+poll();
@@ -0,0 +1,11 @@
+function toggleOverview(asset) {
+    var content = document.getElementById(asset + '-overview');
+    var arrow = document.getElementById(asset + '-arrow');
+    if (content.classList.contains('expanded')) {
+        content.classList.remove('expanded');
+        arrow.textContent = '▼';
+    } else {
+        content.classList.add('expanded');
+        arrow.textContent = '▲';
+    }
+}
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Telemetrie pro Lauf
+Abrufzeiten, Wiederholungen und Bytes pro Symbol, Cache-Trefferquoten,
+Stufendauern und Ausgabegrößen – als JSON-Zeilen und als Prometheus-Textfile
+für den node_exporter; dazu ein optionaler Profiler (cProfile + tracemalloc)
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+METRICS_LOG_PATH = os.path.join('data', 'metrics.jsonl')
+METRICS_LOG_MAX_BYTES = 5 * 1024 * 1024
+PROM_PATH = os.path.join('data', 'metrics', 'dashboard.prom')
+PROFILE_DIR = os.path.join('data', 'profile')
+
+def frame_bytes(hist):
+    """Bytes behind one history frame: the wire size if the provider recorded it, else the frame's size in memory"""
+    if hist is None:
+        return 0
+    return int(hist.attrs.get('bytes') or hist.memory_usage(index=True).sum())
+
+def quantile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class RunMetrics:
+    """Collects the measurements of one update run; thread-safe for the fetch workers
+
+    Fetch outcomes are 'ok', 'failed' (after all retries), 'breaker'
+    (skipped by an open circuit breaker) and 'deadline' (not requested in
+    time). Caches count hits and misses under a name; outputs map a
+    published file to its size.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.started = clock()
+        self.fetches = []
+        self.caches = {}
+        self.outputs = {}
+        self.status = None
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, symbol, seconds, attempts, nbytes, outcome):
+        with self._lock:
+            self.fetches.append({'symbol': symbol, 'seconds': seconds, 'retries': max(0, attempts - 1),
+                                 'bytes': nbytes, 'outcome': outcome})
+
+    def cache(self, name, hits, misses):
+        with self._lock:
+            entry = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+            entry['hits'] += hits
+            entry['misses'] += misses
+
+    def output(self, name, path):
+        """Record the size of a published file or directory"""
+        if os.path.isdir(path):
+            size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+        else:
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+        self.outputs[name] = size
+
+    def finish(self, status, timer=None):
+        """Close the run: status is 'written', 'unchanged' or 'failed'"""
+        self.status = status
+        self.duration = self.clock() - self.started
+        self.stages = dict(timer.durations) if timer else {}
+
+    def fetch_summary(self):
+        latencies = [f['seconds'] for f in self.fetches if f['outcome'] in ('ok', 'failed')]
+        outcomes = {}
+        for f in self.fetches:
+            outcomes[f['outcome']] = outcomes.get(f['outcome'], 0) + 1
+        return {
+            'symbols': len(self.fetches),
+            'outcomes': outcomes,
+            'retries': sum(f['retries'] for f in self.fetches),
+            'bytes': sum(f['bytes'] for f in self.fetches),
+            'latency_p50': quantile(latencies, 0.5),
+            'latency_p95': quantile(latencies, 0.95),
+            'latency_max': max(latencies) if latencies else None
+        }
+
+    def cache_ratios(self):
+        return {name: dict(entry, ratio=entry['hits'] / (entry['hits'] + entry['misses'])
+                           if entry['hits'] + entry['misses'] else None)
+                for name, entry in self.caches.items()}
+
+    def run_record(self):
+        return {
+            'event': 'run',
+            'ts': datetime.fromtimestamp(self.started).isoformat(),
+            'status': self.status,
+            'duration': round(self.duration, 4),
+            'stages': {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            'fetch': self.fetch_summary(),
+            'caches': self.cache_ratios(),
+            'outputs': self.outputs
+        }
+
+    def write_jsonl(self, path=METRICS_LOG_PATH, max_bytes=METRICS_LOG_MAX_BYTES):
+        """Append one 'fetch' line per symbol and one 'run' line; rotates to <path>.1 past max_bytes"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+            os.replace(path, path + '.1')
+        ts = datetime.fromtimestamp(self.started).isoformat()
+        lines = [json.dumps({'event': 'fetch', 'ts': ts, **f, 'seconds': round(f['seconds'], 4)}) for f in self.fetches]
+        lines.append(json.dumps(self.run_record()))
+        with open(path, 'a') as f:
+            f.write("\n".join(lines) + "\n")
+
+    def prometheus(self):
+        """The run in Prometheus text exposition format (gauges of the last run)"""
+        out = []
+
+        def metric(name, kind, help_text, samples):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+                out.append(f"{name}{label_text} {float(value)!r}")
+
+        summary = self.fetch_summary()
+        metric('dashboard_last_run_timestamp_seconds', 'gauge', "Start of the last update run", [({}, self.started)])
+        metric('dashboard_run_duration_seconds', 'gauge', "Wall time of the last update run", [({}, self.duration)])
+        metric('dashboard_run_success', 'gauge', "1 if the last run published or confirmed the dashboard",
+               [({}, 0 if self.status == 'failed' else 1)])
+        metric('dashboard_stage_duration_seconds', 'gauge', "Wall time per pipeline stage in the last run",
+               [({'stage': name}, seconds) for name, seconds in self.stages.items()])
+        metric('dashboard_fetch_symbols', 'gauge', "Symbols per fetch outcome in the last run",
+               [({'outcome': outcome}, count) for outcome, count in sorted(summary['outcomes'].items())])
+        metric('dashboard_fetch_retries', 'gauge', "Retried requests in the last run", [({}, summary['retries'])])
+        metric('dashboard_fetch_bytes', 'gauge', "Bytes received in the last run", [({}, summary['bytes'])])
+
+        # Each run rewrites the textfile, so latency is exported as last-run gauges, not as a histogram
+        # whose buckets Prometheus would expect to only ever grow
+        metric('dashboard_fetch_latency_seconds', 'gauge', "Per-symbol fetch latency in the last run, retries included",
+               [({'stat': stat}, summary[f'latency_{stat}']) for stat in ('p50', 'p95', 'max')
+                if summary[f'latency_{stat}'] is not None])
+
+        ratios = self.cache_ratios()
+        metric('dashboard_cache_hits', 'gauge', "Cache hits in the last run", [({'cache': n}, e['hits']) for n, e in ratios.items()])
+        metric('dashboard_cache_misses', 'gauge', "Cache misses in the last run", [({'cache': n}, e['misses']) for n, e in ratios.items()])
+        metric('dashboard_cache_hit_ratio', 'gauge', "Cache hit ratio in the last run",
+               [({'cache': n}, e['ratio']) for n, e in ratios.items() if e['ratio'] is not None])
+        metric('dashboard_output_bytes', 'gauge', "Size of the published files after the last run",
+               [({'file': name}, size) for name, size in self.outputs.items()])
+        return "\n".join(out) + "\n"
+
+    def write_prometheus(self, path=PROM_PATH):
+        """Write the textfile atomically, so the node_exporter never scrapes a half-written file"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+class Profiler:
+    """cProfile and tracemalloc around a block, reports written to directory on exit
+
+    cProfile only sees the thread that enabled it, so every thread started
+    inside the block (the fetch pool) gets its own profile through
+    threading.setprofile; the report merges them with the block's own thread.
+    Enter it on the thread that does the work, e.g. once per daemon tick.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, top=40):
+        self.directory = directory
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.thread_profiles = []
+        self._lock = threading.Lock()
+        self._previous_hook = None
+        self.report = None
+
+    def _start_thread(self, frame, event, arg):
+        """threading.setprofile hook: runs once in each new thread and replaces itself with a profile"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Interpreters with one global profiler (sys.monitoring) refuse a second one
+            sys.setprofile(None)
+            return
+        with self._lock:
+            self.thread_profiles.append(profile)
+
+    def __enter__(self):
+        tracemalloc.start()
+        self._previous_hook = threading.getprofile()
+        threading.setprofile(self._start_thread)
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        threading.setprofile(self._previous_hook)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        with self._lock:
+            profiles = [self.profile] + self.thread_profiles
+        stats = pstats.Stats(*profiles)
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]
+        base = os.path.join(self.directory, stamp)
+        stats.dump_stats(base + '.pstats')
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats('cumulative').print_stats(self.top)
+        with open(base + '-cprofile.txt', 'w') as f:
+            f.write(text.getvalue())
+        with open(base + '-tracemalloc.txt', 'w') as f:
+            f.write(f"current {current / 1024:.0f} KB, peak {peak / 1024:.0f} KB\n\n")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                f.write(f"{stat}\n")
+        self.report = base + '-cprofile.txt'
+        print(f"🔬 Profil gespeichert: {base}-cprofile.txt, {base}-tracemalloc.txt")
+        return False
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from alerts import AlertEngine, load_alerts
+
+RSI_RULE = {'id': 'rsi-overbought', 'key': '*', 'field': 'rsi', 'op': 'crosses_above', 'value': 70, 'hysteresis': 5}
+
+def test_wildcard_rule_fires_for_each_asset():
+    engine = AlertEngine([RSI_RULE])
+    for key in ('US100', 'GOLD'):
+        assert engine.evaluate(key, {'rsi': 65.0}, now=1000) == []
+    fired = engine.evaluate('US100', {'rsi': 72.0}, now=1010) + engine.evaluate('GOLD', {'rsi': 71.0}, now=1020)
+    assert [alert['key'] for alert in fired] == ['US100', 'GOLD']
+
+def test_rearm_of_one_asset_does_not_rearm_another():
+    engine = AlertEngine([dict(RSI_RULE, cooldown=0)])
+    engine.evaluate('US100', {'rsi': 65.0}, now=1000)
+    engine.evaluate('US30', {'rsi': 65.0}, now=1000)
+    assert len(engine.evaluate('US100', {'rsi': 72.0}, now=1010)) == 1
+    assert len(engine.evaluate('US30', {'rsi': 75.0}, now=1020)) == 1
+    # US30 drops back past the hysteresis and re-arms only itself
+    engine.evaluate('US30', {'rsi': 60.0}, now=1030)
+    engine.evaluate('US100', {'rsi': 69.0}, now=1040)
+    assert engine.evaluate('US100', {'rsi': 71.0}, now=1050) == []
+
+def test_per_asset_state_survives_save_and_load(tmp_path):
+    engine = AlertEngine([RSI_RULE])
+    engine.evaluate('US100', {'rsi': 65.0}, now=1000)
+    engine.evaluate('US100', {'rsi': 72.0}, now=1010)
+    path = tmp_path / 'alert_state.json'
+    engine.save_state(str(path))
+
+    restored = AlertEngine([RSI_RULE], json.loads(path.read_text()))
+    assert restored.rule_state[('rsi-overbought', 'US100')]['armed'] is False
+    restored.evaluate('GOLD', {'rsi': 65.0}, now=1020)
+    assert len(restored.evaluate('GOLD', {'rsi': 71.0}, now=1030)) == 1
+
+def test_numeric_operator_on_text_field_is_rejected(tmp_path):
+    path = tmp_path / 'alerts.json'
+    path.write_text(json.dumps({'rules': [{'id': 'x', 'key': '*', 'field': 'sentiment', 'op': '>', 'value': 1}]}))
+    with pytest.raises(ValueError):
+        load_alerts(str(path), str(tmp_path / 'state.json'))
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import evaluate, forward_returns, grid_multipliers, objective_values, prepare, sweep
+from scoring import BASE_SCORE, BEARISH_AT, BULLISH_AT, COMPILED_RULES, SCORE_MAX, SCORE_MIN
+
+HORIZONS = (5, 20)
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(7)
+    # Monthly releases that cross the rule thresholds (fed 4.0, gdp 2.0, inflation 2.5/3.0, rate_diff 0/1.0)
+    releases = pd.date_range('2023-01-15', periods=24, freq='MS') + pd.Timedelta(days=14)
+    macro = pd.DataFrame({
+        'us_inflation': rng.choice([2.0, 2.7, 3.4], len(releases)),
+        'fed_rate': rng.choice([3.5, 4.0, 4.75], len(releases)),
+        'unemployment': rng.choice([3.9, 4.6], len(releases)),
+        'gdp_growth': rng.choice([1.5, 2.0, 2.8], len(releases)),
+        'ecb_rate': rng.choice([3.0, 4.25], len(releases))
+    }, index=releases)
+    # Prices start before the first release, so the first days have no known macro row
+    days = pd.bdate_range('2022-12-01', '2024-12-31')
+    closes = {key: pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, len(days))), index=days)
+              for key in ('US100', 'GOLD', 'BTC', 'EURUSD')}
+    return macro, closes
+
+def per_day_stats(macro, closes, multipliers, compiled=COMPILED_RULES):
+    """The statistics of evaluate(), computed date by date without pattern collapsing"""
+    context = prepare(macro, closes, horizons=HORIZONS, compiled=compiled)
+    fired = compiled.conditions(compiled.scenario_matrix(macro.to_dict('records')))
+    shape = (len(multipliers), len(context['assets']), len(HORIZONS))
+    out = {name: np.zeros(shape) for name in ('bullish', 'bearish', 'hits', 'expected', 'ret_bullish', 'ret_bearish', 'ic')}
+    for c, config in enumerate(multipliers):
+        weights = compiled.rule_weight * config[context['rule_group']]
+        for a, key in enumerate(context['assets']):
+            rules = context['asset_rules'][a]
+            close = closes[key]
+            for h, horizon in enumerate(HORIZONS):
+                r_all = forward_returns(close.values, horizon)
+                scores, returns = [], []
+                for d, day in enumerate(close.index):
+                    row = np.searchsorted(macro.index.values, day.to_datetime64(), side='right') - 1
+                    if row < 0 or not np.isfinite(r_all[d]):
+                        continue
+                    scores.append(min(SCORE_MAX, max(SCORE_MIN, BASE_SCORE + sum(weights[i] for i in rules if fired[row, i]))))
+                    returns.append(r_all[d])
+                scores, returns = np.array(scores), np.array(returns)
+                bull, bear = scores >= BULLISH_AT, scores <= BEARISH_AT
+                out['bullish'][c, a, h], out['bearish'][c, a, h] = bull.sum(), bear.sum()
+                out['hits'][c, a, h] = (bull & (returns > 0)).sum() + (bear & (returns < 0)).sum()
+                out['expected'][c, a, h] = bull.sum() * (returns > 0).mean() + bear.sum() * (returns < 0).mean()
+                out['ret_bullish'][c, a, h], out['ret_bearish'][c, a, h] = returns[bull].sum(), returns[bear].sum()
+                out['ic'][c, a, h] = np.corrcoef(scores, returns)[0, 1] if scores.std() > 1e-9 else np.nan
+    return out
+
+def test_pattern_sums_match_per_day_evaluation(history):
+    macro, closes = history
+    context = prepare(macro, closes, horizons=HORIZONS)
+    assert len(context['patterns']) < len(macro)
+    total = int(np.prod(context['grid_shape']))
+    picks = np.random.default_rng(1).choice(total, 6, replace=False)
+    multipliers = np.concatenate([grid_multipliers(context, i, i + 1) for i in picks])
+    multipliers[0] = 1.0  # the shipped weights
+
+    collapsed = evaluate(context, multipliers)
+    expected = per_day_stats(macro, closes, multipliers)
+    for name, values in expected.items():
+        np.testing.assert_allclose(collapsed[name], values, rtol=1e-9, atol=1e-12, err_msg=name)
+
+def test_parallel_sweep_matches_direct_evaluation(history):
+    macro, closes = history
+    context = prepare(macro, closes, horizons=HORIZONS, objective_horizon=20)
+    total = int(np.prod(context['grid_shape']))
+    direct = objective_values(context, evaluate(context, grid_multipliers(context, 0, total)))
+
+    np.testing.assert_array_equal(sweep(context, workers=1, chunk_size=997), direct)
+    np.testing.assert_array_equal(sweep(context, workers=2, chunk_size=4096), direct)
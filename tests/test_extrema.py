@@ -0,0 +1,51 @@
+import json
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from extrema import WINDOW_DAYS, RollingExtrema, load_extrema_cache, save_extrema_cache, update_from_history
+
+def brute_force(final, day):
+    """Max high / min low over the calendar window ending at day, from each day's latest values"""
+    inside = [(h, l) for d, (h, l) in final.items() if day - timedelta(days=WINDOW_DAYS) < d <= day]
+    return max(h for h, _ in inside), min(l for _, l in inside)
+
+def test_revisions_match_a_rolling_max_and_min():
+    rng = np.random.default_rng(7)
+    extrema, final = RollingExtrema(), {}
+    day = date(2025, 1, 2)
+    for _ in range(600):
+        day += timedelta(days=int(rng.choice([1, 1, 1, 3])))
+        # The forming bar is pushed a few times; revisions move its range up and down
+        for _ in range(int(rng.integers(1, 4))):
+            mid = 100 + rng.normal(0, 20)
+            high, low = mid + abs(rng.normal(0, 5)), mid - abs(rng.normal(0, 5))
+            extrema.push(day, high, low)
+            final[day] = (high, low)
+            assert (extrema.high, extrema.low) == brute_force(final, day)
+        if rng.random() < 0.1:
+            extrema = RollingExtrema.from_dict(json.loads(json.dumps(extrema.to_dict())))
+
+def test_revising_a_new_high_down_restores_the_older_high():
+    extrema = RollingExtrema()
+    extrema.push(date(2026, 10, 15), 110.0, 100.0)
+    extrema.push(date(2026, 10, 16), 120.0, 90.0)   # forming bar briefly beyond both extremes
+    extrema.push(date(2026, 10, 16), 105.0, 101.0)  # final values
+    assert (extrema.high, extrema.low) == (110.0, 100.0)
+    extrema.push(date(2026, 10, 15), 200.0, 0.0)    # older days are ignored
+    assert (extrema.high, extrema.low) == (110.0, 100.0)
+
+def test_history_frames_and_the_cache(tmp_path):
+    index = pd.bdate_range('2026-10-12', periods=5)
+    hist = pd.DataFrame({'High': [5.0, 7.0, 6.0, 4.0, 3.0], 'Low': [1.0, 2.0, 0.5, 2.0, 2.0]}, index=index)
+    extrema = update_from_history(RollingExtrema(), hist)
+    path = str(tmp_path / 'extrema.json')
+    save_extrema_cache({'^NDX': extrema}, path)
+    loaded = load_extrema_cache(path)['^NDX']
+    assert (loaded.high, loaded.low, loaded.last_date) == (7.0, 0.5, date(2026, 10, 16))
+
+    # Caches from before the newest day was kept apart are rebuilt instead of trusted
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'^NDX': {'last': '2026-10-16', 'highs': [['2026-10-16', 9.0]], 'lows': []}}, f)
+    assert load_extrema_cache(path) == {}
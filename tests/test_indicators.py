@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import (ATR_PERIOD, BB_PERIOD, BB_STD, MACD_FAST, MACD_SIGNAL, MACD_SLOW, RSI_PERIOD, SMA_PERIODS,
+                        compute_indicators, latest, update_indicators)
+from ohlcv_store import OHLCVStore
+
+def seeded_average(values, alpha):
+    """Running mean of the first 1/alpha values, exponential smoothing with alpha afterwards"""
+    average = None
+    for n, value in enumerate(values, start=1):
+        a = max(alpha, 1.0 / n)
+        average = value if average is None else average + a * (value - average)
+    return average
+
+def seeded_series(values, alpha):
+    return [seeded_average(values[:i + 1], alpha) for i in range(len(values))]
+
+def reference(close, high, low):
+    """Textbook indicator values from the whole series, one scalar at a time"""
+    n = len(close)
+    gains = [max(close[i] - close[i - 1], 0.0) for i in range(1, n)]
+    losses = [max(close[i - 1] - close[i], 0.0) for i in range(1, n)]
+    avg_gain, avg_loss = seeded_average(gains, 1 / RSI_PERIOD), seeded_average(losses, 1 / RSI_PERIOD)
+    rsi = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    ema_fast = seeded_series(close, 2 / (MACD_FAST + 1))
+    ema_slow = seeded_series(close, 2 / (MACD_SLOW + 1))
+    macd_line = [f - s for f, s in zip(ema_fast, ema_slow)]
+    signal = seeded_average(macd_line, 2 / (MACD_SIGNAL + 1))
+
+    tr = [high[0] - low[0]] + [max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+                               for i in range(1, n)]
+    atr = seeded_average(tr, 1 / ATR_PERIOD)
+
+    window = close[-BB_PERIOD:]
+    mid = sum(window) / BB_PERIOD
+    std = math.sqrt(sum((c - mid) ** 2 for c in window) / BB_PERIOD)
+    values = {f'sma{p}': sum(close[-p:]) / p if n >= p else np.nan for p in SMA_PERIODS}
+    values.update({
+        'rsi': rsi, 'macd': macd_line[-1], 'macd_signal': signal, 'macd_hist': macd_line[-1] - signal,
+        'atr': atr, 'atr_pct': atr / close[-1] * 100,
+        'bb_mid': mid, 'bb_upper': mid + BB_STD * std, 'bb_lower': mid - BB_STD * std,
+        'bb_pct_b': (close[-1] - (mid - BB_STD * std)) / (2 * BB_STD * std)
+    })
+    return values
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(11)
+    frames = {}
+    for symbol, periods in (('AAA', 260), ('BBB', 120), ('CCC', 230)):
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.015, periods))
+        spread = np.abs(rng.normal(0, 0.01, periods)) * close
+        frames[symbol] = pd.DataFrame({
+            'Open': close, 'High': close + spread, 'Low': close - spread, 'Close': close, 'Volume': 1.0
+        }, index=pd.bdate_range(end='2026-10-16', periods=periods))
+    return frames
+
+def test_vectorized_state_matches_the_scalar_reference(series):
+    symbols = list(series)
+    width = max(len(f) for f in series.values())
+    matrices = {}
+    for column in ('Close', 'High', 'Low'):
+        # Left-aligned, NaN padded like the pipeline's pending matrices
+        matrices[column] = np.full((len(symbols), width), np.nan)
+        for i, symbol in enumerate(symbols):
+            matrices[column][i, :len(series[symbol])] = series[symbol][column].to_numpy()
+    values = latest(compute_indicators(matrices['Close'], matrices['High'], matrices['Low'], symbols=symbols))
+
+    for i, symbol in enumerate(symbols):
+        frame = series[symbol]
+        expected = reference(list(frame['Close']), list(frame['High']), list(frame['Low']))
+        for name, value in expected.items():
+            np.testing.assert_allclose(values[name][i], value, rtol=1e-9, err_msg=f"{symbol} {name}")
+
+def test_bar_by_bar_updates_match_a_full_recomputation(tmp_path, series):
+    store = OHLCVStore(str(tmp_path / 'ohlcv'))
+    state_path = str(tmp_path / 'indicators.npz')
+    symbols = list(series)
+    days = sorted(set().union(*(frame.index for frame in series.values())))
+    for day in days:
+        for symbol, frame in series.items():
+            if day in frame.index:
+                bar = frame.loc[[day]]
+                # The bar is first stored while still forming, then revised to its final values
+                store.append(symbol, bar.assign(Close=bar['Close'] * 1.01, High=bar['High'] * 1.01))
+                update_indicators(store, symbols, state_path)
+                store.append(symbol, bar)
+        result = update_indicators(store, symbols, state_path)
+
+    for symbol, frame in series.items():
+        expected = reference(list(frame['Close']), list(frame['High']), list(frame['Low']))
+        for name, value in expected.items():
+            if np.isnan(value):
+                assert result[symbol][name] is None, (symbol, name)
+            else:
+                # to_records rounds to 6 decimals
+                assert result[symbol][name] == pytest.approx(value, abs=1e-6), (symbol, name)
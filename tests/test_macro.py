@@ -0,0 +1,67 @@
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from macro import RETRY_INTERVAL, FileMacroSource, expires_at, load_macro_snapshot, next_release
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def shipped_snapshot():
+    with open(os.path.join(REPO, 'macro_snapshot.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize('name, released, expected', [
+    ('us_inflation', '2026-08-12', '2026-09-13'),  # a day before the nominal 13th is still August's release
+    ('us_inflation', '2026-08-13', '2026-09-13'),
+    ('us_inflation', '2026-08-18', '2026-09-13'),  # late release
+    ('us_inflation', '2026-12-11', '2027-01-13'),
+    ('unemployment', '2026-08-07', '2026-09-04'),  # first Friday
+    ('unemployment', '2026-09-03', '2026-10-02'),  # released a day early
+    ('gdp_growth', '2026-07-30', '2026-08-27'),    # last Thursday
+    ('fed_rate', '2026-07-29', '2026-09-16'),
+    ('ecb_rate', '2026-07-23', '2026-09-10'),
+    ('fed_rate', '2026-12-09', '2027-01-27'),      # past the listed meetings: UNSCHEDULED_INTERVAL
+])
+def test_next_release_is_the_scheduled_date_after_the_current_period(name, released, expected):
+    assert next_release(name, {'released': released}) == date.fromisoformat(expected)
+
+def test_explicit_next_release_wins():
+    assert next_release('us_inflation', {'released': '2026-08-12', 'next_release': '2026-09-11'}) == date(2026, 9, 11)
+
+def test_shipped_snapshot_expires_at_the_next_release():
+    # Next up: GDP on the last Thursday of August, no hourly refetching before it
+    assert expires_at(shipped_snapshot(), utc(2026, 8, 22, 12)) == utc(2026, 8, 27)
+
+def test_due_release_is_retried_hourly():
+    now = utc(2026, 8, 28, 9)
+    assert expires_at(shipped_snapshot(), now) == now + RETRY_INTERVAL
+
+def test_long_overdue_release_waits_for_the_next_scheduled_date():
+    # Nothing released since August: wait for the FOMC decision instead of retrying every hour
+    assert expires_at(shipped_snapshot(), utc(2026, 10, 17, 12)) == utc(2026, 10, 28)
+
+def write_snapshot(path, inflation):
+    snapshot = shipped_snapshot()
+    snapshot['series']['us_inflation']['value'] = inflation
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+    return FileMacroSource(str(path))
+
+def test_cache_serves_only_its_own_source(tmp_path):
+    cache_path = str(tmp_path / 'macro_cache.json')
+    first = write_snapshot(tmp_path / 'a.json', 2.9)
+    second = write_snapshot(tmp_path / 'b.json', 3.5)
+    now = utc(2026, 8, 22, 12)
+
+    assert load_macro_snapshot(first, cache_path, now)[1] == 'source'
+    snapshot, origin = load_macro_snapshot(first, cache_path, now + timedelta(hours=2))
+    assert origin == 'cache'
+
+    snapshot, origin = load_macro_snapshot(second, cache_path, now + timedelta(hours=2))
+    assert origin == 'source'
+    assert snapshot['series']['us_inflation']['value'] == 3.5
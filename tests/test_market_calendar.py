@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+from market_calendar import needs_fetch
+
+NEW_YORK = pytz.timezone('America/New_York')
+
+def ny(text):
+    """'2026-10-16 16:45' New York time as a UTC-aware datetime"""
+    return NEW_YORK.localize(datetime.strptime(text, '%Y-%m-%d %H:%M')).astimezone(pytz.utc)
+
+@pytest.mark.parametrize('asset_type, last_fetch, now, expected', [
+    # Equity indices: NYSE 09:30-16:00, fetched once more within 30 minutes after the close
+    ('index', None, '2026-10-17 12:00', True),                            # never fetched
+    ('index', '2026-10-20 10:00', '2026-10-20 10:05', True),              # session running
+    ('index', '2026-10-20 08:00', '2026-10-20 09:15', False),             # before the open
+    ('index', '2026-10-16 16:10', '2026-10-17 12:00', True),              # last fetch before the final print
+    ('index', '2026-10-16 16:45', '2026-10-17 12:00', False),             # weekend
+    ('index', '2026-10-16 16:45', '2026-10-19 09:00', False),             # Monday before the open
+    ('index', '2026-10-16 16:45', '2026-10-19 09:45', True),              # Monday after the open
+    ('index', '2026-09-01 16:45', '2026-10-17 12:00', True),              # longer than MAX_SKIP ago
+    ('index', '2026-11-25 17:00', '2026-11-26 12:00', False),             # Thanksgiving
+    ('index', '2026-11-25 17:00', '2026-11-27 12:00', True),              # early close day, open
+    ('index', '2026-11-27 13:45', '2026-11-27 15:00', False),             # after the 13:00 early close
+    ('index', '2026-01-16 17:00', '2026-01-19 12:00', False),             # Martin Luther King Day
+    ('index', '2026-04-02 17:00', '2026-04-03 12:00', False),             # Good Friday
+    # COMEX gold: Sunday-Friday 18:00-17:00 with a daily break, open on most NYSE holidays
+    ('commodity', '2026-10-20 17:40', '2026-10-20 17:55', False),         # daily break
+    ('commodity', '2026-10-20 17:40', '2026-10-20 18:05', True),          # evening session
+    ('commodity', '2026-10-16 17:45', '2026-10-17 12:00', False),         # Saturday
+    ('commodity', '2026-10-16 17:45', '2026-10-18 17:30', False),         # Sunday before the open
+    ('commodity', '2026-10-16 17:45', '2026-10-18 18:30', True),          # Sunday evening open
+    ('commodity', '2026-01-19 10:00', '2026-01-19 11:00', True),          # trades on MLK Day
+    ('commodity', '2026-04-03 00:40', '2026-04-03 12:00', False),         # Good Friday closed
+    # Forex: Sunday 17:00 to Friday 17:00
+    ('forex', '2026-10-16 16:00', '2026-10-16 16:20', True),
+    ('forex', '2026-10-16 17:45', '2026-10-17 12:00', False),             # Saturday
+    ('forex', '2026-10-16 17:45', '2026-10-18 16:30', False),             # Sunday before the open
+    ('forex', '2026-10-16 17:45', '2026-10-18 17:30', True),              # Sunday after the open
+    ('forex', '2026-11-25 17:00', '2026-11-26 12:00', True),              # US holidays do not close FX
+    # Crypto trades around the clock
+    ('crypto', '2026-10-17 02:00', '2026-10-17 03:00', True),
+    ('crypto', '2026-12-25 08:00', '2026-12-25 08:05', True),
+])
+def test_needs_fetch(asset_type, last_fetch, now, expected):
+    assert needs_fetch(asset_type, ny(last_fetch) if last_fetch else None, ny(now)) == expected
+
+def test_unknown_asset_types_are_always_due():
+    assert needs_fetch('bond', ny('2026-10-17 02:00'), ny('2026-10-17 02:05'))
@@ -0,0 +1,105 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation import update_correlation
+from indicators import update_indicators
+from ohlcv_store import OHLCVStore, records_to_frame
+from providers import DataProvider, ReplayProvider, write_replay_file
+from update_dashboard import sync_history
+
+def bars(start, periods, first=100.0):
+    index = pd.bdate_range(start, periods=periods)
+    close = first + np.arange(periods, dtype=float)
+    return pd.DataFrame({'Open': close - 0.5, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': 1000.0 + np.arange(periods)}, index=index)
+
+def assert_same_bars(frame, expected):
+    assert list(frame.index.date) == list(expected.index.date)
+    np.testing.assert_array_equal(frame[list(expected.columns)].to_numpy(), expected.to_numpy())
+
+class RecordingReplay(DataProvider):
+    """ReplayProvider over a directory that may change between calls, remembering each request's start"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.starts = []
+
+    def history(self, symbols, period="1y", start=None):
+        self.starts.append(start)
+        return ReplayProvider(self.directory).history(symbols, period=period, start=start)
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(str(tmp_path / 'ohlcv'))
+
+def test_round_trip_and_memmap_reads(store):
+    hist = bars('2026-01-05', 30)
+    assert store.append('^NDX', hist) == 30
+
+    frame = store.read_frame('^NDX')
+    assert_same_bars(frame, hist)
+    assert isinstance(store.read('^NDX'), np.memmap)
+    window = store.read('^NDX', date(2026, 1, 12), date(2026, 1, 16))
+    assert list(records_to_frame(window)['Close']) == [105.0, 106.0, 107.0, 108.0, 109.0]
+    assert list(store.tail_frame('^NDX', 2)['Close']) == [128.0, 129.0]
+    assert store.last_date('^NDX') == date(2026, 2, 13)
+    assert store.read_frame('MISSING').empty
+
+def test_append_revises_the_newest_bar_and_ignores_older_ones(store):
+    store.append('^NDX', bars('2026-01-05', 10))
+    update = bars('2026-01-14', 4, first=500.0)  # 14th, 15th, 16th (newest stored), 19th
+    assert store.append('^NDX', update) == 2
+    closes = list(store.read_frame('^NDX')['Close'])
+    assert closes[:9] == [100.0 + i for i in range(9)]   # older bars untouched
+    assert closes[9:] == [502.0, 503.0]                  # revised newest bar, then the new one
+
+def test_sync_downloads_only_the_delta(tmp_path, store):
+    replay = str(tmp_path / 'replay')
+    write_replay_file(replay, '^NDX', bars('2026-01-05', 30))
+    provider = RecordingReplay(replay)
+    assert sync_history(store, ['^NDX'], provider) == {'^NDX'}
+
+    write_replay_file(replay, '^NDX', bars('2026-01-05', 33))
+    assert sync_history(store, ['^NDX'], provider) == {'^NDX'}
+    # The delta starts at the last finished bar, not at the first stored one
+    assert provider.starts == [None, '2026-02-12']
+    assert_same_bars(store.read_frame('^NDX'), bars('2026-01-05', 33))
+
+def test_forming_bar_revision_is_not_a_new_adjustment(tmp_path, store):
+    replay = str(tmp_path / 'replay')
+    write_replay_file(replay, '^NDX', bars('2026-01-05', 30))
+    provider = RecordingReplay(replay)
+    sync_history(store, ['^NDX'], provider)
+
+    hist = bars('2026-01-05', 31)
+    hist.iloc[-2, hist.columns.get_loc('Close')] = 555.0  # the bar that was still forming
+    write_replay_file(replay, '^NDX', hist)
+    sync_history(store, ['^NDX'], provider)
+    assert provider.starts == [None, '2026-02-12']
+    assert list(store.tail_frame('^NDX', 2)['Close']) == [555.0, 130.0]
+
+def test_new_adjustment_replaces_the_stored_history(tmp_path, store):
+    replay = str(tmp_path / 'replay')
+    write_replay_file(replay, '^NDX', bars('2026-01-05', 60))
+    provider = RecordingReplay(replay)
+    sync_history(store, ['^NDX'], provider)
+    state_path, corr_path = str(tmp_path / 'indicators.npz'), str(tmp_path / 'correlation.npz')
+    update_indicators(store, ['^NDX'], state_path)
+    update_correlation(store, ['^NDX'], corr_path)
+
+    # A 2:1 split: the provider now delivers every earlier bar halved
+    adjusted = bars('2026-01-05', 62)
+    adjusted.loc[adjusted.index[:60], ['Open', 'High', 'Low', 'Close']] /= 2
+    write_replay_file(replay, '^NDX', adjusted)
+    assert sync_history(store, ['^NDX'], provider) == {'^NDX'}
+
+    assert provider.starts == [None, '2026-03-26', '2026-01-05']
+    assert_same_bars(store.read_frame('^NDX'), adjusted)
+    # The incremental states notice and rebuild from the new history
+    assert update_indicators(store, ['^NDX'], state_path) == update_indicators(store, ['^NDX'], str(tmp_path / 'fresh.npz'))
+    live = update_correlation(store, ['^NDX'], corr_path)
+    fresh = update_correlation(store, ['^NDX'], str(tmp_path / 'fresh-correlation.npz'))
+    np.testing.assert_array_equal(live.volatility(20), fresh.volatility(20))
@@ -0,0 +1,47 @@
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import update_dashboard
+from providers import write_replay_file
+from telemetry import Profiler
+from watchlist import load_watchlist
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def busy_worker():
+    return sum(i * i for i in range(20000))
+
+def test_profile_includes_threads_started_inside_the_block(tmp_path):
+    with Profiler(str(tmp_path)) as profiler:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda _: busy_worker(), range(4)))
+
+    with open(profiler.report) as f:
+        assert 'busy_worker' in f.read()
+
+def test_daemon_writes_one_profile_per_tick_with_run_update(tmp_path, monkeypatch):
+    index = pd.bdate_range(end='2026-01-30', periods=60)
+    close = np.linspace(100, 110, len(index))
+    frame = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1.0}, index=index)
+    for symbol, _, _ in load_watchlist().config:
+        write_replay_file(str(tmp_path / 'replay'), symbol, frame)
+    monkeypatch.chdir(tmp_path)
+
+    code = update_dashboard.main([
+        '--provider', 'replay', '--replay-dir', 'replay', '--macro-source', os.path.join(REPO, 'macro_snapshot.json'),
+        '--daemon', '--max-ticks', '2', '--cadence', 'index=0.1', '--cadence', 'commodity=0.1',
+        '--cadence', 'crypto=0.1', '--cadence', 'forex=0.1', '--profile'
+    ])
+
+    assert code == 0
+    reports = sorted(glob.glob(os.path.join('data', 'profile', '*-cprofile.txt')))
+    assert len(reports) == 2
+    for report in reports:
+        with open(report) as f:
+            text = f.read()
+        assert 'run_update' in text
+        assert 'sync_history' in text
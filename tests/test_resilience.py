@@ -0,0 +1,102 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import resilience
+from fake_market_server import FakeMarketServer
+from providers import HttpProvider, write_replay_file
+from resilience import CircuitBreakers, ResilientProvider
+from telemetry import RunMetrics
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']
+
+@pytest.fixture
+def replay_dir(tmp_path):
+    index = pd.bdate_range(end='2026-01-30', periods=30)
+    close = np.linspace(100, 110, len(index))
+    for symbol in SYMBOLS:
+        write_replay_file(str(tmp_path / 'replay'), symbol,
+                          pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1.0}, index=index))
+    return str(tmp_path / 'replay')
+
+def make_provider(server, tmp_path, **kwargs):
+    breakers = kwargs.pop('breakers', None) or CircuitBreakers(str(tmp_path / 'breakers.json'))
+    provider = ResilientProvider(HttpProvider(server.url, timeout=5), rate=kwargs.pop('rate', 100), breakers=breakers, seed=1, **kwargs)
+    provider.begin_run()
+    return provider
+
+def test_retries_with_backoff_until_the_server_recovers(replay_dir, tmp_path, monkeypatch):
+    delays = []
+
+    with FakeMarketServer(replay_dir, fail_symbols=['AAA']) as server:
+        def backoff(attempt, rng):
+            delays.append(attempt)
+            if attempt == 1:
+                server.fail_symbols.clear()
+            return 0.01
+        monkeypatch.setattr(resilience, 'backoff_delay', backoff)
+
+        provider = make_provider(server, tmp_path, retries=3)
+        result = provider.history(['AAA'])
+
+    assert result['AAA'] is not None
+    assert server.requests['AAA'] == 3
+    assert delays == [0, 1]
+
+def test_rate_limited_request_waits_for_retry_after(replay_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(resilience, 'backoff_delay', lambda attempt, rng: 0.0)
+    with FakeMarketServer(replay_dir, rate_limit=1) as server:
+        provider = make_provider(server, tmp_path, retries=2, max_workers=1)
+        started = time.monotonic()
+        result = provider.history(['AAA', 'BBB'])
+        elapsed = time.monotonic() - started
+
+    assert all(hist is not None for hist in result.values())
+    assert server.requests['BBB'] >= 2
+    assert elapsed >= 1.0
+
+def test_breaker_opens_and_recovers_half_open(replay_dir, tmp_path):
+    breakers = CircuitBreakers(str(tmp_path / 'breakers.json'), threshold=2, cooldown=0.5)
+    with FakeMarketServer(replay_dir, fail_symbols=['BBB']) as server:
+        provider = make_provider(server, tmp_path, retries=0, breakers=breakers)
+        provider.history(['BBB'])
+        assert breakers.allow('BBB')
+        provider.history(['BBB'])
+        assert not breakers.allow('BBB')
+
+        # Open: the symbol is skipped without a request
+        requests = server.requests['BBB']
+        assert provider.history(['BBB'])['BBB'] is None
+        assert server.requests['BBB'] == requests
+
+        # Half-open trial fails: re-opened with twice the cooldown
+        time.sleep(0.6)
+        provider.history(['BBB'])
+        assert server.requests['BBB'] == requests + 1
+        assert breakers.state['BBB']['cooldown'] == 1.0
+
+        # Next trial succeeds and resets the breaker
+        time.sleep(1.1)
+        server.fail_symbols.clear()
+        assert provider.history(['BBB'])['BBB'] is not None
+        assert 'BBB' not in breakers.state
+
+def test_deadline_stops_new_requests(replay_dir, tmp_path):
+    metrics = RunMetrics()
+    with FakeMarketServer(replay_dir, latency=0.3) as server:
+        provider = make_provider(server, tmp_path, deadline=0.5, max_workers=1)
+        provider.begin_run(metrics)
+        started = time.monotonic()
+        result = provider.history(SYMBOLS)
+        elapsed = time.monotonic() - started
+
+    fetched = [symbol for symbol, hist in result.items() if hist is not None]
+    assert 1 <= len(fetched) < len(SYMBOLS)
+    assert elapsed < 1.2
+    assert sum(server.requests.values()) == len(fetched)
+    outcomes = {f['symbol']: f['outcome'] for f in metrics.fetches}
+    assert all(outcomes[symbol] == 'deadline' for symbol in SYMBOLS if symbol not in fetched)
+    # Symbols the deadline cut off do not count against their breakers
+    assert provider.breakers.state == {}
@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from scoring import MACRO_DEFAULTS, score_assets
+
+ASSETS = ['US100', 'US30', 'SP500', 'GOLD', 'BTC', 'EURUSD']
+
+def baseline_score(asset_key, us_inflation, fed_rate, unemployment, gdp_growth, ecb_rate):
+    """Frozen copy of the if/elif chain the rule table replaced, with the macro values as arguments"""
+    score = 50
+    factors = []
+
+    if asset_key == 'US100':
+        if fed_rate > 4.0:
+            score -= 15
+            factors.append(f"Fed restrictiv ({fed_rate:g}%) belastet Tech-Bewertungen")
+        else:
+            score += 10
+            factors.append("Niedrigere Zinsen bullish für Growth")
+        if gdp_growth > 2.0:
+            score += 15
+            factors.append(f"GDP {gdp_growth:+.1f}% bestätigt robustes Wachstum")
+        if us_inflation < 3.0:
+            score += 10
+            factors.append(f"Inflation {us_inflation:.1f}% näher Fed-Ziel")
+        score += 10
+        factors.append("Soft Landing Szenario: KI-Investitionen treiben Margen")
+
+    elif asset_key == 'US30':
+        if fed_rate > 4.0:
+            score -= 5
+            factors.append("Höhere Zinsen moderat belastend")
+        else:
+            score += 15
+            factors.append("Zinssenkung bullish für Industrie/Value")
+        if gdp_growth > 2.0:
+            score += 15
+            factors.append("GDP-Wachstum stützt industrielle Nachfrage")
+        if unemployment < 4.5:
+            score += 10
+            factors.append(f"Arbeitsmarkt stabil ({unemployment:.1f}%)")
+        score += 5
+        factors.append("Dividendenrendite attraktiv vs Bonds")
+
+    elif asset_key == 'SP500':
+        if fed_rate > 4.0:
+            score -= 10
+        else:
+            score += 15
+        if gdp_growth > 2.0:
+            score += 15
+            factors.append(f"Breites GDP-Wachstum {gdp_growth:+.1f}%")
+        if us_inflation < 3.0:
+            score += 10
+            factors.append("Inflationskontrolle ermöglicht Fed-Pivot")
+        score += 10
+        factors.append("Gewinnwachstum +8% erwartet 2025")
+
+    elif asset_key == 'GOLD':
+        if fed_rate > 4.0:
+            score -= 10
+            factors.append("Hohe Nominalzinsen belasten Gold")
+        else:
+            score += 20
+            factors.append("Zinssenkungen treiben Goldpreis")
+        score += 15
+        factors.append("Realzinsen sinken erwartet (Fed-Pivot)")
+        if us_inflation > 2.5:
+            score += 15
+            factors.append(f"Inflation {us_inflation:.1f}% > Ziel = Inflationsschutz-Nachfrage")
+        score += 10
+        factors.append("Geopolitische Unsicherheit (Ukraine, Taiwan)")
+        score += 10
+        factors.append("Zentralbankkäufe bleiben robust")
+
+    elif asset_key == 'BTC':
+        if fed_rate > 4.0:
+            score -= 15
+            factors.append("Restrictive Fed belastet Risk-Assets")
+        else:
+            score += 20
+            factors.append("Liquditätsflut bei Zinssenkungen")
+        score += 10
+        factors.append("ETF-Zuflüsse stabil")
+        score += 5
+        factors.append("Halving-Zyklus historisch bullisch")
+
+    elif asset_key == 'EURUSD':
+        rate_diff = fed_rate - ecb_rate
+        if rate_diff > 1.0:
+            score -= 25
+            factors.append(f"Zinsdifferenzial {rate_diff:+.1f}% zugunsten USD")
+        elif rate_diff < 0:
+            score += 20
+            factors.append("EZB-Zins > Fed = EUR-Stärke")
+        if gdp_growth > 2.0:
+            score -= 10
+        score += 5
+        factors.append("EZB Inflation 2.4% näher Ziel als US")
+
+    score = max(10, min(95, score))
+    if score >= 60:
+        sentiment = 'Bullish'
+    elif score <= 40:
+        sentiment = 'Bearish'
+    else:
+        sentiment = 'Neutral'
+    return sentiment, score, factors
+
+def random_macro(rng):
+    # Thresholds sit on a 0.5 grid, so half of the draws land exactly on one
+    def draw(low, high):
+        return round(rng.uniform(low, high) * 2) / 2 if rng.random() < 0.5 else round(rng.uniform(low, high), 2)
+    return {
+        'us_inflation': draw(0.0, 6.0), 'fed_rate': draw(0.0, 7.0), 'unemployment': draw(2.0, 8.0),
+        'gdp_growth': draw(-3.0, 5.0), 'ecb_rate': draw(-0.5, 5.0)
+    }
+
+def test_defaults_reproduce_the_original_texts():
+    results = score_assets(ASSETS)
+    assert results['US100'][2][0] == "Fed restrictiv (4.5%) belastet Tech-Bewertungen"
+    assert results['US100'][2][1] == "GDP +2.4% bestätigt robustes Wachstum"
+    assert results['EURUSD'][2][0] == "Zinsdifferenzial +1.5% zugunsten USD"
+    for key in ASSETS:
+        assert results[key] == baseline_score(key, **MACRO_DEFAULTS)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_rule_table_matches_the_if_elif_chain(seed):
+    rng = random.Random(seed)
+    for _ in range(600):
+        macro = random_macro(rng)
+        results = score_assets(ASSETS, macro)
+        for key in ASSETS:
+            assert results[key] == baseline_score(key, **macro), (key, macro)
+
+def test_assets_without_rules_stay_neutral():
+    assert score_assets(['NEW'])['NEW'] == ('Neutral', 50, [])
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import snapshot_log
+from snapshot_log import TIERS, SnapshotLog
+
+START = 1_760_000_400  # on an hour boundary, 09:00 UTC
+
+@pytest.fixture
+def small_rings(monkeypatch):
+    """Tiny ring capacities so every ring wraps several times"""
+    monkeypatch.setitem(snapshot_log.TIER_SPECS, '15m', (15 * 60, 5))
+    monkeypatch.setitem(snapshot_log.TIER_SPECS, '1h', (60 * 60, 4))
+
+def model(snapshots, tier):
+    """Expected tier content: latest snapshot per bucket, older ones ignored, last capacity buckets"""
+    step, capacity = snapshot_log.TIER_SPECS[tier]
+    kept = []
+    for ts, price in snapshots:
+        if kept and ts < kept[-1][0]:
+            continue
+        if kept and ts // step == kept[-1][0] // step:
+            kept[-1] = (ts, price)
+        else:
+            kept.append((ts, price))
+    return kept if capacity is None else kept[-capacity:]
+
+def as_pairs(records):
+    return [(int(r['ts']), float(r['price'])) for r in records]
+
+def write(log, snapshots):
+    for ts, price in snapshots:
+        log.append('^NDX', ts, price, 0.5, 60)
+
+def test_rings_wrap_and_keep_the_newest_buckets(tmp_path, small_rings):
+    log = SnapshotLog(str(tmp_path))
+    snapshots = [(START + i * 15 * 60, 100.0 + i) for i in range(40)]  # 10 hours
+    write(log, snapshots)
+
+    for tier, _, _ in TIERS:
+        assert as_pairs(log.read('^NDX', tier)) == model(snapshots, tier), tier
+    assert [p for _, p in as_pairs(log.read('^NDX', '15m'))] == [135.0, 136.0, 137.0, 138.0, 139.0]
+    # One point per hour, the latest in it
+    assert [p for _, p in as_pairs(log.read('^NDX', '1h'))] == [127.0, 131.0, 135.0, 139.0]
+    assert as_pairs(log.read('^NDX', '1d')) == [(START + 39 * 15 * 60, 139.0)]
+
+def test_same_bucket_snapshots_revise_the_newest_record(tmp_path, small_rings):
+    log = SnapshotLog(str(tmp_path))
+    write(log, [(START, 100.0), (START + 60, 101.0), (START + 14 * 60, 102.0)])
+    assert as_pairs(log.read('^NDX', '15m')) == [(START + 14 * 60, 102.0)]
+    assert log._written(log.path('^NDX', '15m'), 5) == 1
+
+    # Revision right after the ring wrapped overwrites the newest slot, not the oldest
+    later = [(START + i * 15 * 60, 200.0 + i) for i in range(1, 8)]
+    write(log, later + [(START + 7 * 15 * 60 + 30, 999.0)])
+    assert [p for _, p in as_pairs(log.read('^NDX', '15m'))] == [203.0, 204.0, 205.0, 206.0, 999.0]
+
+def test_older_snapshots_are_ignored(tmp_path, small_rings):
+    log = SnapshotLog(str(tmp_path))
+    write(log, [(START + 3600, 100.0), (START, 50.0)])
+    for tier, _, _ in TIERS:
+        assert as_pairs(log.read('^NDX', tier)) == [(START + 3600, 100.0)]
+
+def test_windows_match_the_model_across_the_wrap_point(tmp_path, small_rings):
+    rng = np.random.default_rng(3)
+    gaps = rng.choice([30, 5 * 60, 15 * 60, 40 * 60, 3 * 3600, 20 * 3600], 300)
+    ts = START + np.cumsum(gaps)
+    snapshots = [(int(t), float(p)) for t, p in zip(ts, rng.normal(100, 5, len(ts)))]
+    log = SnapshotLog(str(tmp_path))
+    write(log, snapshots)
+
+    for tier, _, _ in TIERS:
+        expected = model(snapshots, tier)
+        assert as_pairs(log.read('^NDX', tier)) == expected, tier
+        for n in (1, 3, len(expected), len(expected) + 5):
+            assert as_pairs(log.tail('^NDX', tier, n)) == expected[-n:], (tier, n)
+        for _ in range(20):
+            start, end = sorted(rng.integers(START, int(ts[-1]) + 3600, 2))
+            window = [(t, p) for t, p in expected if start <= t <= end]
+            assert as_pairs(log.read('^NDX', tier, start, end)) == window, (tier, start, end)
+
+def test_full_size_rings_wrap(tmp_path):
+    # The shipped capacities: 8 days of 15-minute snapshots wrap the 7-day ring
+    log = SnapshotLog(str(tmp_path))
+    snapshots = [(START + i * 15 * 60, float(i)) for i in range(8 * 24 * 4)]
+    write(log, snapshots)
+    for tier, _, _ in TIERS:
+        records = log.read('^NDX', tier)
+        assert as_pairs(records) == model(snapshots, tier), tier
+        assert np.all(np.diff(records['ts']) > 0)
+    assert len(log.read('^NDX', '15m')) == 7 * 24 * 4
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from sparklines import SPARK_POINTS, SPARK_WIDTH, downsample_paths, lttb_batch
+
+def reference_lttb(x, y, threshold):
+    """Textbook single-series LTTB (Steinarsson 2013), one bucket at a time"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        next_hi = min(int((i + 2) * every) + 1, n)
+        cx, cy = np.mean(x[hi:next_hi]), np.mean(y[hi:next_hi])
+        area = [abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a])) for j in range(lo, hi)]
+        a = lo + int(np.argmax(area))
+        selected.append(a)
+    return selected + [n - 1]
+
+@pytest.mark.parametrize('n, threshold', [(49, 48), (50, 48), (96, 48), (97, 48), (400, 48), (1000, 3), (253, 17)])
+def test_keeps_the_endpoints_and_returns_exactly_threshold_points(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.tile(np.arange(n, dtype=float), (5, 1))
+    y = np.cumsum(rng.normal(0, 1, (5, n)), axis=1)
+    keep = lttb_batch(x, y, threshold)
+    assert keep.shape == (5, threshold)
+    assert (keep[:, 0] == 0).all() and (keep[:, -1] == n - 1).all()
+    assert (np.diff(keep, axis=1) > 0).all()
+    for row in range(5):
+        assert list(keep[row]) == reference_lttb(x[row], y[row], threshold)
+
+def test_short_series_are_returned_whole():
+    x = np.tile(np.arange(10.0), (2, 1))
+    assert (lttb_batch(x, x, 48) == np.arange(10)).all()
+
+def test_paths_have_threshold_points_from_first_to_last():
+    rng = np.random.default_rng(3)
+    ts = np.arange(0, 400 * 86400, 86400)
+    series = {'long': (ts, 100 + np.cumsum(rng.normal(0, 1, 400))), 'short': (ts[:20], np.linspace(5, 1, 20)),
+              'single': (ts[:1], [1.0])}
+    paths = downsample_paths(series)
+    points = paths['long']['path'][1:].split('L')
+    assert len(points) == SPARK_POINTS
+    assert points[0].startswith('0,') and points[-1].startswith(f'{SPARK_WIDTH},')
+    assert paths['short']['path'].count('L') + 1 == 20
+    assert paths['short']['trend'] == 'down' and (paths['short']['low'], paths['short']['high']) == (1.0, 5.0)
+    assert paths['single'] is None
@@ -0,0 +1,28 @@
+from telemetry import RunMetrics
+
+def run(latencies):
+    clock = iter(range(100)).__next__
+    metrics = RunMetrics(clock=clock)
+    for i, seconds in enumerate(latencies):
+        metrics.fetch(f'S{i}', seconds, 1, 100, 'ok')
+    metrics.fetch('SKIPPED', 0.0, 0, 0, 'breaker')
+    metrics.cache('extrema', 3, 1)
+    metrics.finish('written')
+    return metrics.prometheus()
+
+def samples(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+def test_every_metric_is_a_gauge_of_the_last_run():
+    text = run([0.2, 0.4, 3.0])
+    types = [line.split()[-1] for line in text.splitlines() if line.startswith('# TYPE')]
+    assert types and set(types) == {'gauge'}
+    values = samples(text)
+    assert values['dashboard_fetch_latency_seconds{stat="p50"}'] == '0.4'
+    assert values['dashboard_fetch_latency_seconds{stat="max"}'] == '3.0'
+    assert values['dashboard_fetch_symbols{outcome="breaker"}'] == '1.0'
+    assert values['dashboard_cache_hit_ratio{cache="extrema"}'] == '0.75'
+
+def test_runs_without_fetches_export_no_latency():
+    values = samples(run([]))
+    assert not any(name.startswith('dashboard_fetch_latency_seconds') for name in values)
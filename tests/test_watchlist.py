@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from watchlist import WATCHLIST_PATH, load_watchlist
+
+GROUPS = [{'id': 'indices', 'label': 'Indizes'}, {'id': 'crypto', 'label': 'Krypto'}]
+
+def write(tmp_path, assets, groups=GROUPS):
+    path = tmp_path / 'watchlist.json'
+    path.write_text(json.dumps({'groups': groups, 'formats': {'fx': {'price': 4}}, 'assets': assets}), encoding='utf-8')
+    return str(path)
+
+def test_the_shipped_watchlist_loads():
+    watchlist = load_watchlist(WATCHLIST_PATH)
+    ids = {group for group, _ in watchlist.groups}
+    assert all(watchlist.group_for(key, asset_type) in ids for _, key, asset_type in watchlist.config)
+
+def test_group_defaults_to_a_declared_type(tmp_path):
+    watchlist = load_watchlist(write(tmp_path, [{'symbol': 'BTC-USD', 'key': 'BTC', 'type': 'crypto'}]))
+    assert watchlist.group_for('BTC', 'crypto') == 'crypto'
+
+@pytest.mark.parametrize('asset, message', [
+    ({'symbol': '^NDX', 'key': 'NASDAQ', 'type': 'index', 'group': 'indizes'}, "unbekannte Gruppe 'indizes'"),
+    ({'symbol': '^NDX', 'key': 'NASDAQ', 'type': 'index'}, "unbekannte Gruppe 'index' (Standard aus type 'index')"),
+    ({'symbol': '^NDX', 'key': 'NASDAQ', 'type': 'index', 'group': ['indices']}, "unbekannte Gruppe"),
+    ({'symbol': '^NDX', 'key': 'NASDAQ', 'group': 'indices'}, "ohne type"),
+    ({'symbol': '^NDX', 'key': 'NAS DAQ', 'type': 'index', 'group': 'indices'}, "ungültiger Key"),
+    ({'symbol': '^NDX', 'key': 'NASDAQ', 'type': 'index', 'group': 'indices', 'format': 'bp'}, "unbekanntes Format"),
+])
+def test_invalid_entries_are_rejected_on_load(tmp_path, asset, message):
+    with pytest.raises(ValueError) as error:
+        load_watchlist(write(tmp_path, [asset]))
+    assert message in str(error.value)
+
+def test_duplicate_keys_and_bad_group_ids_are_rejected(tmp_path):
+    asset = {'symbol': '^NDX', 'key': 'NASDAQ', 'type': 'index', 'group': 'indices'}
+    with pytest.raises(ValueError, match="doppelt"):
+        load_watchlist(write(tmp_path, [asset, dict(asset, symbol='QQQ')]))
+    with pytest.raises(ValueError, match="ungültige Gruppen-ID"):
+        load_watchlist(write(tmp_path, [asset], GROUPS + [{'id': 'Big Tech'}]))
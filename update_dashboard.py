@@ -5,196 +5,348 @@ Holt Marktdaten von Yahoo Finance + Fundamentalanalyse
 Läuft automatisch alle 15 Minuten via GitHub Actions
 """
 
-import yfinance as yf
+import argparse
+import asyncio
+import hashlib
+import os
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import pytz
 import json
 import sys
+import time
 import traceback
+from contextlib import contextmanager, nullcontext
 
-def fetch_asset_data(symbol, name, asset_type='index'):
-    """Fetch price data for a single asset"""
-    try:
-        print(f"  Fetching {symbol}...")
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="5d", interval="1d")
-        
-        if hist is None or len(hist) < 2:
-            print(f"  ⚠️  Keine Daten für {symbol}")
-            return None
+from alerts import ALERTS_PATH, WebhookSink, load_alerts, snapshot_fields
+from backtest import BACKTEST_REPORT_PATH
+from correlation import CORR_WINDOWS, MATRIX_MAX_KEYS, summarize as summarize_correlation, update_correlation
+from extrema import WINDOW_DAYS, RollingExtrema, load_extrema_cache, save_extrema_cache, update_from_history
+from ohlcv_store import OHLCVStore
+from indicators import update_indicators
+from market_calendar import needs_fetch
+from macro import (
+    FALLBACK_SNAPSHOT, MACRO_GRID, MACRO_SOURCE_DEFAULT, SERIES as MACRO_SERIES,
+    format_change, format_value, load_macro_snapshot, make_macro_source, snapshot_values
+)
+from providers import FetchError, HttpProvider, RecordingProvider, ReplayProvider, YahooProvider
+from resilience import ResilientProvider
+from scheduler import RefreshScheduler, run_scheduler
+from scoring import score_assets
+from snapshot_log import SnapshotLog
+from sparklines import SPARK_HEIGHT, SPARK_RANGES, SPARK_WIDTH, build_sparklines
+from telemetry import PROM_PATH, Profiler, RunMetrics
+from watchlist import WATCHLIST_PATH, load_watchlist
+
+HEARTBEAT_PATH = os.path.join('data', 'heartbeat.json')
+FETCH_LOG_PATH = os.path.join('data', 'fetch_log.json')
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+FETCH_BATCH_SIZE = 100
+FETCH_MAX_WORKERS = 8
+FETCH_RATE = 2.0
+FETCH_RETRIES = 3
+FETCH_DEADLINE = 300
+SHARD_DIR = 'shards'
+SHARD_SIZE = 100
+CORRELATION_SHARD = 'correlation.json'
 
-        current = float(hist['Close'].iloc[-1])
-        prev = float(hist['Close'].iloc[-2])
-        change_pct = ((current - prev) / prev) * 100
+# Symbols, groups and display rules; main() reloads it for --watchlist
+WATCHLIST = load_watchlist()
+ASSETS_CONFIG = WATCHLIST.config
+
+# Assets in the dashboard's correlation heatmap
+HEATMAP_KEYS = 8
+
+# Card footer per asset status; live = fetched this run
+UPDATE_LABELS = {
+    'live': "Aktualisiert: {time} Uhr",
+    'closed': "Markt geschlossen · Stand {time} Uhr",
+    'stale': "⚠️ Abruf fehlgeschlagen · Stand {time} Uhr"
+}
 
+class StageTimer:
+    """Accumulates wall time per pipeline stage"""
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
         try:
-            info = ticker.info
-            week_52_high = float(info.get('fiftyTwoWeekHigh', current * 1.1))
-            week_52_low = float(info.get('fiftyTwoWeekLow', current * 0.9))
-        except:
-            week_52_high = current * 1.1
-            week_52_low = current * 0.9
-            
-        distance = ((current / week_52_high - 1) * 100)
-
-        return {
-            'symbol': symbol,
-            'name': name,
-            'type': asset_type,
-            'current': current,
-            'change_pct': change_pct,
-            '52w_high': week_52_high,
-            '52w_low': week_52_low,
-            'distance': distance,
-            'last_update': datetime.now(pytz.timezone('Europe/Berlin')).strftime('%H:%M:%S')
-        }
-    except Exception as e:
-        print(f"  ❌ Fehler bei {symbol}: {str(e)}")
-        return None
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - started
 
-def calculate_fundamental_score(asset_key):
-    """Calculate Bullish/Bearish score based on fundamental factors"""
-    
-    us_inflation = 2.9
-    fed_rate = 4.50
-    unemployment = 4.1
-    gdp_growth = 2.4
-    ecb_rate = 3.0
-    
-    score = 50
-    factors = []
-    
-    if asset_key == 'US100':
-        if fed_rate > 4.0:
-            score -= 15
-            factors.append("Fed restrictiv (4.5%) belastet Tech-Bewertungen")
-        else:
-            score += 10
-            factors.append("Niedrigere Zinsen bullish für Growth")
-            
-        if gdp_growth > 2.0:
-            score += 15
-            factors.append("GDP +2.4% bestätigt robustes Wachstum")
-            
-        if us_inflation < 3.0:
-            score += 10
-            factors.append("Inflation 2.9% näher Fed-Ziel")
-            
-        score += 10
-        factors.append("Soft Landing Szenario: KI-Investitionen treiben Margen")
-        
-    elif asset_key == 'US30':
-        if fed_rate > 4.0:
-            score -= 5
-            factors.append("Höhere Zinsen moderat belastend")
-        else:
-            score += 15
-            factors.append("Zinssenkung bullish für Industrie/Value")
-            
-        if gdp_growth > 2.0:
-            score += 15
-            factors.append("GDP-Wachstum stützt industrielle Nachfrage")
-            
-        if unemployment < 4.5:
-            score += 10
-            factors.append("Arbeitsmarkt stabil (4.1%)")
-            
-        score += 5
-        factors.append("Dividendenrendite attraktiv vs Bonds")
-        
-    elif asset_key == 'SP500':
-        if fed_rate > 4.0:
-            score -= 10
-        else:
-            score += 15
-            
-        if gdp_growth > 2.0:
-            score += 15
-            factors.append("Breites GDP-Wachstum +2.4%")
-            
-        if us_inflation < 3.0:
-            score += 10
-            factors.append("Inflationskontrolle ermöglicht Fed-Pivot")
-            
-        score += 10
-        factors.append("Gewinnwachstum +8% erwartet 2025")
-        
-    elif asset_key == 'GOLD':
-        if fed_rate > 4.0:
-            score -= 10
-            factors.append("Hohe Nominalzinsen belasten Gold")
-        else:
-            score += 20
-            factors.append("Zinssenkungen treiben Goldpreis")
-            
-        score += 15
-        factors.append("Realzinsen sinken erwartet (Fed-Pivot)")
-        
-        if us_inflation > 2.5:
-            score += 15
-            factors.append("Inflation 2.9% > Ziel = Inflationsschutz-Nachfrage")
-            
-        score += 10
-        factors.append("Geopolitische Unsicherheit (Ukraine, Taiwan)")
-        score += 10
-        factors.append("Zentralbankkäufe bleiben robust")
-        
-    elif asset_key == 'BTC':
-        if fed_rate > 4.0:
-            score -= 15
-            factors.append("Restrictive Fed belastet Risk-Assets")
-        else:
-            score += 20
-            factors.append("Liquditätsflut bei Zinssenkungen")
-            
-        score += 10
-        factors.append("ETF-Zuflüsse stabil")
-        score += 5
-        factors.append("Halving-Zyklus historisch bullisch")
-        
-    elif asset_key == 'EURUSD':
-        rate_diff = fed_rate - ecb_rate
-        
-        if rate_diff > 1.0:
-            score -= 25
-            factors.append("Zinsdifferenzial +1.5% zugunsten USD")
-        elif rate_diff < 0:
-            score += 20
-            factors.append("EZB-Zins > Fed = EUR-Stärke")
-            
-        if gdp_growth > 2.0:
-            score -= 10
-            
-        score += 5
-        factors.append("EZB Inflation 2.4% näher Ziel als US")
-        
-    score = max(10, min(95, score))
-    
-    if score >= 60:
-        sentiment = 'Bullish'
-    elif score <= 40:
-        sentiment = 'Bearish'
+    def format(self):
+        return " | ".join(f"{name} {seconds:.2f}s" for name, seconds in self.durations.items())
+
+def make_provider(args):
+    """Build the data provider selected on the command line
+
+    Every provider is wrapped in a ResilientProvider (rate limit, retries,
+    circuit breakers, run deadline).
+    """
+    if args.provider == 'replay':
+        if not args.replay_dir:
+            raise ValueError("--provider replay braucht --replay-dir")
+        provider = ReplayProvider(args.replay_dir, latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    elif args.provider == 'http':
+        if not args.http_url:
+            raise ValueError("--provider http braucht --http-url")
+        provider = HttpProvider(args.http_url)
     else:
-        sentiment = 'Neutral'
-        
-    return sentiment, score, factors
+        provider = YahooProvider(max_workers=FETCH_MAX_WORKERS)
+    if args.record:
+        provider = RecordingProvider(provider, args.record)
+    return ResilientProvider(provider, rate=args.rate, retries=args.retries, deadline=args.deadline or None,
+                             max_workers=FETCH_MAX_WORKERS, seed=args.seed)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Trading Dashboard Updater")
+    parser.add_argument('--provider', choices=['yahoo', 'replay', 'http'], default='yahoo', help="Datenquelle (Standard: yahoo)")
+    parser.add_argument('--replay-dir', help="Verzeichnis mit aufgezeichneten Kursdaten für --provider replay")
+    parser.add_argument('--http-url', help="Basis-URL für --provider http, z.B. http://127.0.0.1:8765")
+    parser.add_argument('--rate', type=float, default=FETCH_RATE, help="Max. Anfragen pro Sekunde")
+    parser.add_argument('--retries', type=int, default=FETCH_RETRIES, help="Wiederholungen pro Anfrage")
+    parser.add_argument('--deadline', type=float, default=FETCH_DEADLINE, help="Zeitbudget für alle Abrufe eines Laufs in Sekunden (0 = unbegrenzt)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Replay: künstliche Latenz pro Anfrage in Sekunden")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Replay: Fehlerwahrscheinlichkeit pro Symbol (0-1)")
+    parser.add_argument('--seed', type=int, help="Replay: Seed für reproduzierbare Fehler")
+    parser.add_argument('--macro-source', default=MACRO_SOURCE_DEFAULT, help="Makro-Snapshot: Datei oder http(s)-URL")
+    parser.add_argument('--watchlist', default=WATCHLIST_PATH, help="Watchlist-Datei (Symbole, Gruppen, Formate)")
+    parser.add_argument('--output-mode', choices=['html', 'split'], default='html',
+                        help="html: komplette Seite; split: statische Shell + JSON-Daten mit Client-Rendering")
+    parser.add_argument('--force-write', action='store_true', help="Dateien auch bei unverändertem Inhalt neu schreiben")
+    parser.add_argument('--record', help="Antworten des Providers zusätzlich in dieses Verzeichnis aufzeichnen")
+    parser.add_argument('--daemon', action='store_true', help="Dauerbetrieb: jede Asset-Klasse in ihrem eigenen Takt aktualisieren")
+    parser.add_argument('--cadence', action='append', default=[], metavar='TYP=SEKUNDEN',
+                        help="Daemon: Takt einer Asset-Klasse überschreiben, z.B. crypto=30 (mehrfach möglich)")
+    parser.add_argument('--max-ticks', type=int, help="Daemon: nach so vielen Ticks beenden")
+    parser.add_argument('--alerts', default=ALERTS_PATH, help="Datei mit Alarm-Regeln")
+    parser.add_argument('--alert-webhook', help="Webhook-URL für ausgelöste Alarme (überschreibt alerts.json)")
+    parser.add_argument('--prom-file', default=PROM_PATH, help="Prometheus-Textfile für den node_exporter")
+    parser.add_argument('--correlation-keys', type=int, default=MATRIX_MAX_KEYS,
+                        help=f"Korrelations- und Beta-Matrizen für die ersten N Assets (Standard: {MATRIX_MAX_KEYS})")
+    parser.add_argument('--profile', action='store_true', help="cProfile- und tracemalloc-Bericht nach data/profile/ schreiben")
+    return parser.parse_args(argv)
+
+def build_asset_data(symbol, name, asset_type, hist, extrema=None, fetched_at=None, status='live'):
+    """Turn a daily history frame into the asset dict used by generate_html()
+
+    52-week high/low come from the rolling extrema, which is advanced with
+    the bars in hist, so no ticker.info request is needed. fetched_at (UTC,
+    default now) is when the bars were last downloaded.
+    """
+    if hist is None or len(hist) < 2:
+        print(f"  ⚠️  Keine Daten für {symbol}")
+        return None
+
+    current = float(hist['Close'].iloc[-1])
+    prev = float(hist['Close'].iloc[-2])
+    change_pct = ((current - prev) / prev) * 100
+
+    if extrema is None:
+        extrema = RollingExtrema()
+    update_from_history(extrema, hist)
+    week_52_high, week_52_low = extrema.high, extrema.low
+    distance = ((current / week_52_high - 1) * 100)
+
+    return {
+        'symbol': symbol,
+        'name': name,
+        'type': asset_type,
+        'current': current,
+        'change_pct': change_pct,
+        '52w_high': week_52_high,
+        '52w_low': week_52_low,
+        'distance': distance,
+        'last_update': (fetched_at or datetime.now(timezone.utc)).astimezone(pytz.timezone('Europe/Berlin')).strftime('%H:%M:%S'),
+        'status': status
+    }
+
+def _fetch_batches(provider, symbols, batch_size, start, label):
+    """Yield (symbol, history) for every symbol the provider answers, batch_size symbols per request"""
+    for begin in range(0, len(symbols), batch_size):
+        batch = symbols[begin:begin + batch_size]
+        print(f"  Fetching {len(batch)} Symbole ({batch[0]} ... {batch[-1]}, {label})...")
+        try:
+            histories = provider.history(batch, period="1y", start=start.isoformat() if start else None)
+        except (FetchError, OSError) as e:
+            print(f"  ❌ Batch-Fehler ({batch[0]} ... {batch[-1]}): {str(e)}")
+            continue
+        for symbol, hist in histories.items():
+            if hist is not None:
+                yield symbol, hist
+
+def sync_history(store, symbols, provider, batch_size=FETCH_BATCH_SIZE):
+    """Bring the local OHLCV store up to date with delta-only downloads
+
+    Unknown symbols are backfilled with one year of bars. Known symbols are
+    grouped by their last finished bar and only re-request from that date
+    on, which also refreshes today's still-forming bar. If the finished bar
+    comes back with a different adjusted price (a split or dividend since
+    it was stored), the symbol's stored span is downloaded again and
+    replaced instead. Returns the set of symbols the provider answered for.
+    """
+    synced = set()
+    requests = {}
+    for symbol in symbols:
+        requests.setdefault(store.overlap_date(symbol), []).append(symbol)
 
-def get_fundamental_analysis(key, data):
-    """Generate detailed fundamental German analysis"""
+    resync = {}
+    for start, group in requests.items():
+        label = "1y" if start is None else f"ab {start.isoformat()}"
+        for symbol, hist in _fetch_batches(provider, group, batch_size, start, label):
+            try:
+                if start is not None and store.adjustment_changed(symbol, hist):
+                    resync.setdefault(store.first_date(symbol), []).append(symbol)
+                    continue
+                store.append(symbol, hist)
+                synced.add(symbol)
+            except Exception as e:
+                print(f"  ❌ Speicherfehler bei {symbol}: {str(e)}")
+
+    for first, group in resync.items():
+        print(f"  🔄 {', '.join(group)}: neue Split-/Dividenden-Anpassung – Historie wird neu geladen")
+        for symbol, hist in _fetch_batches(provider, group, batch_size, first, f"komplett ab {first.isoformat()}"):
+            try:
+                store.replace(symbol, hist)
+                synced.add(symbol)
+            except Exception as e:
+                print(f"  ❌ Speicherfehler bei {symbol}: {str(e)}")
+    return synced
+
+def load_fetch_log(path=FETCH_LOG_PATH):
+    """{symbol: UTC datetime of the last successful download}"""
+    try:
+        with open(path) as f:
+            return {symbol: datetime.fromisoformat(ts) for symbol, ts in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+def save_fetch_log(log, path=FETCH_LOG_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({symbol: ts.isoformat() for symbol, ts in log.items()}, f, indent=2)
+
+def load_previous_assets(path='data_summary.json'):
+    """Asset dicts of the last published summary, the fallback when the store has nothing"""
+    try:
+        with open(path) as f:
+            assets = json.load(f).get('assets', {})
+    except (OSError, ValueError):
+        return {}
+    previous = {}
+    for key, entry in assets.items():
+        if '52w_high' not in entry:
+            continue
+        previous[key] = {
+            'symbol': entry['symbol'], 'name': key, 'type': entry['type'],
+            'current': entry['price'], 'change_pct': entry['change'],
+            '52w_high': entry['52w_high'], '52w_low': entry['52w_low'], 'distance': entry['distance'],
+            'last_update': entry['last_update'], 'indicators': entry.get('indicators')
+        }
+    return previous
+
+def fetch_all_assets(assets_config, provider=None, batch_size=FETCH_BATCH_SIZE, store=None, refresh=None, cards=None,
+                     metrics=None):
+    """Fetch all assets from a data provider through the local OHLCV store
+
+    The store is synced with delta-only batched downloads, then every card is
+    built from stored bars. The 52-week deques only see the newest bars unless
+    they are missing or have fallen behind, in which case they are rebuilt
+    from the stored year without touching the network. Returns {key: data}
+    in config order; failed symbols map to None so one bad ticker never takes
+    down the rest of the run.
+
+    refresh limits the sync to those symbols (default: all); symbols outside
+    it reuse their entry from cards, the previous tick's results, as is.
+    Symbols whose market has not traded since their last download (see
+    market_calendar.needs_fetch) are served from the store without a network
+    call. A failed download falls back to the stored bars, or to the last
+    published summary, and the card is marked stale instead of dropped.
+    metrics (telemetry.RunMetrics) counts calendar skips and extrema cache hits.
+    """
+    provider = provider or YahooProvider()
+    store = store or OHLCVStore()
+    now = datetime.now(timezone.utc)
+    fetch_log = load_fetch_log()
+    types = {symbol: asset_type for symbol, _, asset_type in assets_config}
+    refresh = set(types if refresh is None else refresh)
+    due = [symbol for symbol in types if symbol in refresh
+           and (not store.count(symbol) or needs_fetch(types[symbol], fetch_log.get(symbol), now))]
+    skipped = len([symbol for symbol in types if symbol in refresh]) - len(due)
+    if skipped:
+        print(f"  💤 {skipped} Symbole übersprungen (Markt geschlossen)")
+    synced = sync_history(store, due, provider, batch_size) if due else set()
+    fetch_log.update({symbol: now for symbol in synced})
+    save_fetch_log(fetch_log)
+
+    extrema_cache = load_extrema_cache()
+    previous = None
+    results = {}
+    extrema_hits = extrema_misses = 0
+    for symbol, key, asset_type in assets_config:
+        if symbol not in refresh and cards and cards.get(key):
+            results[key] = cards[key]
+            continue
+        status = 'live' if symbol in synced else ('stale' if symbol in due else 'closed')
+        try:
+            hist = store.tail_frame(symbol, 5)
+            extrema = extrema_cache.get(symbol)
+            if len(hist) and (extrema is None or extrema.last_date is None or extrema.last_date < hist.index[0].date()):
+                extrema = RollingExtrema()
+                hist = store.read_frame(symbol, start=hist.index[-1].date() - timedelta(days=WINDOW_DAYS))
+                extrema_misses += 1
+            else:
+                extrema_hits += 1
+            results[key] = build_asset_data(symbol, key, asset_type, hist, extrema, fetch_log.get(symbol), status)
+        except Exception as e:
+            print(f"  ❌ Fehler bei {symbol}: {str(e)}")
+            results[key] = None
+        if results[key]:
+            extrema_cache[symbol] = extrema
+        elif status == 'stale':
+            previous = load_previous_assets() if previous is None else previous
+            if key in previous:
+                results[key] = dict(previous[key], status='stale')
+                print(f"  ♻️  {key}: letzter veröffentlichter Stand")
+
+    save_extrema_cache(extrema_cache)
+    if metrics is not None:
+        metrics.cache('calendar', skipped, len(due))
+        metrics.cache('extrema', extrema_hits, extrema_misses)
+    return results
+
+def calculate_fundamental_score(asset_key, macro=None):
+    """Calculate Bullish/Bearish score based on fundamental factors
+
+    The rules live in scoring.FUNDAMENTAL_RULES; macro is a macro snapshot
+    (see macro.load_macro_snapshot), defaulting to the fallback values.
+    """
+    return score_assets([asset_key], snapshot_values(macro) if macro else None)[asset_key]
+
+def get_fundamental_analysis(key, data, score=None, macro=None):
+    """Generate detailed fundamental German analysis
+
+    score is an optional precomputed calculate_fundamental_score(key) result,
+    macro the macro snapshot the texts quote.
+    """
     
-    sentiment, confidence, factors = calculate_fundamental_score(key)
+    macro = macro or FALLBACK_SNAPSHOT
+    sentiment, confidence, factors = score or calculate_fundamental_score(key, macro)
     change = data['change_pct']
     
-    us_inflation = "2.9%"
-    fed_rate = "4.50%"
-    gdp = "2.4%"
-    unemployment = "4.1%"
-    ecb_rate = "3.00%"
+    us_inflation = format_value(macro, 'us_inflation')
+    fed_rate = format_value(macro, 'fed_rate')
+    gdp = format_value(macro, 'gdp_growth')
+    unemployment = format_value(macro, 'unemployment')
+    ecb_rate = format_value(macro, 'ecb_rate')
     
     # Build trend text
-    if key == 'EURUSD':
+    if WATCHLIST.trend_style(key) == 'fx':
         if change > 0.5:
             trend_text = "<strong>EUR-Stärke</strong> mit +" + str(round(change, 2)) + "%. Überraschende EZB-Hawkishness oder USD-Schwäche."
         elif change < -0.5:
@@ -215,80 +367,238 @@ def get_fundamental_analysis(key, data):
 
     factors_html = "<br>".join([f"• {f}" for f in factors[:4]])
     
-    macro_contexts = {
-        'US100': f"Tech-Sektor unter Einfluss von Fed-Politik ({fed_rate}) und KI-Investitionszyklus. Inflation {us_inflation} bestimmt Pivot-Erwartungen.",
-        'US30': f"Industriewerte profitieren von GDP-Wachstum ({gdp}) und stabilem Arbeitsmarkt ({unemployment}). Value-Rotation bei Zinssenkungen.",
-        'SP500': f"Breites Marktumfeld: Fed bei {fed_rate}, Inflation {us_inflation}, GDP {gdp}. Soft Landing-Szenario mit +8% Gewinnwachstum erwartet.",
-        'GOLD': f"Gold profitiert von erwartetem Fed-Pivot (aktuell {fed_rate}) und Inflationsschutz ({us_inflation}). Realzinsen sinkend.",
-        'BTC': f"Krypto korreliert mit Tech-Aktien. Fed-Restriktion ({fed_rate}) belastet, Pivot würde Liqudität freisetzen.",
-        'EURUSD': f"Währungspaar getrieben durch Zinsdifferenzial (Fed {fed_rate} vs EZB {ecb_rate}). Carry-Trade begünstigt USD."
-    }
+    macro_context = WATCHLIST.context(key).format(
+        us_inflation=us_inflation, fed_rate=fed_rate, gdp_growth=gdp, unemployment=unemployment, ecb_rate=ecb_rate
+    )
     
     confidence_text = f"<strong>Fundamental Confidence {confidence:.0f}%</strong> – basiert auf Makro-Regime, nicht technischen Indikatoren."
     
-    analysis = trend_text + "<br><br><strong>📊 Fundamentale Treiber:</strong><br>" + factors_html + "<br><br><strong>🌍 Makro-Regime:</strong><br>" + macro_contexts.get(key, 'Aktuelles Makroumfeld analysieren.') + "<br><br>" + confidence_text
+    peer = data.get('correlation_peer')
+    if peer:
+        direction = "Gleichlauf" if peer['corr'] >= 0 else "Gegenlauf"
+        macro_context += f"<br>Gemessen ({peer['window']} Tage): stärkster {direction} mit {peer['key']} (Korrelation {peer['corr']:+.2f})."
+
+    analysis = trend_text + "<br><br><strong>📊 Fundamentale Treiber:</strong><br>" + factors_html + "<br><br><strong>🌍 Makro-Regime:</strong><br>" + macro_context + "<br><br>" + confidence_text
     
     return analysis, sentiment, confidence
 
-def generate_html(assets_data):
-    """Generate HTML dashboard with fundamental analysis"""
-    asset_cards = ""
+def read_static(name):
+    with open(os.path.join(STATIC_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+def format_price(key, data, value=None):
+    """Price formatted the way the dashboard shows it"""
+    value = data['current'] if value is None else value
+    return "{:,.{}f}".format(value, WATCHLIST.format_for(key, data['type'])['price'])
+
+def format_card_values(key, data):
+    """All display strings of one card, shared by the HTML and the content digest"""
+    change_sign = "+" if data['change_pct'] > 0 else ""
+    decimals = WATCHLIST.format_for(key, data['type'])
+    fmt = {
+        'price': format_price(key, data),
+        'change': f"{change_sign}{data['change_pct']:.2f}%",
+        'high': "{:,.{}f}".format(data['52w_high'], decimals['high']),
+        'distance': f"{data['distance']:+.1f}%"
+    }
+
+    ind = data.get('indicators') or {}
+    fmt['rsi'] = "{:.0f}".format(ind['rsi']) if ind.get('rsi') is not None else "–"
+    if ind.get('rsi') is not None and ind['rsi'] >= 70:
+        fmt['rsi_color'] = "#ff3b30"
+    elif ind.get('rsi') is not None and ind['rsi'] <= 30:
+        fmt['rsi_color'] = "#34c759"
+    else:
+        fmt['rsi_color'] = "var(--text-primary)"
+    if ind.get('macd_hist') is not None:
+        fmt['macd'] = "{:+,.{}f}".format(ind['macd_hist'], decimals['macd'])
+        fmt['macd_color'] = "#34c759" if ind['macd_hist'] > 0 else "#ff3b30"
+    else:
+        fmt['macd'], fmt['macd_color'] = "–", "var(--text-primary)"
+    fmt['bb'] = "{:.0f}%".format(ind['bb_pct_b'] * 100) if ind.get('bb_pct_b') is not None else "–"
+    fmt['status'] = data.get('status', 'live')
+
+    sparklines = data.get('sparklines') or {}
+    for name, _, _ in SPARK_RANGES:
+        spark = sparklines.get(name)
+        fmt[f'spark_{name}'] = spark['path'] if spark else ""
+        fmt[f'spark_{name}_class'] = f"sparkline spark-{spark['trend']}" if spark else "sparkline"
+        fmt[f'spark_{name}_range'] = f"{format_price(key, data, spark['low'])} – {format_price(key, data, spark['high'])}" if spark else "–"
+    return fmt
+
+def card_payload(key, data, analysis):
+    """Everything one card shows, as used by the HTML page and the JSON payload"""
+    text, sentiment, confidence = analysis
+    if sentiment == 'Bullish':
+        confidence_color = "#34c759"
+    elif sentiment == 'Bearish':
+        confidence_color = "#ff3b30"
+    else:
+        confidence_color = "#8e8e93"
+
+    card = {
+        'key': key,
+        'sentiment': sentiment,
+        'sentiment_class': f"sentiment-{sentiment.lower()}",
+        'change_class': "positive" if data['change_pct'] > 0 else "negative",
+        'confidence': confidence,
+        'confidence_text': f"{confidence:.0f}%",
+        'confidence_color': confidence_color,
+        'last_update': data['last_update'],
+        'analysis': text
+    }
+    card.update(format_card_values(key, data))
+    card['update_text'] = UPDATE_LABELS[card['status']].format(time=data['last_update'])
+    return card
+
+def sparkline_markup(card):
+    """Inline SVG sparklines of one card (paths are precomputed, no client-side charting)"""
+    return '<div class="sparklines">' + "".join(
+        f'<div class="sparkline-item"><div class="sparkline-header"><span>{label}</span><span>{card[f"spark_{name}_range"]}</span></div>'
+        f'<svg class="{card[f"spark_{name}_class"]}" viewBox="0 0 {SPARK_WIDTH} {SPARK_HEIGHT}" preserveAspectRatio="none">'
+        f'<path d="{card[f"spark_{name}"]}"/></svg></div>'
+        for name, label, _ in SPARK_RANGES
+    ) + '</div>'
+
+def macro_payload(macro):
+    """Macro grid items as label/value/change/color dicts"""
+    items = []
+    for name in MACRO_GRID:
+        change_text, change_color = format_change(macro, name)
+        items.append({'label': MACRO_SERIES[name]['label'], 'value': format_value(macro, name), 'change': change_text, 'color': change_color})
+    return items
+
+def correlation_color(value):
+    if value is None:
+        return "transparent"
+    return f"rgba(52, 199, 89, {value:.2f})" if value >= 0 else f"rgba(255, 59, 48, {-value:.2f})"
+
+def correlation_payload(correlation, max_keys=HEATMAP_KEYS):
+    """Heatmap (middle window, first max_keys assets), volatility and movers as display strings"""
+    if not correlation:
+        return {}
+    short, middle, long_ = CORR_WINDOWS[0], CORR_WINDOWS[len(CORR_WINDOWS) // 2], CORR_WINDOWS[-1]
+    payload = {'window': f"{middle} Tage", 'keys': [], 'rows': [], 'movers': []}
+    if 'keys' in correlation:
+        keys = correlation['keys'][:max_keys]
+        matrix = correlation['corr'][f"{middle}d"]
+        payload['keys'] = keys
+        for i, key in enumerate(keys):
+            vol = correlation['volatility'][key][f"{middle}d"]
+            payload['rows'].append({
+                'key': key,
+                'cells': [{'text': "–" if v is None else f"{v:.2f}", 'color': correlation_color(v)} for v in matrix[i][:len(keys)]],
+                'vol': "–" if vol is None else f"{vol:.0f}%"
+            })
+    for mover in correlation['movers']:
+        payload['movers'].append({
+            'pair': " ↔ ".join(mover['pair']),
+            'text': f"{short}T {mover[f'corr_{short}d']:+.2f} · {long_}T {mover[f'corr_{long_}d']:+.2f}",
+            'change': f"{mover['change']:+.2f}",
+            'color': "#34c759" if mover['change'] > 0 else "#ff3b30"
+        })
+    return payload
+
+def summary_correlation(correlation):
+    """correlation without the pairwise matrices: data_summary.json is committed on every change,
+    the heatmap lives in index.html or the correlation shard"""
+    return {name: value for name, value in (correlation or {}).items() if name not in ('corr', 'beta')}
+
+def correlation_markup(payload):
+    """HTML of the correlation section; client.js renders the same markup in split mode"""
+    if not payload:
+        return ""
+    parts = [f'<div class="corr-title">🔗 Korrelation {payload["window"]}</div>']
+    if payload['keys']:
+        parts.append('<table class="corr-table"><tr><th></th>' + "".join(f"<th>{key}</th>" for key in payload['keys']) + '<th>Vol</th></tr>')
+        for row in payload['rows']:
+            cells = "".join(f'<td style="background: {cell["color"]}">{cell["text"]}</td>' for cell in row['cells'])
+            parts.append(f'<tr><th>{row["key"]}</th>{cells}<td class="corr-vol">{row["vol"]}</td></tr>')
+        parts.append('</table>')
+    if payload['movers']:
+        parts.append('<div class="corr-movers">' + "".join(
+            f'<div class="corr-mover"><span class="corr-pair">{m["pair"]}</span><span class="corr-text">{m["text"]}</span>'
+            f'<span class="corr-change" style="color: {m["color"]}">{m["change"]}</span></div>'
+            for m in payload['movers']
+        ) + '</div>')
+    return "".join(parts)
+
+def content_digest(assets_data, analyses, macro, output_mode='html', correlation=None):
+    """SHA-256 over everything the dashboard shows, excluding timestamps
+
+    Two runs with the same digest render the same page apart from the
+    "last update" times, so the second one does not need to write anything.
+    """
+    content = {
+        'output_mode': output_mode,
+        'macro': {name: [format_value(macro, name), format_change(macro, name)] for name in MACRO_GRID},
+        'correlation': correlation_payload(correlation),
+        'links': report_links(),
+        'assets': {key: [format_card_values(key, data), analyses[key]] for key, data in assets_data.items()}
+    }
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def read_previous_digest(path='data_summary.json'):
+    try:
+        with open(path) as f:
+            return json.load(f).get('content_hash')
+    except (OSError, ValueError):
+        return None
+
+def write_heartbeat(digest, path=HEARTBEAT_PATH):
+    """Record that a run happened without touching the published files"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'checked_at': datetime.now().isoformat(), 'content_hash': digest}, f)
+
+def generate_html(assets_data, analyses=None, macro=None, correlation=None):
+    """Generate HTML dashboard with fundamental analysis
+
+    analyses optionally maps key -> precomputed get_fundamental_analysis() result,
+    correlation is a correlation.summarize() result.
+    """
+    macro = macro or FALLBACK_SNAPSHOT
+    asset_cards = []
 
     for key, data in assets_data.items():
         if not data:
             continue
 
-        analysis, sentiment, confidence = get_fundamental_analysis(key, data)
-        
-        sentiment_class = f"sentiment-{sentiment.lower()}"
-        change_class = "positive" if data['change_pct'] > 0 else "negative"
-        change_sign = "+" if data['change_pct'] > 0 else ""
-        
-        if sentiment == 'Bullish':
-            confidence_color = "#34c759"
-        elif sentiment == 'Bearish':
-            confidence_color = "#ff3b30"
+        if analyses and key in analyses:
+            analysis, sentiment, confidence = analyses[key]
         else:
-            confidence_color = "#8e8e93"
-
-        # Format price
-        if data['type'] == 'crypto':
-            price_fmt = "{:,.0f}".format(data['current'])
-        elif data['type'] == 'commodity':
-            price_fmt = "{:,.2f}".format(data['current'])
-        elif key == 'EURUSD':
-            price_fmt = "{:.4f}".format(data['current'])
-        else:
-            price_fmt = "{:,.2f}".format(data['current'])
-
-        high_fmt = "{:,.0f}".format(data['52w_high']) if key != 'EURUSD' else "{:.4f}".format(data['52w_high'])
+            analysis, sentiment, confidence = get_fundamental_analysis(key, data, macro=macro)
+        
+        card = card_payload(key, data, (analysis, sentiment, confidence))
 
-        asset_cards += f"""
+        asset_cards.append(f"""
         <div class="card">
             <div class="card-header">
                 <div class="asset-name">{key}</div>
-                <div class="sentiment-badge {sentiment_class}">
-                    <span>●</span>{sentiment}
+                <div class="sentiment-badge {card['sentiment_class']}">
+                    <span>●</span>{card['sentiment']}
                 </div>
             </div>
             <div class="price-display">
-                <div class="current-price">{price_fmt}</div>
-                <div class="price-change {change_class}">
-                    {change_sign}{data['change_pct']:.2f}%
+                <div class="current-price">{card['price']}</div>
+                <div class="price-change {card['change_class']}">
+                    {card['change']}
                 </div>
             </div>
+            {sparkline_markup(card)}
             <div class="confidence-section">
                 <div class="confidence-header">
                     <span>Fundamental Confidence</span>
-                    <span style="color: {confidence_color}">{confidence:.0f}%</span>
+                    <span style="color: {card['confidence_color']}">{card['confidence_text']}</span>
                 </div>
                 <div class="confidence-bar">
-                    <div class="confidence-fill" style="width: {confidence}%; background: {confidence_color}"></div>
+                    <div class="confidence-fill" style="width: {card['confidence']}%; background: {card['confidence_color']}"></div>
                 </div>
             </div>
             <div class="last-update">
                 <span>↻</span>
-                <span>Aktualisiert: {data['last_update']} Uhr</span>
+                <span>{card['update_text']}</span>
             </div>
             <div class="ai-analysis">
                 <div class="ai-header">
@@ -306,82 +616,71 @@ def generate_html(assets_data):
                 <div class="stats-grid">
                     <div class="stat-item">
                         <div class="stat-label">52W Hoch</div>
-                        <div class="stat-value">{high_fmt}</div>
+                        <div class="stat-value">{card['high']}</div>
                     </div>
                     <div class="stat-item">
                         <div class="stat-label">Abstand 52W</div>
-                        <div class="stat-value">{data['distance']:+.1f}%</div>
+                        <div class="stat-value">{card['distance']}</div>
                     </div>
                     <div class="stat-item">
                         <div class="stat-label">Makro-Regime</div>
-                        <div class="stat-value" style="color: {confidence_color}; font-size: 11px;">Soft Landing</div>
+                        <div class="stat-value" style="color: {card['confidence_color']}; font-size: 11px;">Soft Landing</div>
+                    </div>
+                </div>
+                <div class="stats-grid">
+                    <div class="stat-item">
+                        <div class="stat-label">RSI 14</div>
+                        <div class="stat-value" style="color: {card['rsi_color']}">{card['rsi']}</div>
+                    </div>
+                    <div class="stat-item">
+                        <div class="stat-label">MACD Hist</div>
+                        <div class="stat-value" style="color: {card['macd_color']}">{card['macd']}</div>
+                    </div>
+                    <div class="stat-item">
+                        <div class="stat-label">Bollinger %B</div>
+                        <div class="stat-value">{card['bb']}</div>
                     </div>
                 </div>
             </div>
         </div>
-        """
+        """)
+
+    macro_items = "".join(f"""<div class="macro-item">
+<div class="macro-label">{item['label']}</div>
+<div class="macro-value">{item['value']}</div>
+<div class="macro-change" style="color: {item['color']}">{item['change']}</div>
+</div>
+""" for item in macro_payload(macro))
 
     now = datetime.now(pytz.timezone('Europe/Berlin'))
-    
-    html = """<!DOCTYPE html>
+
+    return render_page(
+        head='<meta http-equiv="refresh" content="900">\n',
+        styles="<style>\n" + read_static('dashboard.css') + "</style>",
+        updated=now.strftime('%d.%m.%Y %H:%M:%S'),
+        macro_items=macro_items,
+        correlation=correlation_markup(correlation_payload(correlation)),
+        asset_cards="".join(asset_cards),
+        scripts="<script>\n" + read_static('dashboard.js') + "</script>",
+        links=report_links()
+    )
+
+def report_links():
+    """Footer links to generated reports (backtest.py) that exist next to the page"""
+    if not os.path.exists(BACKTEST_REPORT_PATH):
+        return ""
+    return f'<p style="margin-top: 4px;"><a href="{BACKTEST_REPORT_PATH}" style="color: var(--accent-blue);">📈 Backtest der Fundamental-Scores</a></p>\n'
+
+def render_page(head, styles, updated, macro_items, asset_cards, scripts, nav="", correlation="", links=""):
+    """Page skeleton shared by the full HTML page and the static shell"""
+    return """<!DOCTYPE html>
 <html lang="de">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-<meta http-equiv="refresh" content="900">
-<title>Hybrid Trader Pro - Fundamental Edition</title>
+""" + head + """<title>Hybrid Trader Pro - Fundamental Edition</title>
 <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-<style>
-:root { --bg-primary: #000000; --bg-secondary: #1c1c1e; --bg-card: #2c2c2e; --bg-hover: #3a3a3c; --text-primary: #ffffff; --text-secondary: #8e8e93; --accent-bullish: #34c759; --accent-bearish: #ff3b30; --accent-teal: #00d4aa; --accent-blue: #007aff; --accent-purple: #af52de; --border: #38383a; }
-* { margin: 0; padding: 0; box-sizing: border-box; }
-body { font-family: 'Inter', -apple-system, sans-serif; background: var(--bg-primary); color: var(--text-primary); min-height: 100vh; -webkit-font-smoothing: antialiased; }
-.container { max-width: 480px; margin: 0 auto; padding: 16px; }
-header { display: flex; justify-content: space-between; align-items: center; padding: 12px 0 20px; }
-.logo-text { font-size: 20px; font-weight: 700; background: linear-gradient(135deg, var(--accent-teal), var(--accent-blue)); -webkit-background-clip: text; -webkit-text-fill-color: transparent; }
-.status-badge { background: rgba(0, 212, 170, 0.15); border: 1px solid var(--accent-teal); color: var(--accent-teal); padding: 6px 12px; border-radius: 20px; font-size: 11px; font-weight: 600; display: flex; align-items: center; gap: 6px; }
-.status-dot { width: 6px; height: 6px; background: var(--accent-teal); border-radius: 50%; animation: pulse 2s infinite; }
-@keyframes pulse { 0%, 100% { opacity: 1; } 50% { opacity: 0.3; } }
-.welcome-text { font-size: 28px; font-weight: 300; color: var(--text-secondary); margin-bottom: 4px; }
-.welcome-text strong { color: var(--text-primary); font-weight: 600; }
-.subtitle { color: var(--text-secondary); font-size: 13px; margin-bottom: 20px; }
-.info-banner { background: var(--bg-secondary); border-radius: 16px; padding: 16px; margin-bottom: 20px; border-left: 3px solid var(--accent-blue); }
-.info-text { font-size: 13px; color: var(--text-secondary); line-height: 1.5; }
-.info-time { font-size: 12px; color: var(--accent-teal); margin-top: 8px; font-weight: 500; }
-.macro-grid { display: grid; grid-template-columns: repeat(2, 1fr); gap: 12px; margin-bottom: 24px; }
-.macro-item { background: var(--bg-secondary); border-radius: 16px; padding: 16px; text-align: center; border: 1px solid var(--border); }
-.macro-label { font-size: 10px; color: var(--text-secondary); text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 6px; }
-.macro-value { font-size: 22px; font-weight: 700; margin-bottom: 4px; }
-.macro-change { font-size: 12px; font-weight: 600; }
-.card { background: linear-gradient(145deg, var(--bg-secondary), rgba(44,44,46,0.8)); border: 1px solid var(--border); border-radius: 24px; padding: 20px; margin-bottom: 16px; overflow: hidden; }
-.card-header { display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 12px; }
-.asset-name { font-size: 28px; font-weight: 700; letter-spacing: -0.5px; }
-.sentiment-badge { padding: 6px 14px; border-radius: 20px; font-size: 12px; font-weight: 700; text-transform: uppercase; display: flex; align-items: center; gap: 6px; }
-.sentiment-bullish { background: rgba(52, 199, 89, 0.15); color: var(--accent-bullish); border: 1px solid rgba(52, 199, 89, 0.3); }
-.sentiment-bearish { background: rgba(255, 59, 48, 0.15); color: var(--accent-bearish); border: 1px solid rgba(255, 59, 48, 0.3); }
-.sentiment-neutral { background: rgba(142, 142, 147, 0.15); color: var(--text-secondary); border: 1px solid rgba(142, 142, 147, 0.3); }
-.price-display { display: flex; align-items: baseline; gap: 12px; margin-bottom: 16px; }
-.current-price { font-size: 32px; font-weight: 700; letter-spacing: -1px; }
-.price-change { font-size: 15px; font-weight: 600; padding: 4px 10px; border-radius: 8px; }
-.positive { color: var(--accent-bullish); background: rgba(52, 199, 89, 0.15); }
-.negative { color: var(--accent-bearish); background: rgba(255, 59, 48, 0.15); }
-.confidence-section { margin-bottom: 12px; }
-.confidence-header { display: flex; justify-content: space-between; margin-bottom: 6px; font-size: 13px; color: var(--text-secondary); }
-.confidence-bar { height: 6px; background: var(--bg-hover); border-radius: 3px; overflow: hidden; }
-.confidence-fill { height: 100%; border-radius: 3px; transition: width 0.5s ease; }
-.last-update { display: flex; align-items: center; gap: 6px; font-size: 12px; color: var(--text-secondary); margin-bottom: 16px; }
-.ai-analysis { background: rgba(0, 122, 255, 0.08); border-left: 3px solid var(--accent-blue); border-radius: 12px; padding: 16px; margin-bottom: 16px; }
-.ai-header { display: flex; align-items: center; gap: 8px; margin-bottom: 12px; color: var(--accent-blue); font-weight: 600; font-size: 14px; }
-.ai-text { font-size: 13px; line-height: 1.6; color: var(--text-secondary); }
-.ai-text strong { color: var(--text-primary); font-weight: 600; }
-.btn { width: 100%; padding: 14px; border-radius: 12px; border: none; font-size: 14px; font-weight: 500; cursor: pointer; background: var(--bg-hover); color: var(--text-primary); border: 1px solid var(--border); }
-.stats-grid { display: grid; grid-template-columns: repeat(3, 1fr); gap: 12px; margin-top: 16px; padding-top: 16px; border-top: 1px solid var(--border); }
-.stat-item { text-align: center; }
-.stat-label { font-size: 10px; color: var(--text-secondary); text-transform: uppercase; margin-bottom: 4px; }
-.stat-value { font-size: 14px; font-weight: 600; }
-.expandable-content { max-height: 0; overflow: hidden; transition: max-height 0.3s ease; }
-.expandable-content.expanded { max-height: 300px; }
-.footer { text-align: center; padding: 40px 0; color: var(--text-secondary); font-size: 12px; }
-</style>
+""" + styles + """
 </head>
 <body>
 <div class="container">
@@ -393,105 +692,375 @@ header { display: flex; justify-content: space-between; align-items: center; pad
 <div class="subtitle">Fundamental Analysis | Auto-Refresh 15 Min</div>
 <div class="info-banner">
 <div class="info-text">🚀 Dashboard aktualisiert sich automatisch alle 15 Minuten via GitHub Actions</div>
-<div class="info-time">Letztes Update: """ + now.strftime('%d.%m.%Y %H:%M:%S') + """</div>
-</div>
-<div class="macro-grid">
-<div class="macro-item">
-<div class="macro-label">US Inflation</div>
-<div class="macro-value">2.9%</div>
-<div class="macro-change" style="color: var(--accent-bearish)">+0.1%</div>
-</div>
-<div class="macro-item">
-<div class="macro-label">Fed Rate</div>
-<div class="macro-value">4.50%</div>
-<div class="macro-change" style="color: var(--text-secondary)">0.00%</div>
-</div>
-<div class="macro-item">
-<div class="macro-label">Unemployment</div>
-<div class="macro-value">4.1%</div>
-<div class="macro-change" style="color: var(--accent-bullish)">-0.1%</div>
-</div>
-<div class="macro-item">
-<div class="macro-label">GDP Growth</div>
-<div class="macro-value">2.4%</div>
-<div class="macro-change" style="color: var(--accent-bullish)">+0.2%</div>
-</div>
+<div class="info-time" id="last-update">Letztes Update: """ + updated + """</div>
 </div>
-""" + asset_cards + """
+<div class="macro-grid" id="macro-grid">
+""" + macro_items + """</div>
+<div class="correlation" id="correlation">""" + correlation + """</div>
+""" + nav + """<div id="cards">""" + asset_cards + """</div>
 <div class="footer">
 <p>Fundamental Macro Dashboard</p>
 <p style="margin-top: 4px; opacity: 0.7;">Daten: Yahoo Finance | Keine Anlageberatung</p>
+""" + links + """</div>
 </div>
-</div>
-<script>
-function toggleOverview(asset) {
-    var content = document.getElementById(asset + '-overview');
-    var arrow = document.getElementById(asset + '-arrow');
-    if (content.classList.contains('expanded')) {
-        content.classList.remove('expanded');
-        arrow.textContent = '▼';
-    } else {
-        content.classList.add('expanded');
-        arrow.textContent = '▲';
-    }
-}
-</script>
+""" + scripts + """
 </body>
 </html>"""
-    
-    return html
 
-def main():
-    """Main function"""
+def write_static_shell(output_dir='.'):
+    """Write the fingerprinted CSS/JS and the index.html shell for split mode
+
+    Files are only written when their content changed, and superseded
+    fingerprints are removed, so the shell normally stays byte-identical
+    and long-cacheable.
+    """
+    css = read_static('dashboard.css')
+    js = read_static('dashboard.js') + read_static('client.js')
+    assets_dir = os.path.join(output_dir, 'assets')
+    os.makedirs(assets_dir, exist_ok=True)
+
+    names = {}
+    for prefix, ext, content in (('dashboard', 'css', css), ('app', 'js', js)):
+        fingerprint = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+        names[ext] = f"{prefix}.{fingerprint}.{ext}"
+        for existing in os.listdir(assets_dir):
+            if existing.startswith(prefix + '.') and existing.endswith('.' + ext) and existing != names[ext]:
+                os.remove(os.path.join(assets_dir, existing))
+        write_if_changed(os.path.join(assets_dir, names[ext]), content)
+
+    shell = render_page(
+        head="",
+        styles=f'<link rel="stylesheet" href="assets/{names["css"]}">',
+        updated="–",
+        macro_items="",
+        asset_cards="",
+        scripts=f'<script src="assets/{names["js"]}" defer></script>',
+        nav='<nav class="group-tabs" id="group-tabs"></nav>\n',
+        links=report_links()
+    )
+    write_if_changed(os.path.join(output_dir, 'index.html'), shell)
+
+def shard_cards(assets_data, analyses):
+    """Card payloads split into {group: [card]} in watchlist group order"""
+    shards = {group: [] for group, _ in WATCHLIST.groups}
+    for key, data in assets_data.items():
+        shards.setdefault(WATCHLIST.group_for(key, data['type']), []).append(card_payload(key, data, analyses[key]))
+    return {group: cards for group, cards in shards.items() if cards}
+
+def read_previous_index(path='data_version.json'):
     try:
-        print("🚀 Starte Fundamental Dashboard Update...")
-        print(f"⏰ {datetime.now(pytz.timezone('Europe/Berlin')).strftime('%Y-%m-%d %H:%M:%S')} (MEZ/CET)")
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-        assets_config = [
-            ('^NDX', 'US100', 'index'),
-            ('^DJI', 'US30', 'index'),
-            ('^GSPC', 'SP500', 'index'),
-            ('GC=F', 'GOLD', 'commodity'),
-            ('BTC-USD', 'BTC', 'crypto'),
-            ('EURUSD=X', 'EURUSD', 'forex')
-        ]
-
-        assets_data = {}
-        for symbol, key, asset_type in assets_config:
-            print(f"📈 Lade {key}...")
-            data = fetch_asset_data(symbol, key, asset_type)
-            if data:
-                assets_data[key] = data
-                if key == 'EURUSD':
-                    price_str = "{:.4f}".format(data['current'])
-                else:
-                    price_str = "{:,.2f}".format(data['current'])
-                print(f"   ✅ {key}: {price_str} ({data['change_pct']:+.2f}%)")
-            else:
-                print(f"   ⚠️  {key}: Keine Daten")
+def write_shards(shards, previous_versions, output_dir='.', shard_size=SHARD_SIZE, keep=(CORRELATION_SHARD,)):
+    """Write each group's cards as shards/<group>-<n>.json chunks of shard_size cards
 
-        if not assets_data:
-            print("❌ Keine Asset-Daten verfügbar!")
-            sys.exit(1)
+    Returns {group: [version per chunk]}. Chunks whose version matches
+    previous_versions are not rewritten, and files of chunks that no longer
+    exist are removed (except the names in keep), so the client only ever
+    downloads what it scrolls to and what changed.
+    """
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+    versions, names = {}, set()
+    for group, cards in shards.items():
+        previous = previous_versions.get(group, [])
+        versions[group] = []
+        for n, begin in enumerate(range(0, len(cards), shard_size)):
+            encoded = json.dumps({'group': group, 'cards': cards[begin:begin + shard_size]}, ensure_ascii=False, separators=(',', ':'))
+            version = hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+            name = f"{group}-{n}.json"
+            names.add(name)
+            if n >= len(previous) or previous[n] != version or not os.path.exists(os.path.join(shard_dir, name)):
+                with open(os.path.join(shard_dir, name), 'w', encoding='utf-8') as f:
+                    f.write(encoded)
+            versions[group].append(version)
+    for name in os.listdir(shard_dir):
+        if name.endswith('.json') and name not in names and name not in keep:
+            os.remove(os.path.join(shard_dir, name))
+    return versions
 
-        print("🎨 Generiere Fundamental HTML Dashboard...")
-        html = generate_html(assets_data)
+def write_correlation_shard(payload, output_dir='.'):
+    """Write the correlation section as shards/correlation.json; returns its version for data_version.json"""
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    os.makedirs(os.path.join(output_dir, SHARD_DIR), exist_ok=True)
+    write_if_changed(os.path.join(output_dir, SHARD_DIR, CORRELATION_SHARD), encoded)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
 
-        with open('index.html', 'w', encoding='utf-8') as f:
-            f.write(html)
+def write_if_changed(path, content):
+    """Write content unless the file already holds exactly that; returns True if written"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
 
-        print("✅ Dashboard gespeichert")
+def run_update(assets_config, provider, timer=None, macro_source=None, force_write=False, output_mode='html',
+               refresh=None, cards=None, metrics=None, alerts=None, alert_sink=None, correlation_keys=MATRIX_MAX_KEYS):
+    """Run one fetch → score → analysis → render → write cycle
+
+    Every stage is timed on timer. output_mode 'html' writes the full page;
+    'split' keeps a static index.html shell and only rewrites the JSON the
+    client renders from (data_summary.json plus the tiny data_version.json it
+    polls). When the content digest matches the one in data_summary.json,
+    rendering and writing are skipped (unless force_write) and only the
+    heartbeat is updated; live prices are appended to the snapshot log
+    either way. refresh and cards are passed to fetch_all_assets(); cards is
+    updated in place with this run's results. metrics (telemetry.RunMetrics)
+    collects fetch and cache measurements. alerts (alerts.AlertEngine) is fed
+    every live snapshot; fired alerts go to alert_sink (a WebhookSink) if
+    given. The correlation state over all configured symbols advances with
+    the store's new daily bars; pairwise matrices cover the first
+    correlation_keys symbols. Returns the run's summary, or None when no
+    asset could be loaded.
+    """
+    timer = timer or StageTimer()
+    provider.begin_run(metrics)
+
+    store = OHLCVStore()
+
+    print(f"📈 Lade {len(assets_config)} Assets...")
+    with timer.stage('fetch'):
+        results = fetch_all_assets(assets_config, provider, store=store, refresh=refresh, cards=cards,
+                                   metrics=metrics)
+        if cards is not None:
+            cards.update(results)
+
+    with timer.stage('indicators'):
+        indicators = update_indicators(store, [symbol for symbol, _, _ in assets_config])
+        for data in results.values():
+            # Cards restored from the last summary keep its indicators
+            if data and store.count(data['symbol']):
+                data['indicators'] = indicators.get(data['symbol'])
+
+    assets_data = {}
+    for key, data in results.items():
+        if data:
+            assets_data[key] = data
+            status = {'closed': " 💤", 'stale': " ⚠️ veraltet"}.get(data.get('status'), "")
+            print(f"   ✅ {key}: {format_price(key, data)} ({data['change_pct']:+.2f}%){status}")
+        else:
+            print(f"   ⚠️  {key}: Keine Daten")
+
+    if not assets_data:
+        print("❌ Keine Asset-Daten verfügbar!")
+        return None
+
+    with timer.stage('correlation'):
+        live = update_correlation(store, [symbol for symbol, _, _ in assets_config], matrix_keys=correlation_keys)
+        correlation = summarize_correlation(live, [key for _, key, _ in assets_config])
+        for key, data in assets_data.items():
+            data['correlation_peer'] = correlation['peers'].get(key)
 
+    with timer.stage('macro'):
+        macro, origin = load_macro_snapshot(macro_source or make_macro_source(MACRO_SOURCE_DEFAULT))
+        print(f"🌍 Makro-Snapshot: {origin}")
+        if metrics is not None:
+            metrics.cache('macro', origin == 'cache', origin != 'cache')
+
+    with timer.stage('score'):
+        scores = score_assets(list(assets_data), snapshot_values(macro))
+
+    with timer.stage('snapshots'):
+        # Only prices fetched in this run; closed, stale and reused cards would repeat old values
+        snapshots, now_ts = SnapshotLog(), time.time()
+        for key, data in assets_data.items():
+            if data.get('status', 'live') == 'live' and (refresh is None or data['symbol'] in refresh):
+                snapshots.append(data['symbol'], now_ts, float(data['current']), float(data['change_pct']), scores[key][1])
+
+    with timer.stage('sparklines'):
+        # Reused cards keep their lines until their symbol is refreshed again
+        line_symbols = [data['symbol'] for data in assets_data.values()
+                       if 'sparklines' not in data or refresh is None or data['symbol'] in refresh]
+        sparklines = build_sparklines(line_symbols, store, snapshots)
+        for data in assets_data.values():
+            if data['symbol'] in sparklines:
+                data['sparklines'] = sparklines[data['symbol']]
+
+    if alerts is not None:
+        with timer.stage('alerts'):
+            fired = []
+            for key, data in assets_data.items():
+                if data.get('status', 'live') == 'live' and (refresh is None or data['symbol'] in refresh):
+                    fired += alerts.evaluate(key, snapshot_fields(data, scores[key]), now_ts)
+            alerts.save_state()
+            for alert in fired:
+                print(f"   🔔 {alert['message']}")
+            if alert_sink is not None:
+                delivered, queued = alert_sink.send(fired)
+                if delivered or queued:
+                    print(f"📤 {delivered} Alarme zugestellt" + (f", {queued} in der Warteschlange" if queued else ""))
+
+    with timer.stage('analysis'):
+        analyses = {key: get_fundamental_analysis(key, data, scores[key], macro) for key, data in assets_data.items()}
+
+    with timer.stage('digest'):
+        digest = content_digest(assets_data, analyses, macro, output_mode, correlation)
         summary = {
             'last_update': datetime.now().isoformat(),
             'type': 'fundamental_analysis',
+            'content_hash': digest,
+            'version': digest[:16],
+            'updated_display': datetime.now(pytz.timezone('Europe/Berlin')).strftime('%d.%m.%Y %H:%M:%S'),
             'assets_count': len(assets_data),
-            'assets': {k: {'price': float(v['current']), 'change': float(v['change_pct'])} for k, v in assets_data.items()}
+            'assets': {
+                k: {
+                    'symbol': v['symbol'], 'type': v['type'], 'status': v.get('status', 'live'),
+                    'price': float(v['current']), 'change': float(v['change_pct']),
+                    '52w_high': float(v['52w_high']), '52w_low': float(v['52w_low']), 'distance': float(v['distance']),
+                    'last_update': v['last_update'], 'indicators': v.get('indicators')
+                }
+                for k, v in assets_data.items()
+            },
+            'macro': macro_payload(macro),
+            'correlation': summary_correlation(correlation)
         }
-        
+        unchanged = not force_write and digest == read_previous_digest()
+        if metrics is not None:
+            metrics.cache('digest', unchanged, not unchanged)
+
+    if output_mode == 'split':
+        with timer.stage('shell'):
+            write_static_shell()
+
+    if unchanged:
+        write_heartbeat(digest)
+        print("⏸️  Inhalt unverändert – index.html und data_summary.json bleiben bestehen")
+        return summary
+
+    if output_mode == 'split':
+        with timer.stage('write'):
+            shards = shard_cards(assets_data, analyses)
+            previous = {group['id']: group['chunks'] for group in read_previous_index().get('groups', []) if 'chunks' in group}
+            versions = write_shards(shards, previous)
+            labels = dict(WATCHLIST.groups)
+            index = {
+                'version': summary['version'],
+                'last_update': summary['last_update'],
+                'updated_display': summary['updated_display'],
+                'macro': summary['macro'],
+                'correlation': write_correlation_shard(correlation_payload(correlation)),
+                'sparkline': {'width': SPARK_WIDTH, 'height': SPARK_HEIGHT},
+                'chunk_size': SHARD_SIZE,
+                'groups': [{'id': group, 'label': labels.get(group, group), 'count': len(cards), 'chunks': versions[group]}
+                           for group, cards in shards.items()]
+            }
+            with open('data_summary.json', 'w') as f:
+                json.dump(summary, f, separators=(',', ':'))
+            with open('data_version.json', 'w') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+            write_heartbeat(digest)
+        chunks = [(group, n) for group, chunk_versions in versions.items() for n in range(len(chunk_versions))]
+        changed = [(group, n) for group, n in chunks if previous.get(group, [])[n:n + 1] != versions[group][n:n + 1]]
+        if metrics is not None:
+            metrics.cache('shards', len(chunks) - len(changed), len(changed))
+        print(f"✅ Daten gespeichert (Version {summary['version']}, {len(changed)}/{len(chunks)} Teilstücke neu)")
+        return summary
+
+    print("🎨 Generiere Fundamental HTML Dashboard...")
+    with timer.stage('html'):
+        html = generate_html(assets_data, analyses, macro, correlation)
+
+    with timer.stage('write'):
+        with open('index.html', 'w', encoding='utf-8') as f:
+            f.write(html)
+
+        print("✅ Dashboard gespeichert")
+
         with open('data_summary.json', 'w') as f:
             json.dump(summary, f, indent=2)
-            
+
+        write_heartbeat(digest)
+
+    return summary
+
+def make_alerts(args):
+    """(AlertEngine, WebhookSink or None) for the rules file, or (None, None) without one"""
+    if not os.path.exists(args.alerts):
+        return None, None
+    engine, webhook = load_alerts(args.alerts)
+    webhook = args.alert_webhook or webhook
+    return engine, WebhookSink(webhook) if webhook else None
+
+def finish_metrics(metrics, timer, summary, output_mode, prom_file=PROM_PATH):
+    """Close a run's telemetry and write it as JSON lines and as the Prometheus textfile"""
+    unchanged = metrics.caches.get('digest', {}).get('hits')
+    metrics.finish('failed' if summary is None else ('unchanged' if unchanged else 'written'), timer)
+    outputs = ['index.html', 'data_summary.json']
+    if output_mode == 'split':
+        outputs += ['data_version.json', 'assets', SHARD_DIR]
+    for name in outputs:
+        metrics.output(name, name)
+    metrics.write_jsonl()
+    metrics.write_prometheus(prom_file)
+
+def parse_cadences(specs):
+    """["crypto=30", ...] -> {'crypto': 30.0}"""
+    cadences = {}
+    for spec in specs:
+        asset_type, _, seconds = spec.partition('=')
+        cadences[asset_type] = float(seconds)
+    return cadences
+
+def run_daemon(args, provider, macro_source, alerts=None, alert_sink=None):
+    """Keep the process, provider and card data warm and refresh on per-type cadences"""
+    scheduler = RefreshScheduler(ASSETS_CONFIG, parse_cadences(args.cadence))
+    cadences = ", ".join(f"{t} {scheduler.cadence(t):g}s" for t in scheduler.groups)
+    print(f"🔁 Daemon gestartet ({cadences})")
+    cards = {}
+
+    def tick(symbols):
+        timer, metrics, summary = StageTimer(), RunMetrics(), None
+        print(f"\n⏰ {datetime.now(pytz.timezone('Europe/Berlin')).strftime('%H:%M:%S')} Tick: {', '.join(symbols)}")
+        # Ticks run on an executor thread, so each tick gets its own profile there
+        with Profiler() if args.profile else nullcontext():
+            try:
+                summary = run_update(ASSETS_CONFIG, provider, timer, macro_source, force_write=args.force_write,
+                                     output_mode=args.output_mode, refresh=symbols, cards=cards, metrics=metrics,
+                                     alerts=alerts, alert_sink=alert_sink, correlation_keys=args.correlation_keys)
+            finally:
+                finish_metrics(metrics, timer, summary, args.output_mode, args.prom_file)
+        print(f"⏱️  {timer.format()}")
+
+    ticks = asyncio.run(run_scheduler(scheduler, tick, max_ticks=args.max_ticks))
+    print(f"👋 Daemon beendet nach {ticks} Ticks")
+    return 0
+
+def main(argv=None):
+    """Main function"""
+    global WATCHLIST, ASSETS_CONFIG
+    args = parse_args(argv)
+    try:
+        if args.watchlist != WATCHLIST_PATH:
+            WATCHLIST = load_watchlist(args.watchlist)
+            ASSETS_CONFIG = WATCHLIST.config
+        provider = make_provider(args)
+        print("🚀 Starte Fundamental Dashboard Update...")
+        print(f"⏰ {datetime.now(pytz.timezone('Europe/Berlin')).strftime('%Y-%m-%d %H:%M:%S')} (MEZ/CET)")
+
+        macro_source = make_macro_source(args.macro_source)
+        alerts, alert_sink = make_alerts(args)
+        if args.daemon:
+            return run_daemon(args, provider, macro_source, alerts, alert_sink)
+
+        with Profiler() if args.profile else nullcontext():
+            timer, metrics, summary = StageTimer(), RunMetrics(), None
+            try:
+                summary = run_update(ASSETS_CONFIG, provider, timer, macro_source, force_write=args.force_write,
+                                     output_mode=args.output_mode, metrics=metrics, alerts=alerts, alert_sink=alert_sink,
+                                     correlation_keys=args.correlation_keys)
+            finally:
+                finish_metrics(metrics, timer, summary, args.output_mode, args.prom_file)
+        if summary is None:
+            return 1
+
+        print(f"⏱️  {timer.format()}")
         print("🎉 Update erfolgreich!")
         return 0
         
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Watchlist aus watchlist.json
+Symbole, Asset-Klassen, Gruppen (je eine Dashboard-Seite) und
+Formatierungsregeln stehen in der Datei statt im Code
+"""
+
+import json
+import os
+import re
+
+WATCHLIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'watchlist.json')
+DEFAULT_CONTEXT = 'Aktuelles Makroumfeld analysieren.'
+DEFAULT_FORMAT = {'price': 2, 'high': 0, 'macd': 2}
+
+# Keys end up in element ids and group ids in file names
+KEY_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+GROUP_PATTERN = re.compile(r'^[a-z0-9_-]+$')
+
+class Watchlist:
+    """Parsed watchlist
+
+    config is the (symbol, key, type) list the pipeline iterates; the other
+    lookups fall back to the asset type, so keys outside the file (e.g.
+    synthetic benchmark symbols) still render.
+    """
+
+    def __init__(self, groups, formats, assets):
+        self.groups = [(group['id'], group.get('label', group['id'])) for group in groups]
+        self.formats = dict(formats)
+        self.assets = {asset['key']: asset for asset in assets}
+        self.config = [(asset['symbol'], asset['key'], asset['type']) for asset in assets]
+
+    def alias(self, key, base_key):
+        """Render key with base_key's group and formatting (synthetic benchmark symbols)"""
+        self.assets[key] = dict(self.entry(base_key), key=key)
+
+    def entry(self, key):
+        return self.assets.get(key, {})
+
+    def format_for(self, key, asset_type):
+        """Decimals for price, 52W high and MACD of one card"""
+        name = self.entry(key).get('format') or (asset_type if asset_type in self.formats else 'default')
+        return dict(DEFAULT_FORMAT, **self.formats.get(name, {}))
+
+    def group_for(self, key, asset_type):
+        return self.entry(key).get('group') or asset_type
+
+    def trend_style(self, key):
+        return self.entry(key).get('trend', 'default')
+
+    def context(self, key):
+        return self.entry(key).get('context', DEFAULT_CONTEXT)
+
+def _validate(raw):
+    groups = {group['id'] for group in raw.get('groups', [])}
+    formats = set(raw.get('formats', {}))
+    seen = set()
+    for group in groups:
+        if not GROUP_PATTERN.match(group):
+            raise ValueError(f"Watchlist: ungültige Gruppen-ID '{group}'")
+    for asset in raw.get('assets', []):
+        missing = [field for field in ('symbol', 'key', 'type') if not asset.get(field)]
+        if missing:
+            raise ValueError(f"Watchlist: Eintrag ohne {', '.join(missing)}: {asset}")
+        key = asset['key']
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Watchlist: ungültiger Key '{key}'")
+        if key in seen:
+            raise ValueError(f"Watchlist: Key '{key}' doppelt")
+        seen.add(key)
+        # Without a group the asset lands in the group named after its type, which has to exist too
+        group = asset.get('group') or asset['type']
+        if not isinstance(group, str) or group not in groups:
+            origin = '' if asset.get('group') else f" (Standard aus type '{asset['type']}')"
+            raise ValueError(f"Watchlist: unbekannte Gruppe '{group}'{origin} bei {key}, "
+                             f"bekannt: {', '.join(sorted(groups))}")
+        if asset.get('format') and asset['format'] not in formats:
+            raise ValueError(f"Watchlist: unbekanntes Format '{asset['format']}' bei {key}")
+    if not seen:
+        raise ValueError("Watchlist enthält keine Assets")
+    return raw
+
+def load_watchlist(path=WATCHLIST_PATH):
+    with open(path, encoding='utf-8') as f:
+        raw = _validate(json.load(f))
+    return Watchlist(raw.get('groups', []), raw.get('formats', {}), raw['assets'])